@@ -1,25 +1,36 @@
-import os
-import json
 from langchain_core.messages import SystemMessage, HumanMessage
 from graph.state import AgentState
-from utils.llm_client import get_llm
+from utils.model_router import invoke_routed, ainvoke_routed
 from utils.parser import extract_json
+from utils.resources import get_prompt
+from utils.context_builder import compact_json
+from utils.component_library import library_architecture_for
 
-def architect_agent(state: AgentState) -> AgentState:
-    print("--- ARCHITECT AGENT ---")
-    prompt_path = os.path.join(os.path.dirname(__file__), "..", "prompts", "architect_prompt.txt")
-    with open(prompt_path, "r") as f:
-        system_prompt = f.read()
+def build_architect_messages(state: AgentState):
+    system_prompt = get_prompt("architect_prompt.txt")
 
     plan = state["plan"]
     
-    llm = get_llm()
     messages = [
         SystemMessage(content=system_prompt),
-        HumanMessage(content=f"Project Plan: {json.dumps(plan, indent=2)}")
+        HumanMessage(content=f"Project Plan: {compact_json(plan)}")
     ]
-    
-    response = llm.invoke(messages)
-    architecture = extract_json(response.content)
-    
+    return messages
+
+def architect_agent(state: AgentState) -> AgentState:
+    print("--- ARCHITECT AGENT ---")
+    architecture = library_architecture_for(state)
+    if architecture is not None:
+        return {"architecture": architecture}
+    architecture = invoke_routed(build_architect_messages(state), "architect",
+                                 state["plan"].get("app_intent"), extract_json)
+    return {"architecture": architecture}
+
+async def architect_agent_async(state: AgentState) -> AgentState:
+    print("--- ARCHITECT AGENT (async) ---")
+    architecture = library_architecture_for(state)
+    if architecture is not None:
+        return {"architecture": architecture}
+    architecture = await ainvoke_routed(build_architect_messages(state), "architect",
+                                        state["plan"].get("app_intent"), extract_json)
     return {"architecture": architecture}
@@ -1,34 +1,452 @@
 import os
 import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from langchain_core.messages import SystemMessage, HumanMessage
 from graph.state import AgentState
-from utils.llm_client import get_llm
-from utils.parser import extract_json
+from utils.llm_client import MODEL_NAME, stream_llm, astream_llm
+from utils.parser import extract_json, JsonObjectStream
+from utils.context_builder import compact_json, estimate_tokens
+from utils.resources import get_prompt, get_blueprint
+from utils.telemetry import record_extract_json, record_output_tokens, map_in_context
+from utils.model_router import call_routed, acall_routed, invoke_routed, ainvoke_routed
+from utils.component_library import library_code
 
-def coder_agent(state: AgentState) -> AgentState:
-    print("--- CODER AGENT ---")
-    prompt_path = os.path.join(os.path.dirname(__file__), "..", "prompts", "coder_prompt.txt")
-    with open(prompt_path, "r") as f:
-        system_prompt = f.read()
+# ============================================
+# FAN-OUT SETTINGS
+# "auto" splits generation per file for the intents below;
+# "always"/"never" force the mode.
+# ============================================
+FAN_OUT_MODE = os.getenv("AUTOSITE_CODER_FAN_OUT", "auto")
+FAN_OUT_INTENTS = {"data_complex"}
+FAN_OUT_WORKERS = int(os.getenv("AUTOSITE_CODER_WORKERS", "6"))
+FILE_ATTEMPTS = 3
+
+# ============================================
+# OUTPUT BUDGET
+# Single-response generation is split into chunks whose estimated output
+# (TOKENS_PER_FILE per architecture file) fits OUTPUT_TOKEN_BUDGET, so
+# large sites stay under the model's output limit. A response cut off
+# anyway is continued from its last complete file instead of starting
+# over, at most MAX_CONTINUATIONS times.
+# ============================================
+OUTPUT_TOKEN_BUDGET = int(os.getenv("AUTOSITE_CODER_OUTPUT_TOKENS", "6000"))
+TOKENS_PER_FILE = int(os.getenv("AUTOSITE_CODER_TOKENS_PER_FILE", "700"))
+MAX_CONTINUATIONS = int(os.getenv("AUTOSITE_CODER_CONTINUATIONS", "3"))
+
+# Files owned by the template; the coder must never emit them
+TEMPLATE_OWNED = {"src/main.jsx", "src/index.css"}
+
+def _load_blueprint(plan: dict):
+    """
+    Returns (compact blueprint JSON text, parsed blueprint) for the plan's blueprint.
+    """
+    if "blueprint" in plan and plan["blueprint"] != "custom":
+        blueprint = get_blueprint(plan["blueprint"])
+        if blueprint is not None:
+            return compact_json(blueprint), blueprint
+    return "", {}
+
+def build_coder_messages(state: AgentState, files: list = None, all_files: list = None):
+    """
+    Messages for a single-response generation; with files, the response
+    is limited to that chunk of the project.
+    """
+    system_prompt = get_prompt("coder_prompt.txt")
 
     architecture = state["architecture"]
     plan = state.get("plan", {})
     
     # Load blueprint if selected
-    blueprint_content = ""
-    if "blueprint" in plan and plan["blueprint"] != "custom":
-        blueprint_path = os.path.join(os.path.dirname(__file__), "..", "blueprints", f"{plan['blueprint']}.json")
-        if os.path.exists(blueprint_path):
-            with open(blueprint_path, "r") as f:
-                blueprint_content = f.read()
+    blueprint_content, _ = _load_blueprint(plan)
+
+    human = f"Architecture: {compact_json(architecture)}\n\nBlueprint: {blueprint_content}"
+    if files is not None:
+        human += (
+            f"\n\nProject Files: {json.dumps(all_files or files)}\n\n"
+            f"Generate Only: {json.dumps(files)}\n\n"
+            "The other project files are generated separately; import them by these paths."
+        )
 
-    llm = get_llm()
     messages = [
         SystemMessage(content=system_prompt),
-        HumanMessage(content=f"Architecture: {json.dumps(architecture, indent=2)}\n\nBlueprint: {blueprint_content}")
+        HumanMessage(content=human)
     ]
-    
-    response = llm.invoke(messages)
-    code = extract_json(response.content)
-    
+    return messages
+
+def build_continuation_messages(messages, complete: dict):
+    """
+    Asks for the rest of a response that hit the output limit; files that
+    were already complete are listed instead of regenerated.
+    """
+    return [
+        messages[0],
+        HumanMessage(content=(
+            f"{messages[-1].content}\n\n"
+            f"Already Generated: {json.dumps(sorted(complete))}\n\n"
+            "Your previous response hit the output limit. Output a JSON object with ONLY the files "
+            "not listed under Already Generated."
+        )),
+    ]
+
+# ============================================
+# PER-FILE FAN-OUT
+# ============================================
+def use_fan_out(plan: dict) -> bool:
+    if FAN_OUT_MODE == "always":
+        return True
+    if FAN_OUT_MODE == "never":
+        return False
+    return plan.get("app_intent") in FAN_OUT_INTENTS
+
+def plan_file_tasks(architecture: dict, plan: dict) -> list:
+    """
+    Turns the architecture into a list of independent file tasks
+    ({"file", "name", "props"}). Falls back to the blueprint layout
+    when the architect did not list components.
+    """
+    tasks = {}
+
+    def add(path, name="", props=None):
+        if not path or not isinstance(path, str):
+            return
+        path = path.lstrip("/\\")
+        if not path.startswith("src/") or path in TEMPLATE_OWNED:
+            return
+        tasks.setdefault(path, {"file": path, "name": name, "props": props or []})
+
+    add("src/App.jsx", "App")
+    router = architecture.get("router")
+    if isinstance(router, str) and router.endswith((".jsx", ".tsx")):
+        add(router, "App")
+
+    for page in architecture.get("pages", []) or []:
+        if isinstance(page, dict):
+            add(page.get("file"), page.get("name", ""))
+            for component_file in page.get("components", []) or []:
+                add(component_file)
+
+    for component in architecture.get("components", []) or []:
+        if isinstance(component, dict):
+            add(component.get("file"), component.get("name", ""), component.get("props"))
+
+    if len(tasks) == 1:
+        _, blueprint = _load_blueprint(plan)
+        for name in blueprint.get("layout", []):
+            add(f"src/components/{name}.jsx", name)
+
+    return list(tasks.values())
+
+def build_file_messages(state: AgentState, task: dict, all_files: list):
+    system_prompt = get_prompt("coder_file_prompt.txt")
+    blueprint_content, _ = _load_blueprint(state.get("plan", {}))
+
+    human = (
+        f"Architecture: {compact_json(state['architecture'])}\n\n"
+        f"Blueprint: {blueprint_content}\n\n"
+        f"Project Files: {json.dumps(all_files)}\n\n"
+        f"Target File: {task['file']}\n"
+        f"Component Name: {task['name'] or os.path.splitext(os.path.basename(task['file']))[0]}\n"
+        f"Props: {json.dumps(task['props'])}"
+    )
+    return [SystemMessage(content=system_prompt), HumanMessage(content=human)]
+
+def _file_content(response_text: str, path: str) -> str:
+    result = extract_json(response_text)
+    if path in result:
+        return result[path]
+    if len(result) == 1:
+        return next(iter(result.values()))
+    raise ValueError(f"Response did not contain {path}")
+
+def build_retry_messages(messages, task: dict, error: str):
+    """
+    The file request again, with the previous attempt's error, so a retry
+    is a different request (never the same cached or repeated answer).
+    """
+    return [
+        messages[0],
+        HumanMessage(content=(
+            f"{messages[-1].content}\n\n"
+            f"Previous Attempt Failed: {error}\n"
+            f"Return only a JSON object with the single key \"{task['file']}\" and the complete file as its value."
+        )),
+    ]
+
+def _generate_file(state: AgentState, task: dict, all_files: list, on_file=None):
+    """
+    Generates one file, retrying it alone on failure.
+    Returns (path, content or None, error).
+    """
+    first = build_file_messages(state, task, all_files)
+    messages = first
+    intent = state.get("plan", {}).get("app_intent")
+    error = None
+    for attempt in range(1, FILE_ATTEMPTS + 1):
+        try:
+            content = invoke_routed(messages, "coder", intent, lambda text: _file_content(text, task["file"]),
+                                    escalate="retry" if attempt > 1 else None)
+            if on_file:
+                on_file(task["file"], content)
+            return task["file"], content, None
+        except Exception as e:
+            error = str(e)
+            print(f"Coder: {task['file']} failed (attempt {attempt}/{FILE_ATTEMPTS}): {error}")
+            messages = build_retry_messages(first, task, error)
+    return task["file"], None, error
+
+async def _agenerate_file(state: AgentState, task: dict, all_files: list, on_file=None):
+    first = build_file_messages(state, task, all_files)
+    messages = first
+    intent = state.get("plan", {}).get("app_intent")
+    error = None
+    for attempt in range(1, FILE_ATTEMPTS + 1):
+        try:
+            content = await ainvoke_routed(messages, "coder", intent, lambda text: _file_content(text, task["file"]),
+                                           escalate="retry" if attempt > 1 else None)
+            if on_file:
+                on_file(task["file"], content)
+            return task["file"], content, None
+        except Exception as e:
+            error = str(e)
+            print(f"Coder: {task['file']} failed (attempt {attempt}/{FILE_ATTEMPTS}): {error}")
+            messages = build_retry_messages(first, task, error)
+    return task["file"], None, error
+
+def _merge_files(results) -> AgentState:
+    """
+    Coder update from per-file results; files that failed every attempt
+    go to generation_errors so the validator fails them (and repair can
+    regenerate them) instead of the site silently missing them.
+    """
+    code, errors = {}, {}
+    for path, content, error in results:
+        if content is None:
+            print(f"Coder: giving up on {path}: {error}")
+            errors[path] = error
+            continue
+        code[path] = content
+    print(f"Coder: generated {len(code)}/{len(results)} files in parallel")
+    return {"code": code, "generation_errors": errors}
+
+async def _gather_bounded(coroutines) -> list:
+    """
+    asyncio.gather with at most FAN_OUT_WORKERS running at once, like the
+    thread pool of the sync coder.
+    """
+    slots = asyncio.Semaphore(FAN_OUT_WORKERS)
+
+    async def run(coroutine):
+        async with slots:
+            return await coroutine
+
+    return await asyncio.gather(*(run(c) for c in coroutines))
+
+# ============================================
+# STREAMING (single-response mode)
+# ============================================
+def _file_callback(config):
+    """
+    Optional on_file(path, content) hook passed as config["configurable"]["on_file"];
+    called as soon as each generated file is complete.
+    """
+    if not config:
+        return None
+    return (config.get("configurable") or {}).get("on_file")
+
+def _consume(stream: JsonObjectStream, chunk: str, on_file):
+    for path, content in stream.feed(chunk):
+        if on_file and isinstance(content, str):
+            on_file(path, content)
+
+def _record_tokens(stream: JsonObjectStream, text: str, continuation: bool):
+    generated = estimate_tokens(text)
+    wasted = 0 if stream.done else estimate_tokens(text[stream.committed:])
+    record_output_tokens(generated, wasted, 1 if continuation else 0)
+    if wasted:
+        print(f"[tokens] coder: ~{generated} output tokens, ~{wasted} lost after the last complete file")
+
+def _next_request(messages, stream: JsonObjectStream, code: dict, attempt: int):
+    """
+    Merges one streamed response into code. Returns the continuation
+    request when it was truncated, None when the object closed.
+    """
+    record_extract_json("stream" if stream.done else "truncated")
+    code.update(stream.result)
+    if stream.done:
+        return None
+    if not stream.result or attempt >= MAX_CONTINUATIONS:
+        raise ValueError(f"Could not extract JSON from text (response ended inside {stream.partial_key or 'the object'}).")
+    print(f"Coder: response truncated inside {stream.partial_key or 'the object'}; "
+          f"continuing after {len(code)} complete file(s)")
+    return build_continuation_messages(messages, code)
+
+def stream_code(messages, on_file=None, model: str = MODEL_NAME) -> dict:
+    """
+    Streams the coder response through the incremental JSON scanner,
+    handing each file to on_file the moment its string closes. A response
+    that ends before its object closes is continued from the last
+    complete file.
+    """
+    code = {}
+    request = messages
+    for attempt in range(MAX_CONTINUATIONS + 1):
+        stream, parts = JsonObjectStream(), []
+        for chunk in stream_llm(request, agent="coder", model=model, accept=lambda _: stream.done):
+            parts.append(chunk)
+            _consume(stream, chunk, on_file)
+        _record_tokens(stream, "".join(parts), attempt > 0)
+        request = _next_request(messages, stream, code, attempt)
+        if request is None:
+            return code
+
+async def astream_code(messages, on_file=None, model: str = MODEL_NAME) -> dict:
+    code = {}
+    request = messages
+    for attempt in range(MAX_CONTINUATIONS + 1):
+        stream, parts = JsonObjectStream(), []
+        async for chunk in astream_llm(request, agent="coder", model=model, accept=lambda _: stream.done):
+            parts.append(chunk)
+            _consume(stream, chunk, on_file)
+        _record_tokens(stream, "".join(parts), attempt > 0)
+        request = _next_request(messages, stream, code, attempt)
+        if request is None:
+            return code
+
+# ============================================
+# BUDGETED CHUNKS (single-response mode)
+# ============================================
+def plan_chunks(tasks: list, budget: int = None) -> list:
+    """
+    Splits the file tasks into chunks of at most budget // TOKENS_PER_FILE
+    files (at least one each); src/App.jsx leads the first chunk.
+    """
+    per_chunk = max(1, (budget or OUTPUT_TOKEN_BUDGET) // max(1, TOKENS_PER_FILE))
+    return [tasks[i:i + per_chunk] for i in range(0, len(tasks), per_chunk)]
+
+def _chunk_setup(state: AgentState, chunk: list, all_files: list, on_file):
+    """
+    Returns (files, messages, on_file) for one chunk; files outside the
+    chunk are never handed on, so a chunk cannot clobber another's output.
+    """
+    files = [t["file"] for t in chunk]
+    wanted = set(files)
+
+    def on_chunk_file(path, content):
+        if on_file and path.lstrip("/\\") in wanted:
+            on_file(path, content)
+
+    return files, build_coder_messages(state, files, all_files), on_chunk_file
+
+def _chunk_code(files: list, code: dict) -> dict:
+    wanted = set(files)
+    return {path.lstrip("/\\"): content for path, content in code.items() if path.lstrip("/\\") in wanted}
+
+def _generate_chunk(state: AgentState, chunk: list, all_files: list, on_file=None):
+    """
+    Generates one chunk in a single streamed response.
+    Returns (files, code or None, error).
+    """
+    files, messages, on_chunk_file = _chunk_setup(state, chunk, all_files, on_file)
+    intent = state.get("plan", {}).get("app_intent")
+    try:
+        code = call_routed("coder", intent, lambda model: stream_code(messages, on_chunk_file, model))
+        return files, _chunk_code(files, code), None
+    except Exception as e:
+        return files, None, str(e)
+
+async def _agenerate_chunk(state: AgentState, chunk: list, all_files: list, on_file=None):
+    files, messages, on_chunk_file = _chunk_setup(state, chunk, all_files, on_file)
+    intent = state.get("plan", {}).get("app_intent")
+    try:
+        code = await acall_routed("coder", intent, lambda model: astream_code(messages, on_chunk_file, model))
+        return files, _chunk_code(files, code), None
+    except Exception as e:
+        return files, None, str(e)
+
+def _merge_chunks(results) -> AgentState:
+    """
+    Coder update from chunk results; every file of a failed chunk goes to
+    generation_errors (see _merge_files).
+    """
+    code, errors = {}, {}
+    for files, chunk_code, error in results:
+        if chunk_code is None:
+            print(f"Coder: giving up on chunk {', '.join(files)}: {error}")
+            errors.update((path, error) for path in files)
+            continue
+        code.update(chunk_code)
+    print(f"Coder: generated {len(code)} files in {len(results)} chunks")
+    return {"code": code, "generation_errors": errors}
+
+def _chunks_for(state: AgentState) -> list:
+    """
+    Budgeted chunks for the architecture; a single chunk means the whole
+    project fits one response.
+    """
+    tasks = plan_file_tasks(state["architecture"], state.get("plan", {}))
+    chunks = plan_chunks(tasks)
+    if len(chunks) > 1:
+        print(f"Coder: ~{len(tasks) * TOKENS_PER_FILE} output tokens estimated for {len(tasks)} files "
+              f"(budget {OUTPUT_TOKEN_BUDGET}); generating in {len(chunks)} chunks")
+    return chunks
+
+def _assembled(state: AgentState, on_file):
+    """
+    Code assembled from the component library, handed to on_file like
+    streamed files; None when the architecture was not a library one.
+    """
+    code = library_code(state)
+    if code is None:
+        return None
+    if on_file:
+        for path, content in code.items():
+            on_file(path, content)
+    print(f"Coder: assembled {len(code)} files from {state['architecture']['library']}")
     return {"code": code}
+
+def coder_agent(state: AgentState, config=None) -> AgentState:
+    print("--- CODER AGENT ---")
+    plan = state.get("plan", {})
+    on_file = _file_callback(config)
+    assembled = _assembled(state, on_file)
+    if assembled is not None:
+        return assembled
+    if use_fan_out(plan):
+        tasks = plan_file_tasks(state["architecture"], plan)
+        all_files = [t["file"] for t in tasks]
+        with ThreadPoolExecutor(max_workers=FAN_OUT_WORKERS) as pool:
+            results = map_in_context(pool, lambda t: _generate_file(state, t, all_files, on_file), tasks)
+        return _merge_files(results)
+
+    chunks = _chunks_for(state)
+    if len(chunks) > 1:
+        all_files = [t["file"] for chunk in chunks for t in chunk]
+        with ThreadPoolExecutor(max_workers=FAN_OUT_WORKERS) as pool:
+            results = map_in_context(pool, lambda c: _generate_chunk(state, c, all_files, on_file), chunks)
+        return _merge_chunks(results)
+
+    messages = build_coder_messages(state)
+    return {"code": call_routed("coder", plan.get("app_intent"), lambda model: stream_code(messages, on_file, model))}
+
+async def coder_agent_async(state: AgentState, config=None) -> AgentState:
+    print("--- CODER AGENT (async) ---")
+    plan = state.get("plan", {})
+    on_file = _file_callback(config)
+    assembled = _assembled(state, on_file)
+    if assembled is not None:
+        return assembled
+    if use_fan_out(plan):
+        tasks = plan_file_tasks(state["architecture"], plan)
+        all_files = [t["file"] for t in tasks]
+        results = await _gather_bounded(_agenerate_file(state, t, all_files, on_file) for t in tasks)
+        return _merge_files(results)
+
+    chunks = _chunks_for(state)
+    if len(chunks) > 1:
+        all_files = [t["file"] for chunk in chunks for t in chunk]
+        results = await _gather_bounded(_agenerate_chunk(state, c, all_files, on_file) for c in chunks)
+        return _merge_chunks(results)
+
+    messages = build_coder_messages(state)
+    return {"code": await acall_routed("coder", plan.get("app_intent"), lambda model: astream_code(messages, on_file, model))}
@@ -0,0 +1,51 @@
+import json
+from langchain_core.messages import SystemMessage, HumanMessage
+from graph.state import AgentState
+from agents.coder import TEMPLATE_OWNED
+from utils.model_router import invoke_routed, ainvoke_routed
+from utils.parser import extract_json
+from utils.resources import get_prompt
+from utils.context_builder import compact_json, architecture_summary, select_files
+
+def build_editor_messages(state: AgentState, files: list):
+    system_prompt = get_prompt("editor_prompt.txt")
+    code = state["code"]
+
+    human = (
+        f"Change Request: {state['change_request']}\n\n"
+        f"Architecture: {compact_json(architecture_summary(state.get('architecture') or {}))}\n\n"
+        f"Project Files: {json.dumps(sorted(code))}\n\n"
+        f"Files To Edit: {compact_json({path: code[path] for path in files})}"
+    )
+    return [SystemMessage(content=system_prompt), HumanMessage(content=human)]
+
+def _edited_files(response_text: str) -> dict:
+    result = extract_json(response_text)
+    edited = {}
+    for path, content in result.items():
+        path = path.lstrip("/\\")
+        if isinstance(content, str) and path not in TEMPLATE_OWNED:
+            edited[path] = content
+    return edited
+
+def _finish_edit(state: AgentState, edited: dict) -> AgentState:
+    code = dict(state["code"])
+    changed = sorted(path for path, content in edited.items() if code.get(path) != content)
+    code.update(edited)
+    print(f"Editor: changed {len(changed)} file(s): {', '.join(changed) or 'none'}")
+    return {"code": code}
+
+def _prepare(state: AgentState):
+    files = select_files(state["change_request"], state["code"])
+    print(f"Editor: sending {len(files)}/{len(state['code'])} file(s): {', '.join(files)}")
+    return build_editor_messages(state, files), state.get("plan", {}).get("app_intent")
+
+def editor_agent(state: AgentState) -> AgentState:
+    print("--- EDITOR AGENT ---")
+    messages, intent = _prepare(state)
+    return _finish_edit(state, invoke_routed(messages, "editor", intent, _edited_files))
+
+async def editor_agent_async(state: AgentState) -> AgentState:
+    print("--- EDITOR AGENT (async) ---")
+    messages, intent = _prepare(state)
+    return _finish_edit(state, await ainvoke_routed(messages, "editor", intent, _edited_files))
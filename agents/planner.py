@@ -1,9 +1,9 @@
-import json
-import os
 from langchain_core.messages import SystemMessage, HumanMessage
 from graph.state import AgentState
-from utils.llm_client import get_llm
+from utils.model_router import invoke_routed, ainvoke_routed
 from utils.parser import extract_json
+from utils.resources import get_prompt
+from utils.context_builder import select_blueprints, compact_json
 
 # ============================================
 # RULE-BASED INTENT CLASSIFIER (NOT LLM)
@@ -59,11 +59,12 @@ DEFAULT_BLUEPRINTS = {
     }
 }
 
-def planner_agent(state: AgentState) -> AgentState:
-    print("--- PLANNER AGENT ---")
-    prompt_path = os.path.join(os.path.dirname(__file__), "..", "prompts", "planner_prompt.txt")
-    with open(prompt_path, "r") as f:
-        system_prompt = f.read()
+def build_planner_messages(state: AgentState):
+    """
+    Classifies the intent and builds the planner prompt.
+    Returns (messages, app_intent, default_blueprint).
+    """
+    system_prompt = get_prompt("planner_prompt.txt")
 
     user_input = state["user_prompt"]
     
@@ -87,27 +88,35 @@ DEFAULT BLUEPRINT:
 IMPORTANT: Only implement the features above. Do NOT add authentication, charts, or backend unless explicitly requested.
 """
     
-    # Load custom blueprints (for specific app types like calculator)
-    blueprints_dir = os.path.join(os.path.dirname(__file__), "..", "blueprints")
-    blueprints = {}
-    if os.path.exists(blueprints_dir):
-        for f_name in os.listdir(blueprints_dir):
-            if f_name.endswith(".json"):
-                with open(os.path.join(blueprints_dir, f_name), "r") as bf:
-                    blueprints[f_name.replace(".json", "")] = bf.read()
-
-    llm = get_llm()
+    # Pre-select candidate blueprints (for specific app types like calculator)
+    # instead of inlining every blueprint file
+    blueprints = select_blueprints(user_input, app_intent)
+    print(f"Candidate Blueprints: {', '.join(blueprints) or 'none (custom)'}")
+
     messages = [
         SystemMessage(content=system_prompt),
-        HumanMessage(content=f"User Request: {user_input}\n\n{intent_context}\n\nAvailable Blueprints: {json.dumps(blueprints, indent=2)}")
+        HumanMessage(content=f"User Request: {user_input}\n\n{intent_context}\n\nAvailable Blueprints (or 'custom'): {compact_json(blueprints)}")
     ]
-    
-    response = llm.invoke(messages)
-    plan = extract_json(response.content)
-    
+    return messages, app_intent, default_blueprint
+
+def finish_plan(response_text: str, app_intent: str, default_blueprint: dict) -> AgentState:
+    plan = extract_json(response_text)
+
     # Inject app_intent into the plan for downstream agents
     plan["app_intent"] = app_intent
     plan["default_blueprint"] = default_blueprint
-    
+
     return {"plan": plan}
 
+def planner_agent(state: AgentState) -> AgentState:
+    print("--- PLANNER AGENT ---")
+    messages, app_intent, default_blueprint = build_planner_messages(state)
+    return invoke_routed(messages, "planner", app_intent,
+                         lambda text: finish_plan(text, app_intent, default_blueprint))
+
+async def planner_agent_async(state: AgentState) -> AgentState:
+    print("--- PLANNER AGENT (async) ---")
+    messages, app_intent, default_blueprint = build_planner_messages(state)
+    return await ainvoke_routed(messages, "planner", app_intent,
+                                lambda text: finish_plan(text, app_intent, default_blueprint))
+
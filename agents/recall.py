@@ -0,0 +1,47 @@
+import copy
+from graph.state import AgentState
+from agents.planner import classify_app_intent
+from utils.plan_index import get_plan_index
+from utils import llm_client
+from utils.telemetry import get_metrics
+
+def recall_agent(state: AgentState) -> AgentState:
+    """
+    Looks the prompt up in the plan index; on a hit the stored plan and
+    architecture are reused and the graph skips straight to the coder.
+    """
+    print("--- RECALL ---")
+    user_prompt = state["user_prompt"]
+    intent = classify_app_intent(user_prompt)
+    match = get_plan_index().lookup(user_prompt, intent, llm_client.BACKEND)
+    get_metrics().inc("autosite_plan_reuse_total", {"result": "hit" if match else "miss"})
+    if match is None:
+        return {}
+
+    entry, score = match
+    print(f"Reusing plan/architecture of \"{entry['prompt']}\" (similarity {score})")
+    return {
+        "plan": copy.deepcopy(entry["plan"]),
+        "architecture": copy.deepcopy(entry["architecture"]),
+        "reused_from": {"prompt": entry["prompt"], "score": score},
+    }
+
+async def recall_agent_async(state: AgentState) -> AgentState:
+    return recall_agent(state)
+
+def route_after_recall(state: AgentState) -> str:
+    return "coder" if state.get("architecture") else "planner"
+
+def remember_run(user_prompt: str, result: dict):
+    """
+    Indexes a run whose output passed validation so similar prompts can
+    reuse its plan and architecture. Reused runs are not re-indexed.
+    """
+    validation = result.get("validation") or {}
+    if result.get("reused_from") or validation.get("status") != "pass":
+        return
+    if not result.get("plan") or not result.get("architecture"):
+        return
+    plan = result["plan"]
+    get_plan_index().add(user_prompt, plan.get("app_intent") or classify_app_intent(user_prompt),
+                         plan, result["architecture"], llm_client.BACKEND)
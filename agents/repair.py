@@ -0,0 +1,108 @@
+import os
+import json
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from langchain_core.messages import SystemMessage, HumanMessage
+from graph.state import AgentState
+from utils.model_router import invoke_routed, ainvoke_routed
+from utils.parser import extract_json
+from utils.resources import get_prompt
+from utils.telemetry import map_in_context
+
+# ============================================
+# REPAIR LOOP BUDGET
+# ============================================
+MAX_REPAIR_ITERATIONS = int(os.getenv("AUTOSITE_MAX_REPAIRS", "2"))
+
+def route_after_validation(state: AgentState) -> str:
+    """
+    Sends a failed validation to the repair node when the failure is tied
+    to specific files and the iteration budget is not exhausted.
+    """
+    validation = state.get("validation") or {}
+    if validation.get("status") != "fail" or not validation.get("file_issues"):
+        return "end"
+    if state.get("repair_attempts", 0) >= MAX_REPAIR_ITERATIONS:
+        print(f"Repair budget exhausted after {MAX_REPAIR_ITERATIONS} iterations.")
+        return "end"
+    return "repair"
+
+def build_repair_messages(path: str, content: str, issues: list, all_files: list):
+    system_prompt = get_prompt("repair_prompt.txt")
+
+    human = (
+        f"File: {path}\n\n"
+        f"Issues: {json.dumps(issues)}\n\n"
+        f"Other Project Files: {json.dumps([p for p in all_files if p != path])}\n\n"
+        f"Current Contents:\n{content}"
+    )
+    return [SystemMessage(content=system_prompt), HumanMessage(content=human)]
+
+def _repaired_content(response_text: str, path: str) -> str:
+    result = extract_json(response_text)
+    if path in result:
+        return result[path]
+    if len(result) == 1:
+        return next(iter(result.values()))
+    raise ValueError(f"Repair response did not contain {path}")
+
+def _finish_repair(state: AgentState, repaired: dict, started: float) -> AgentState:
+    code = dict(state["code"])
+    code.update(repaired)
+
+    iteration = state.get("repair_attempts", 0) + 1
+    entry = {
+        "iteration": iteration,
+        "files": sorted(repaired),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    print(f"Repair iteration {iteration}: fixed {len(repaired)} file(s) in {entry['seconds']}s")
+
+    return {
+        "code": code,
+        "repair_attempts": iteration,
+        "repair_log": list(state.get("repair_log") or []) + [entry],
+    }
+
+def repair_agent(state: AgentState) -> AgentState:
+    print("--- REPAIR AGENT ---")
+    started = time.perf_counter()
+    code = state["code"]
+    file_issues = state["validation"]["file_issues"]
+    intent = state.get("plan", {}).get("app_intent")
+
+    def repair_one(item):
+        path, issues = item
+        messages = build_repair_messages(path, code.get(path, ""), issues, list(code))
+        try:
+            return path, invoke_routed(messages, "repair", intent, lambda text: _repaired_content(text, path),
+                                       escalate="validation failed")
+        except Exception as e:
+            print(f"Repair of {path} failed: {e}")
+            return path, None
+
+    with ThreadPoolExecutor(max_workers=max(1, len(file_issues))) as pool:
+        results = map_in_context(pool, repair_one, file_issues.items())
+    repaired = {path: content for path, content in results if content is not None}
+    return _finish_repair(state, repaired, started)
+
+async def repair_agent_async(state: AgentState) -> AgentState:
+    print("--- REPAIR AGENT (async) ---")
+    started = time.perf_counter()
+    code = state["code"]
+    file_issues = state["validation"]["file_issues"]
+    intent = state.get("plan", {}).get("app_intent")
+
+    async def repair_one(path, issues):
+        messages = build_repair_messages(path, code.get(path, ""), issues, list(code))
+        try:
+            return path, await ainvoke_routed(messages, "repair", intent, lambda text: _repaired_content(text, path),
+                                              escalate="validation failed")
+        except Exception as e:
+            print(f"Repair of {path} failed: {e}")
+            return path, None
+
+    results = await asyncio.gather(*(repair_one(p, i) for p, i in file_issues.items()))
+    repaired = {path: content for path, content in results if content is not None}
+    return _finish_repair(state, repaired, started)
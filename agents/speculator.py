@@ -0,0 +1,196 @@
+import os
+import threading
+from graph.state import AgentState
+from agents.planner import classify_app_intent, DEFAULT_BLUEPRINTS
+from agents.architect import build_architect_messages, architect_agent, architect_agent_async
+from agents.recall import route_after_recall
+from utils.model_router import invoke_routed, ainvoke_routed
+from utils.parser import extract_json
+from utils.resources import get_blueprints
+from utils.context_builder import select_blueprints
+from utils.telemetry import get_metrics
+from utils.component_library import library_architecture_for, library_covers
+
+# ============================================
+# SPECULATIVE ARCHITECTURE
+# For prompts that match a known blueprint, an architecture is prepared
+# in parallel with the planner: "blueprint" derives it from the
+# blueprint's layout/state/events (no LLM call), "architect" runs the
+# architect on a blueprint stub plan. If the planner picks the same
+# blueprint the architect node uses it and skips its LLM call; otherwise
+# it is discarded. "off" keeps the strict planner -> architect chain.
+# ============================================
+SPECULATION_MODES = ("off", "blueprint", "architect")
+SPECULATION_MODE = os.getenv("AUTOSITE_SPECULATE", "off")
+
+_stats_lock = threading.Lock()
+_stats = {"hit": 0, "miss": 0, "none": 0}
+
+
+def configure_speculation(mode: str):
+    """
+    Sets the mode for graphs compiled from now on.
+    """
+    global SPECULATION_MODE
+    if mode not in SPECULATION_MODES:
+        raise ValueError(f"Unknown speculation mode '{mode}' (expected one of {', '.join(SPECULATION_MODES)})")
+    SPECULATION_MODE = mode
+
+def speculation_enabled() -> bool:
+    return SPECULATION_MODE != "off"
+
+def route_after_recall_speculative(state: AgentState):
+    """
+    Like route_after_recall, but runs the speculator next to the planner.
+    """
+    if route_after_recall(state) == "coder":
+        return "coder"
+    return ["planner", "speculate"]
+
+def guess_blueprint(user_prompt: str):
+    """
+    The blueprint the planner is most likely to pick: the top candidate
+    it will be offered. None for prompts with no candidate.
+    """
+    candidates = select_blueprints(user_prompt, classify_app_intent(user_prompt))
+    return next(iter(candidates), None)
+
+def blueprint_architecture(blueprint: dict) -> dict:
+    """
+    Architecture derived from a blueprint alone: one component per layout
+    entry, composed by src/App.jsx, which owns the blueprint state.
+    """
+    return {
+        "component_export_style": "default",
+        "entry": "src/main.jsx",
+        "router": "src/App.jsx",
+        "pages": [],
+        "components": [
+            {"name": name, "file": f"src/components/{name}.jsx", "props": []}
+            for name in blueprint.get("layout", [])
+        ],
+        "state": blueprint.get("state", []),
+        "events": blueprint.get("events", []),
+        "styles": ["src/index.css"],
+    }
+
+def _stub_plan(name: str, blueprint: dict, intent: str) -> dict:
+    return {
+        "app_name": name.replace("_", " ").title(),
+        "blueprint": name,
+        "features": blueprint.get("events", []),
+        "app_intent": intent,
+        "default_blueprint": DEFAULT_BLUEPRINTS.get(intent, DEFAULT_BLUEPRINTS["static_ui"]),
+    }
+
+def _prepare(state: AgentState):
+    """
+    Returns (blueprint name, stub plan) or (None, None) when there is
+    nothing to speculate on: no blueprint guess, a guess the component
+    library will assemble, or (in "blueprint" mode) a blueprint with no
+    layout.
+    """
+    name = guess_blueprint(state["user_prompt"])
+    blueprint = get_blueprints().get(name) if name else None
+    if blueprint is None:
+        return None, None
+    if library_covers(name, state["user_prompt"]):
+        # The architect will take the library architecture without a call
+        print(f"Not speculating: the component library covers '{name}'")
+        return None, None
+    if SPECULATION_MODE == "blueprint" and not blueprint.get("layout"):
+        # No layout to derive components from; an empty guess would
+        # skip the architect and leave the site without components
+        print(f"Not speculating: blueprint '{name}' has no layout")
+        return None, None
+    print(f"Speculating on blueprint '{name}' ({SPECULATION_MODE})")
+    return name, _stub_plan(name, blueprint, classify_app_intent(state["user_prompt"]))
+
+def _speculation(name: str, architecture: dict) -> AgentState:
+    return {"speculation": {"blueprint": name, "architecture": architecture, "source": SPECULATION_MODE}}
+
+def speculate_agent(state: AgentState) -> AgentState:
+    print("--- SPECULATOR ---")
+    name, plan = _prepare(state)
+    if name is None:
+        return {}
+    if SPECULATION_MODE == "blueprint":
+        return _speculation(name, blueprint_architecture(get_blueprints()[name]))
+    try:
+        architecture = invoke_routed(build_architect_messages({"plan": plan}), "architect",
+                                     plan["app_intent"], extract_json)
+    except Exception as e:
+        print(f"Speculative architect failed: {e}")
+        return {}
+    return _speculation(name, architecture)
+
+async def speculate_agent_async(state: AgentState) -> AgentState:
+    print("--- SPECULATOR (async) ---")
+    name, plan = _prepare(state)
+    if name is None:
+        return {}
+    if SPECULATION_MODE == "blueprint":
+        return _speculation(name, blueprint_architecture(get_blueprints()[name]))
+    try:
+        architecture = await ainvoke_routed(build_architect_messages({"plan": plan}), "architect",
+                                            plan["app_intent"], extract_json)
+    except Exception as e:
+        print(f"Speculative architect failed: {e}")
+        return {}
+    return _speculation(name, architecture)
+
+def take_speculation(state: AgentState):
+    """
+    Returns the speculative architecture when the plan chose the blueprint
+    it was built for, else None. Records hit/miss.
+    """
+    speculation = state.get("speculation")
+    if not speculation:
+        result = "none"
+    elif speculation["blueprint"] == state["plan"].get("blueprint"):
+        result = "hit"
+    else:
+        result = "miss"
+
+    get_metrics().inc("autosite_speculation_total", {"result": result})
+    with _stats_lock:
+        _stats[result] += 1
+    if result == "hit":
+        print(f"Speculation hit: using the {speculation['source']} architecture for '{speculation['blueprint']}'")
+        return speculation["architecture"]
+    if result == "miss":
+        print(f"Speculation miss: planner chose '{state['plan'].get('blueprint')}', "
+              f"not '{speculation['blueprint']}'; discarding")
+    return None
+
+def speculative_architect_agent(state: AgentState) -> AgentState:
+    """
+    Architect node of the speculative graph: joins the planner and the
+    speculator, and only calls the architect on a miss. A component
+    library match wins over both.
+    """
+    architecture = library_architecture_for(state)
+    if architecture is not None:
+        return {"architecture": architecture}
+    architecture = take_speculation(state)
+    if architecture is not None:
+        return {"architecture": architecture}
+    return architect_agent(state)
+
+async def speculative_architect_agent_async(state: AgentState) -> AgentState:
+    architecture = library_architecture_for(state)
+    if architecture is not None:
+        return {"architecture": architecture}
+    architecture = take_speculation(state)
+    if architecture is not None:
+        return {"architecture": architecture}
+    return await architect_agent_async(state)
+
+def speculation_summary() -> str:
+    with _stats_lock:
+        attempted = _stats["hit"] + _stats["miss"]
+        if not attempted:
+            return f"Speculation ({SPECULATION_MODE}): no speculative architectures this run"
+        rate = 100.0 * _stats["hit"] / attempted
+        return (f"Speculation ({SPECULATION_MODE}): {_stats['hit']}/{attempted} hits ({rate:.0f}%), "
+                f"{_stats['none']} prompt(s) without a blueprint guess")
@@ -1,9 +1,16 @@
 import os
 import json
+import hashlib
+import threading
 from langchain_core.messages import SystemMessage, HumanMessage
 from graph.state import AgentState
-from utils.llm_client import get_llm
+from utils.model_router import invoke_routed, ainvoke_routed
 from utils.parser import extract_json
+from utils.resources import get_prompt, get_blueprint
+from utils.jsx_lexer import analyze_source
+from utils.context_builder import compact_json
+from utils.telemetry import get_metrics
+from utils.dir_lock import dir_lock
 
 # ============================================
 # INTENT-AWARE VALIDATION RULES
@@ -39,9 +46,226 @@ VALIDATION_RULES = {
     }
 }
 
-def validator_agent(state: AgentState) -> AgentState:
-    print("--- VALIDATOR AGENT ---")
-    
+# ============================================
+# STATIC CONFIDENCE & FAST-PATH METRICS
+# The LLM validator only runs for intents that allow it AND when the
+# static engine's confidence falls below this threshold.
+# Confidence starts at 1.0 and loses 0.15 per warning and 0.1 each for a
+# plan without architecture files or without a blueprint, so at 0.75 the
+# LLM only sees sites with 2+ warnings, or 1 warning plus both plan
+# deductions: for most sites it is effectively off. validator_metrics.json
+# records the confidence of every decision and the LLM's verdict per
+# confidence, which is the data to calibrate against; since nothing at or
+# above the threshold is LLM-checked, sample it by raising the threshold
+# for a while (AUTOSITE_LLM_VALIDATION_THRESHOLD=1.01 checks every site).
+# ============================================
+LLM_VALIDATION_THRESHOLD = float(os.getenv("AUTOSITE_LLM_VALIDATION_THRESHOLD", "0.75"))
+METRICS_PATH = os.getenv("AUTOSITE_VALIDATOR_METRICS", os.path.join(".autosite-cache", "validator_metrics.json"))
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "..", "templates", "react-vite-tailwind")
+RESOLVE_EXTENSIONS = ["", ".jsx", ".js", ".tsx", ".ts", ".css", "/index.jsx", "/index.js"]
+
+_metrics_lock = threading.Lock()
+_metrics = {"fast_path": 0, "llm": 0, "static_fail": 0, "llm_pass": 0, "llm_fail": 0}
+
+def _template_files() -> set:
+    files = set()
+    for root, _, names in os.walk(TEMPLATE_DIR):
+        for name in names:
+            rel = os.path.relpath(os.path.join(root, name), TEMPLATE_DIR)
+            files.add(rel.replace(os.sep, "/"))
+    return files
+
+TEMPLATE_FILES = _template_files()
+
+def _update_metrics(mutate):
+    """
+    Applies mutate(totals) to the cumulative metrics file under the
+    cross-process lock, replacing the file atomically so concurrent runs
+    never read a half-written one. A file that cannot be parsed is left
+    alone rather than reset. Call with _metrics_lock held.
+    """
+    try:
+        with dir_lock(f"{METRICS_PATH}.lock"):
+            try:
+                with open(METRICS_PATH, "r", encoding="utf-8") as f:
+                    totals = json.load(f)
+            except FileNotFoundError:
+                totals = {}
+            except ValueError as e:
+                print(f"Not updating unreadable {METRICS_PATH}: {e}")
+                return
+            mutate(totals)
+            tmp_path = f"{METRICS_PATH}.tmp-{os.getpid()}"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(totals, f, indent=2)
+            os.replace(tmp_path, METRICS_PATH)
+    except OSError:
+        pass
+
+def _count_confidence(totals: dict, confidence: float, outcome: str):
+    bucket = totals.setdefault("by_confidence", {}).setdefault(f"{confidence:.2f}", {})
+    bucket[outcome] = bucket.get(outcome, 0) + 1
+
+def record_validation_path(path: str, confidence: float = None):
+    """
+    Counts how LLM-eligible validations were decided (and at which static
+    confidence), in-process and in a cumulative JSON file, so the fast-path
+    hit rate can be tracked over time.
+    """
+    get_metrics().inc("autosite_validation_path_total", {"path": path})
+
+    def count(totals):
+        totals[path] = totals.get(path, 0) + 1
+        if confidence is not None:
+            _count_confidence(totals, confidence, path)
+    with _metrics_lock:
+        _metrics[path] += 1
+        _update_metrics(count)
+
+def record_llm_verdict(confidence: float, status: str):
+    """
+    Counts the LLM validator's verdict at the static confidence it was run
+    for ("llm_pass" / "llm_fail" in by_confidence).
+    """
+    outcome = "llm_fail" if status == "fail" else "llm_pass"
+    with _metrics_lock:
+        _metrics[outcome] += 1
+        _update_metrics(lambda totals: _count_confidence(totals, confidence, outcome))
+
+def validator_metrics_summary() -> str:
+    with _metrics_lock:
+        decided = _metrics["fast_path"] + _metrics["llm"]
+        if not decided:
+            return "Validator fast path: no LLM-eligible validations this run"
+        rate = 100.0 * _metrics["fast_path"] / decided
+        checked = _metrics["llm_pass"] + _metrics["llm_fail"]
+        return (f"Validator fast path: {_metrics['fast_path']}/{decided} LLM-eligible validations "
+                f"({rate:.0f}%) skipped the LLM (threshold {LLM_VALIDATION_THRESHOLD}); "
+                f"{_metrics['static_fail']} failed statically, LLM failed {_metrics['llm_fail']}/{checked} it checked")
+
+def _content_hash(content: str) -> str:
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+def _is_component_file(path: str) -> bool:
+    return path.endswith(".jsx") or path.endswith(".tsx")
+
+def build_fact_table(code: dict) -> dict:
+    """
+    Lexes every component file once; all rules below read from this table.
+    """
+    return {
+        path: analyze_source(content)
+        for path, content in code.items()
+        if _is_component_file(path) and isinstance(content, str)
+    }
+
+def _package_name(source: str) -> str:
+    parts = source.split("/")
+    return "/".join(parts[:2]) if source.startswith("@") else parts[0]
+
+def _declared_packages(code: dict) -> set:
+    pkg_raw = code.get("package.json")
+    if pkg_raw is None:
+        with open(os.path.join(TEMPLATE_DIR, "package.json"), "r", encoding="utf-8") as f:
+            pkg_raw = f.read()
+    try:
+        pkg = json.loads(pkg_raw) if isinstance(pkg_raw, str) else pkg_raw
+    except ValueError:
+        return set()
+    return set(pkg.get("dependencies", {})) | set(pkg.get("devDependencies", {}))
+
+def _resolves(path: str, source: str, code: dict) -> bool:
+    base = os.path.dirname(path)
+    target = os.path.normpath(os.path.join(base, source)).replace(os.sep, "/")
+    return any(target + ext in code or target + ext in TEMPLATE_FILES for ext in RESOLVE_EXTENSIONS)
+
+def _load_blueprint_events(plan: dict) -> list:
+    name = plan.get("blueprint")
+    if not name or name == "custom":
+        return []
+    blueprint = get_blueprint(name)
+    return blueprint.get("events", []) if blueprint else []
+
+def cross_file_checks(code: dict, facts: dict, plan: dict, architecture: dict):
+    """
+    The checks validator_prompt.txt asks the LLM for, done statically:
+    imports resolve, JSX components are defined, architecture files exist,
+    blueprint events have handlers. Returns (errors, warnings, confidence)
+    where errors are (issue, fix, path) tuples.
+    """
+    errors = []
+    warnings = []
+    packages = _declared_packages(code)
+    imported_files = set()
+
+    # Missing imports / incorrect file references
+    for path, file_facts in facts.items():
+        imported_names = set()
+        for imp in file_facts["imports"]:
+            source = imp["source"]
+            if imp["default"]:
+                imported_names.add(imp["default"])
+            imported_names.update(imp["names"])
+            if source.startswith("."):
+                if _resolves(path, source, code):
+                    target = os.path.normpath(os.path.join(os.path.dirname(path), source)).replace(os.sep, "/")
+                    imported_files.add(target)
+                else:
+                    errors.append((f"{path}:{imp['line']}: import '{source}' does not resolve to a generated file",
+                                   f"Fix the import path in {path} or generate the missing file", path))
+            elif _package_name(source) not in packages:
+                errors.append((f"{path}:{imp['line']}: package '{_package_name(source)}' is not in package.json",
+                               f"Remove the '{source}' import from {path}", path))
+
+        undefined = file_facts["components_used"] - imported_names - file_facts["identifiers"] - {"React"}
+        for component in sorted(undefined):
+            errors.append((f"{path} uses <{component}> without importing it",
+                           f"Import {component} in {path}", path))
+
+    # Components referenced in the architecture exist
+    arch_files = []
+    for entry in (architecture.get("pages", []) or []) + (architecture.get("components", []) or []):
+        if isinstance(entry, dict) and isinstance(entry.get("file"), str) and entry["file"].startswith("src/"):
+            arch_files.append(entry["file"])
+    for arch_file in arch_files:
+        if arch_file not in code:
+            errors.append((f"Missing {arch_file} (listed in architecture)", f"Generate {arch_file}", arch_file))
+
+    # Blueprint events have handlers (fuzzy: addTodo matches handleAddTodo)
+    identifiers = set()
+    for file_facts in facts.values():
+        identifiers |= file_facts["identifiers"]
+    lowered = [i.lower() for i in identifiers]
+    for event in _load_blueprint_events(plan):
+        if not any(event.lower() in ident for ident in lowered):
+            warnings.append(f"No handler found for blueprint event '{event}'")
+
+    # Unused components
+    imported_stems = {os.path.splitext(f)[0] for f in imported_files}
+    for path in facts:
+        if path.startswith("src/components/") and os.path.splitext(path)[0] not in imported_stems:
+            warnings.append(f"{path} is never imported")
+
+    # Confidence drops for every soft finding and for unverifiable plans
+    confidence = 1.0 - 0.15 * len(warnings)
+    if not arch_files:
+        confidence -= 0.1
+    if plan.get("blueprint") in (None, "custom"):
+        confidence -= 0.1
+    return errors, warnings, max(0.0, round(confidence, 2))
+
+def static_validation(state: AgentState, validated_files: dict, record: bool = True):
+    """
+    Runs the rule-based checks against the per-file fact table and reports
+    every issue at once. Returns (update, confidence): the final
+    {"validation": ...} update, or None when the intent requires a
+    follow-up LLM validation pass, and the static confidence.
+    Per-file checks are skipped for files whose hash is in validated_files
+    (they passed before and are unchanged); files that pass are added to it.
+    record=False keeps the decision out of the validator metrics (library
+    self-checks are fixtures, not generated sites).
+    """
     code = state["code"]
     plan = state.get("plan", {})
     
@@ -50,137 +274,175 @@ def validator_agent(state: AgentState) -> AgentState:
     rules = VALIDATION_RULES.get(app_intent, VALIDATION_RULES["static_ui"])
     
     print(f"Validating for intent: {app_intent}")
-    
+
+    facts = build_fact_table(code)
+    issues = []
+    suggested_fixes = []
+    file_issues = {}
+
+    def fail(issue, fix, path=None):
+        print(f"Validation Failed: {issue}")
+        issues.append(issue)
+        if fix not in suggested_fixes:
+            suggested_fixes.append(fix)
+        if path:
+            file_issues.setdefault(path, []).append(issue)
+
     # ============================================
     # 1. Check for Critical Source Files (AI-generated only)
     # NOTE: package.json, vite.config.js, index.html are from template - DO NOT CHECK
     # ============================================
     if "src/App.jsx" not in code and "src/App.tsx" not in code:
-        print("Validation Failed: Missing src/App.jsx")
-        return {
-            "validation": {
-                "status": "fail",
-                "issues": ["Missing src/App.jsx"],
-                "suggested_fixes": ["Generate src/App.jsx"]
-            }
-        }
+        fail("Missing src/App.jsx", "Generate src/App.jsx", "src/App.jsx")
+
+    # Files the coder gave up on (still missing unless repair produced them)
+    for path, error in sorted((state.get("generation_errors") or {}).items()):
+        if path not in code:
+            fail(f"{path} was not generated: {error}", f"Generate {path}", path)
 
     # ============================================
-    # 2. Check for Export Style (Mandatory Default Exports)
+    # 2. Per-file Checks: Export Style (Mandatory Default Exports) and Syntax
     # ============================================
-    for path, content in code.items():
-        if path.endswith(".jsx") or path.endswith(".tsx"):
-            if "export default" not in content:
-                print(f"Validation Failed: {path} does not use export default")
-                return {
-                    "validation": {
-                        "status": "fail",
-                        "issues": [f"{path} does not use export default"],
-                        "suggested_fixes": [f"Change {path} to use export default"]
-                    }
-                }
-            if "export {" in content:
-                print(f"Validation Failed: {path} uses named exports")
-                return {
-                    "validation": {
-                        "status": "fail",
-                        "issues": [f"{path} uses named exports (forbidden)"],
-                        "suggested_fixes": [f"Change {path} to use export default"]
-                    }
-                }
-            # Syntax Check: Unmatched Braces
-            if content.count("{") != content.count("}"):
-                print(f"Validation Failed: {path} has unmatched braces")
-                return {
-                    "validation": {
-                        "status": "fail",
-                        "issues": [f"{path} has unmatched braces (syntax error)"],
-                        "suggested_fixes": [f"Fix syntax in {path}"]
-                    }
-                }
+    for path, file_facts in facts.items():
+        digest = _content_hash(code[path])
+        if validated_files.get(path) == digest:
+            continue  # Unchanged since it last passed
+
+        if not file_facts["exports"]["default"]:
+            fail(f"{path} does not use export default", f"Change {path} to use export default", path)
+        if file_facts["exports"]["named"]:
+            fail(f"{path} uses named exports (forbidden)", f"Change {path} to use export default", path)
+        for error in file_facts["errors"]:
+            fail(f"{path}:{error['line']}: {error['message']} (syntax error)", f"Fix syntax in {path}", path)
+
+        if path not in file_issues:
+            validated_files[path] = digest
 
     # ============================================
-    # 3. Tailwind Usage (Always Required)
+    # 3. Cross-file Checks (imports, architecture, blueprint events)
     # ============================================
-    combined_code = "".join([content for filename, content in code.items() if filename.endswith(".jsx") or filename.endswith(".tsx")])
-    
-    if rules["require_tailwind"]:
-        if "className=" not in combined_code:
-            print("Validation Failed: No Tailwind classes found — UI not styled")
-            return {
-                "validation": {
-                    "status": "fail",
-                    "issues": ["No Tailwind classes found — UI not styled"],
-                    "suggested_fixes": ["Add className attributes with Tailwind classes"]
-                }
-            }
+    cross_errors, warnings, confidence = cross_file_checks(code, facts, plan, state.get("architecture") or {})
+    for issue, fix, path in cross_errors:
+        fail(issue, fix, path)
 
-        if "bg-" not in combined_code and "flex" not in combined_code and "grid" not in combined_code:
-            print("Validation Failed: Layout and background styles missing")
-            return {
-                "validation": {
-                    "status": "fail",
-                    "issues": ["Layout and background styles missing (no bg-, flex, or grid classes)"],
-                    "suggested_fixes": ["Add layout (flex/grid) and background colors"]
-                }
-            }
+    # ============================================
+    # 4. Tailwind Usage (Always Required)
+    # ============================================
+    class_names = set()
+    hooks = set()
+    handlers = set()
+    calls = set()
+    for file_facts in facts.values():
+        class_names |= file_facts["class_names"]
+        hooks |= file_facts["hooks"]
+        handlers |= file_facts["handlers"]
+        calls |= file_facts["calls"]
+
+    if rules["require_tailwind"]:
+        if not class_names:
+            fail("No Tailwind classes found — UI not styled",
+                 "Add className attributes with Tailwind classes")
+        elif not any(c.startswith("bg-") or "flex" in c or "grid" in c for c in class_names):
+            fail("Layout and background styles missing (no bg-, flex, or grid classes)",
+                 "Add layout (flex/grid) and background colors")
 
     # ============================================
-    # 4. Intent-Specific Logic Checks
+    # 5. Intent-Specific Logic Checks
     # ============================================
-    if rules["require_useState"] and "useState" not in combined_code:
-        print(f"Validation Failed: {app_intent} app requires useState")
-        return {
-            "validation": {
-                "status": "fail",
-                "issues": [f"{app_intent} app requires useState for state management"],
-                "suggested_fixes": ["Add useState hooks for managing state"]
-            }
-        }
+    if rules["require_useState"] and "useState" not in hooks:
+        fail(f"{app_intent} app requires useState for state management",
+             "Add useState hooks for managing state")
 
-    if rules["require_onClick"] and "onClick" not in combined_code:
-        print(f"Validation Failed: {app_intent} app requires onClick handlers")
-        return {
-            "validation": {
-                "status": "fail",
-                "issues": [f"{app_intent} app requires onClick handlers for interactivity"],
-                "suggested_fixes": ["Add onClick handlers to interactive elements"]
-            }
-        }
+    if rules["require_onClick"] and "onClick" not in handlers:
+        fail(f"{app_intent} app requires onClick handlers for interactivity",
+             "Add onClick handlers to interactive elements")
+
+    if rules["require_map"] and "map" not in calls:
+        fail(f"{app_intent} app requires map() for rendering lists",
+             "Use map() to render lists of items")
 
-    if rules["require_map"] and "map(" not in combined_code and ".map(" not in combined_code:
-        print(f"Validation Failed: {app_intent} app requires map() for rendering lists")
+    if issues:
+        if record and not rules["skip_llm_validation"]:
+            record_validation_path("static_fail")
         return {
             "validation": {
                 "status": "fail",
-                "issues": [f"{app_intent} app requires map() for rendering lists"],
-                "suggested_fixes": ["Use map() to render lists of items"]
+                "issues": issues,
+                "suggested_fixes": suggested_fixes,
+                "file_issues": file_issues,
+                "warnings": warnings,
+                "confidence": confidence
             }
-        }
+        }, confidence
 
     # ============================================
-    # 5. Skip LLM Validation for Simple Apps
+    # 6. Skip LLM Validation for Simple Apps or High Static Confidence
     # ============================================
     if rules["skip_llm_validation"]:
         print(f"Skipping LLM validation for {app_intent} app — all checks passed.")
-        return {"validation": {"status": "pass", "issues": [], "suggested_fixes": {}}}
+        return {"validation": {"status": "pass", "issues": [], "suggested_fixes": {}, "warnings": warnings, "confidence": confidence}}, confidence
 
-    # ============================================
-    # 6. LLM-based Validation (Only for Complex Apps)
-    # ============================================
-    prompt_path = os.path.join(os.path.dirname(__file__), "..", "prompts", "validator_prompt.txt")
-    with open(prompt_path, "r") as f:
-        system_prompt = f.read()
+    if confidence >= LLM_VALIDATION_THRESHOLD:
+        if record:
+            record_validation_path("fast_path", confidence)
+        print(f"Skipping LLM validation — static confidence {confidence} >= {LLM_VALIDATION_THRESHOLD}.")
+        return {"validation": {"status": "pass", "issues": [], "suggested_fixes": {}, "warnings": warnings, "confidence": confidence}}, confidence
+
+    if record:
+        record_validation_path("llm", confidence)
+    print(f"Static confidence {confidence} < {LLM_VALIDATION_THRESHOLD}; running LLM validation. Warnings: {warnings}")
+    return None, confidence
+
+# ============================================
+# 7. LLM-based Validation (Only for Complex Apps with Low Static Confidence)
+# ============================================
+def build_validator_messages(state: AgentState):
+    plan = state.get("plan", {})
+    code = state["code"]
+
+    system_prompt = get_prompt("validator_prompt.txt")
 
-    llm = get_llm()
     messages = [
         SystemMessage(content=system_prompt),
-        HumanMessage(content=f"Project Plan: {json.dumps(plan, indent=2)}\n\nGenerated Code: {json.dumps(code, indent=2)}")
+        HumanMessage(content=f"Project Plan: {compact_json(plan)}\n\nGenerated Code: {compact_json(code)}")
     ]
-    
-    response = llm.invoke(messages)
-    validation_result = extract_json(response.content)
-    
+    return messages
+
+def finish_validation(response_text: str, code: dict) -> AgentState:
+    validation_result = extract_json(response_text)
     print(f"Validation Status: {validation_result.get('status')}")
-    
+
+    # Map free-text issues back to the files they mention so repair can target them
+    if validation_result.get("status") == "fail" and "file_issues" not in validation_result:
+        file_issues = {}
+        for issue in validation_result.get("issues", []):
+            for path in code:
+                if isinstance(issue, str) and path in issue:
+                    file_issues.setdefault(path, []).append(issue)
+        validation_result["file_issues"] = file_issues
+
     return {"validation": validation_result}
+
+def validator_agent(state: AgentState) -> AgentState:
+    print("--- VALIDATOR AGENT ---")
+    validated_files = dict(state.get("validated_files") or {})
+    result, confidence = static_validation(state, validated_files)
+    if result is None:
+        intent = state.get("plan", {}).get("app_intent")
+        result = invoke_routed(build_validator_messages(state), "validator", intent,
+                               lambda text: finish_validation(text, state["code"]))
+        record_llm_verdict(confidence, result["validation"].get("status"))
+    result["validated_files"] = validated_files
+    return result
+
+async def validator_agent_async(state: AgentState) -> AgentState:
+    print("--- VALIDATOR AGENT (async) ---")
+    validated_files = dict(state.get("validated_files") or {})
+    result, confidence = static_validation(state, validated_files)
+    if result is None:
+        intent = state.get("plan", {}).get("app_intent")
+        result = await ainvoke_routed(build_validator_messages(state), "validator", intent,
+                                      lambda text: finish_validation(text, state["code"]))
+        record_llm_verdict(confidence, result["validation"].get("status"))
+    result["validated_files"] = validated_files
+    return result
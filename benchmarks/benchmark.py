@@ -0,0 +1,215 @@
+"""
+Offline end-to-end benchmark for the generation pipeline.
+
+Runs the requests.jsonl prompts plus one prompt per blueprint through the
+compiled graph on the fake (or replay) LLM backend, at several concurrency
+levels, and writes per-node latency, parser/bootstrap/write times and
+throughput as JSON. No network access is needed.
+
+    python benchmarks/benchmark.py --concurrency 1,4,8 --latency-ms 300 --tokens-per-sec 400
+    python benchmarks/benchmark.py --baseline benchmarks/results/baseline.json   # exit 1 on regression
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT_DIR)
+
+import main  # noqa: E402
+from utils import fake_llm  # noqa: E402
+from utils.llm_cache import get_cache  # noqa: E402
+from utils.llm_client import configure_backend  # noqa: E402
+from utils.parser import extract_json  # noqa: E402
+from utils.resources import get_blueprints  # noqa: E402
+from utils.plan_index import get_plan_index  # noqa: E402
+from utils.checkpoints import configure_checkpoints  # noqa: E402
+from utils.component_library import configure_library  # noqa: E402
+from utils.context_builder import compact_json  # noqa: E402
+
+DEFAULT_REQUESTS = os.path.join(ROOT_DIR, "requests.jsonl")
+DEFAULT_OUTPUT = os.path.join(ROOT_DIR, "benchmarks", "results", "latest.json")
+
+
+def build_workload(requests_path: str, limit: int = None) -> list:
+    jobs = main.load_batch(requests_path) if os.path.exists(requests_path) else []
+    if limit is not None:
+        jobs = jobs[:limit]
+    for name in get_blueprints():
+        jobs.append({"id": f"blueprint-{name}", "prompt": f"Build a {name.replace('_', ' ')} app"})
+    return jobs
+
+def _percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+def _describe(values: list) -> dict:
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean": round(statistics.fmean(values), 4),
+        "p50": round(_percentile(values, 50), 4),
+        "p95": round(_percentile(values, 95), 4),
+        "max": round(max(values), 4),
+    }
+
+def run_job(app, job: dict) -> dict:
+    """
+    Generates one site; node latencies are the gaps between node starts
+    reported by the streamed graph.
+    """
+    starts = []
+    began = time.perf_counter()
+    try:
+        record, result = main.generate_site(job["prompt"], app,
+                                            on_node=lambda name: starts.append((name, time.perf_counter())))
+    except Exception as e:
+        return {"id": job["id"], "status": "error", "error": str(e), "nodes": {}, "timings": {}}
+
+    graph_end = began + record["timings"].get("graph", 0.0)
+    nodes = {}
+    for i, (name, start) in enumerate(starts):
+        end = starts[i + 1][1] if i + 1 < len(starts) else graph_end
+        nodes.setdefault(name, []).append(end - start)
+
+    # Parser cost on a coder-sized response for this site
+    parser_seconds = None
+    if result.get("code"):
+        payload = compact_json(result["code"])
+        parse_started = time.perf_counter()
+        extract_json(payload)
+        parser_seconds = time.perf_counter() - parse_started
+
+    return {
+        "id": job["id"],
+        "status": record["status"],
+        "validation_status": record.get("validation_status"),
+        "nodes": nodes,
+        "timings": record["timings"],
+        "parser": parser_seconds,
+    }
+
+def run_level(app, jobs: list, concurrency: int) -> dict:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda job: run_job(app, job), jobs))
+    wall = time.perf_counter() - started
+
+    per_node = {}
+    for result in results:
+        for name, durations in result["nodes"].items():
+            per_node.setdefault(name, []).extend(durations)
+
+    def timing(key):
+        return [r["timings"][key] for r in results if key in r["timings"]]
+
+    succeeded = sum(1 for r in results if r["status"] == "ok")
+    return {
+        "concurrency": concurrency,
+        "sites": len(results),
+        "succeeded": succeeded,
+        "wall_seconds": round(wall, 3),
+        "throughput_sites_per_sec": round(len(results) / wall, 4) if wall else 0.0,
+        "site_latency": _describe(timing("total")),
+        "graph": _describe(timing("graph")),
+        "nodes": {name: _describe(durations) for name, durations in sorted(per_node.items())},
+        "parser": _describe([r["parser"] for r in results if r.get("parser") is not None]),
+        "bootstrap": _describe(timing("bootstrap")),
+        "write": _describe(timing("write")),
+        "errors": [{"id": r["id"], "error": r["error"]} for r in results if r["status"] == "error"],
+    }
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Returns the concurrency levels whose throughput fell more than
+    `tolerance` (a fraction) below the baseline.
+    """
+    regressions = []
+    previous = {level["concurrency"]: level for level in baseline.get("levels", [])}
+    for level in report["levels"]:
+        before = previous.get(level["concurrency"])
+        if not before:
+            continue
+        floor = before["throughput_sites_per_sec"] * (1.0 - tolerance)
+        if level["throughput_sites_per_sec"] < floor:
+            regressions.append(f"concurrency {level['concurrency']}: {level['throughput_sites_per_sec']} sites/s "
+                               f"< {floor:.4f} (baseline {before['throughput_sites_per_sec']})")
+    return regressions
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Autosite offline pipeline benchmark")
+    parser.add_argument("--requests", default=DEFAULT_REQUESTS, help="JSONL prompts (requests.jsonl shape)")
+    parser.add_argument("--limit", type=int, help="Use only the first N prompts from --requests")
+    parser.add_argument("--concurrency", default="1,2,4,8", help="Comma-separated concurrency levels")
+    parser.add_argument("--backend", choices=["fake", "replay"], default="fake")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated time to first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=0.0, help="Simulated generation rate (0 = instant)")
+    parser.add_argument("--max-output-tokens", type=int, default=0, help="Simulated output limit per response (0 = none)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write the JSON report")
+    parser.add_argument("--baseline", help="Previous report; exit 1 if throughput regresses")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed throughput drop vs the baseline")
+    parser.add_argument("--keep-sites", action="store_true", help="Keep the generated sites")
+    args = parser.parse_args()
+
+    fake_llm.configure_pacing(args.latency_ms, args.tokens_per_sec, args.max_output_tokens)
+    configure_backend(args.backend)
+    get_cache().enabled = False
+    get_plan_index().enabled = False
+    configure_checkpoints(False)
+    configure_library(False)
+    main.INSTALL_SETTINGS["enabled"] = False
+    main.BASE_DIR = tempfile.mkdtemp(prefix="autosite-bench-")
+
+    jobs = build_workload(args.requests, args.limit)
+    levels = [max(1, int(c)) for c in args.concurrency.split(",") if c.strip()]
+    print(f"Benchmarking {len(jobs)} prompts on the {args.backend} backend at concurrency {levels}")
+
+    compile_started = time.perf_counter()
+    app = main.create_graph()
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "backend": args.backend,
+        "latency_ms": args.latency_ms,
+        "tokens_per_sec": args.tokens_per_sec,
+        "max_output_tokens": args.max_output_tokens,
+        "prompts": len(jobs),
+        "graph_compile_seconds": round(time.perf_counter() - compile_started, 3),
+        "levels": [],
+    }
+
+    try:
+        for concurrency in levels:
+            level = run_level(app, jobs, concurrency)
+            report["levels"].append(level)
+            print(f"concurrency {concurrency}: {level['succeeded']}/{level['sites']} ok, "
+                  f"{level['throughput_sites_per_sec']} sites/s, p95 {level['site_latency'].get('p95')}s")
+    finally:
+        if not args.keep_sites:
+            shutil.rmtree(main.BASE_DIR, ignore_errors=True)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -1,24 +1,83 @@
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
 from graph.state import AgentState
-from agents.planner import planner_agent
-from agents.architect import architect_agent
-from agents.coder import coder_agent
-from agents.validator import validator_agent
+from utils.telemetry import instrument_node, instrument_node_async
+from agents.recall import recall_agent, recall_agent_async, route_after_recall
+from agents.planner import planner_agent, planner_agent_async
+from agents.architect import architect_agent, architect_agent_async
+from agents.coder import coder_agent, coder_agent_async
+from agents.validator import validator_agent, validator_agent_async
+from agents.speculator import (speculation_enabled, route_after_recall_speculative, speculate_agent,
+                               speculate_agent_async, speculative_architect_agent,
+                               speculative_architect_agent_async)
+from agents.editor import editor_agent, editor_agent_async
+from agents.repair import repair_agent, repair_agent_async, route_after_validation
 
-def create_graph():
+def _node(name, func, afunc):
+    """
+    Wraps a sync/async agent pair so the compiled graph serves both
+    app.invoke/stream and app.ainvoke/astream. Each run is traced
+    (see utils/telemetry.py).
+    """
+    return RunnableLambda(instrument_node(name, func), afunc=instrument_node_async(name, afunc), name=name)
+
+def create_graph(checkpointer=None):
+    """
+    With a checkpointer (utils/checkpoints.py), state is persisted after
+    every node under config["configurable"]["thread_id"]. With speculation
+    on (agents/speculator.py), the speculator runs next to the planner and
+    the architect waits for both.
+    """
+    speculative = speculation_enabled()
     workflow = StateGraph(AgentState)
 
     # Add nodes
-    workflow.add_node("planner", planner_agent)
-    workflow.add_node("architect", architect_agent)
-    workflow.add_node("coder", coder_agent)
-    workflow.add_node("validator", validator_agent)
+    workflow.add_node("recall", _node("recall", recall_agent, recall_agent_async))
+    workflow.add_node("planner", _node("planner", planner_agent, planner_agent_async))
+    if speculative:
+        workflow.add_node("speculate", _node("speculate", speculate_agent, speculate_agent_async))
+        workflow.add_node("architect", _node("architect", speculative_architect_agent,
+                                             speculative_architect_agent_async))
+    else:
+        workflow.add_node("architect", _node("architect", architect_agent, architect_agent_async))
+    workflow.add_node("coder", _node("coder", coder_agent, coder_agent_async))
+    workflow.add_node("validator", _node("validator", validator_agent, validator_agent_async))
+    workflow.add_node("repair", _node("repair", repair_agent, repair_agent_async))
 
     # Define edges
-    workflow.set_entry_point("planner")
-    workflow.add_edge("planner", "architect")
+    # Near-duplicate prompts reuse a stored plan/architecture (utils/plan_index.py)
+    workflow.set_entry_point("recall")
+    if speculative:
+        workflow.add_conditional_edges("recall", route_after_recall_speculative,
+                                       {"planner": "planner", "speculate": "speculate", "coder": "coder"})
+        workflow.add_edge(["planner", "speculate"], "architect")
+    else:
+        workflow.add_conditional_edges("recall", route_after_recall, {"planner": "planner", "coder": "coder"})
+        workflow.add_edge("planner", "architect")
     workflow.add_edge("architect", "coder")
     workflow.add_edge("coder", "validator")
-    workflow.add_edge("validator", END)
+    # Failed files go to targeted repair, then back through validation
+    workflow.add_conditional_edges("validator", route_after_validation, {"repair": "repair", "end": END})
+    workflow.add_edge("repair", "validator")
+
+    return workflow.compile(checkpointer=checkpointer)
+
+
+def create_update_graph():
+    """
+    Applies a change request to an existing site: the editor rewrites the
+    affected files, then the usual validation/repair loop runs. Files that
+    passed validation before and are unchanged are not re-checked.
+    """
+    workflow = StateGraph(AgentState)
+
+    workflow.add_node("editor", _node("editor", editor_agent, editor_agent_async))
+    workflow.add_node("validator", _node("validator", validator_agent, validator_agent_async))
+    workflow.add_node("repair", _node("repair", repair_agent, repair_agent_async))
+
+    workflow.set_entry_point("editor")
+    workflow.add_edge("editor", "validator")
+    workflow.add_conditional_edges("validator", route_after_validation, {"repair": "repair", "end": END})
+    workflow.add_edge("repair", "validator")
 
     return workflow.compile()
@@ -1,8 +1,19 @@
-from typing import TypedDict, Dict, Any, Optional
+from typing import TypedDict, Dict, Any, List, Optional
 
-class AgentState(TypedDict):
+class AgentState(TypedDict, total=False):
     user_prompt: str
+    # Follow-up change for an existing site (main.py --update)
+    change_request: str
     plan: Dict[str, Any]
     architecture: Dict[str, Any]
     code: Dict[str, str]  # Filename -> Content
+    generation_errors: Dict[str, str]  # Filename -> why the coder gave up on it
     validation: Dict[str, Any]
+    # Repair loop bookkeeping
+    validated_files: Dict[str, str]  # Filename -> content hash that passed per-file checks
+    repair_attempts: int
+    repair_log: List[Dict[str, Any]]
+    # Architecture prepared in parallel with the planner (agents/speculator.py)
+    speculation: Dict[str, Any]
+    # Set when the plan/architecture came from the reuse index
+    reused_from: Dict[str, Any]
@@ -0,0 +1,53 @@
+import { useState } from 'react';
+import ExpenseForm from './components/ExpenseForm';
+import SummaryCard from './components/SummaryCard';
+import ExpenseList from './components/ExpenseList';
+import site from './siteConfig';
+
+export default function App() {
+  const [expenses, setExpenses] = useState(site.data.expenses);
+  const [amount, setAmount] = useState('');
+  const [category, setCategory] = useState(site.data.categories[0]);
+
+  const addExpense = () => {
+    const value = parseFloat(amount);
+    if (!value || value <= 0) return;
+    setExpenses([...expenses, { id: Date.now(), amount: value, category }]);
+    setAmount('');
+  };
+
+  const deleteExpense = (id) => {
+    setExpenses(expenses.filter((expense) => expense.id !== id));
+  };
+
+  const total = expenses.reduce((sum, expense) => sum + expense.amount, 0);
+
+  return (
+    <div className="min-h-screen bg-gray-100 p-6 flex justify-center">
+      <div className="w-full max-w-3xl grid gap-4 md:grid-cols-2">
+        <header className="md:col-span-2 flex flex-col gap-1">
+          <h1 className="text-3xl font-bold text-gray-800">{site.title}</h1>
+          <p className="text-gray-500">{site.tagline}</p>
+        </header>
+        <ExpenseForm
+          amount={amount}
+          category={category}
+          categories={site.data.categories}
+          onAmount={setAmount}
+          onCategory={setCategory}
+          onAdd={addExpense}
+        />
+        <SummaryCard
+          total={total}
+          count={expenses.length}
+          currency={site.data.currency}
+          expenses={expenses}
+          categories={site.data.categories}
+        />
+        <div className="md:col-span-2">
+          <ExpenseList expenses={expenses} currency={site.data.currency} onDelete={deleteExpense} />
+        </div>
+      </div>
+    </div>
+  );
+}
@@ -0,0 +1,30 @@
+export default function ExpenseForm({ amount, category, categories, onAmount, onCategory, onAdd }) {
+  return (
+    <section className="bg-white rounded-lg shadow p-4 flex flex-col gap-3">
+      <h2 className="text-lg font-semibold text-gray-800">Add Expense</h2>
+      <input
+        type="number"
+        min="0"
+        step="0.01"
+        value={amount}
+        onChange={(event) => onAmount(event.target.value)}
+        placeholder="Amount"
+        className="border border-gray-300 rounded px-3 py-2 focus:outline-none focus:ring-2 focus:ring-@@accent@@-500"
+      />
+      <select
+        value={category}
+        onChange={(event) => onCategory(event.target.value)}
+        className="border border-gray-300 rounded px-3 py-2 bg-white"
+      >
+        {categories.map((name) => (
+          <option key={name} value={name} className="text-gray-800">
+            {name}
+          </option>
+        ))}
+      </select>
+      <button onClick={onAdd} className="bg-@@accent@@-600 hover:bg-@@accent@@-700 text-white rounded px-4 py-2">
+        Add Expense
+      </button>
+    </section>
+  );
+}
@@ -0,0 +1,26 @@
+export default function ExpenseList({ expenses, currency, onDelete }) {
+  return (
+    <section className="bg-white rounded-lg shadow p-4 flex flex-col gap-2">
+      <h2 className="text-lg font-semibold text-gray-800">Expenses</h2>
+      {expenses.length === 0 ? (
+        <p className="text-gray-500 text-sm">No expenses yet.</p>
+      ) : (
+        <ul className="divide-y divide-gray-100">
+          {expenses.map((expense) => (
+            <li key={expense.id} className="flex items-center justify-between py-2">
+              <span className="text-gray-700">{expense.category}</span>
+              <div className="flex items-center gap-3">
+                <span className="font-medium text-gray-800">
+                  {currency}{expense.amount.toFixed(2)}
+                </span>
+                <button onClick={() => onDelete(expense.id)} className="text-red-500 hover:text-red-700 text-sm">
+                  Delete
+                </button>
+              </div>
+            </li>
+          ))}
+        </ul>
+      )}
+    </section>
+  );
+}
@@ -0,0 +1,24 @@
+export default function SummaryCard({ total, count, currency, expenses, categories }) {
+  const totalFor = (name) =>
+    expenses.filter((expense) => expense.category === name).reduce((sum, expense) => sum + expense.amount, 0);
+
+  return (
+    <section className="bg-@@accent@@-600 text-white rounded-lg shadow p-4 flex flex-col gap-3">
+      <h2 className="text-lg font-semibold">Total Expenses</h2>
+      <p className="text-4xl font-bold">
+        {currency}{total.toFixed(2)}
+      </p>
+      <p className="text-sm text-@@accent@@-100">{count} expense(s)</p>
+      <ul className="grid grid-cols-2 gap-1 text-sm">
+        {categories.map((name) => (
+          <li key={name} className="flex justify-between gap-2">
+            <span className="text-@@accent@@-100">{name}</span>
+            <span className="font-medium">
+              {currency}{totalFor(name).toFixed(2)}
+            </span>
+          </li>
+        ))}
+      </ul>
+    </section>
+  );
+}
@@ -0,0 +1,69 @@
+import { useState } from 'react';
+import Display from './components/Display';
+import ButtonGrid from './components/ButtonGrid';
+import site from './siteConfig';
+
+const OPERATIONS = {
+  '+': (a, b) => a + b,
+  '-': (a, b) => a - b,
+  '×': (a, b) => a * b,
+  '÷': (a, b) => a / b,
+};
+
+export default function App() {
+  const [currentValue, setCurrentValue] = useState('0');
+  const [previousValue, setPreviousValue] = useState(null);
+  const [operator, setOperator] = useState(null);
+  const [fresh, setFresh] = useState(false);
+
+  const compute = () => {
+    const result = OPERATIONS[operator](parseFloat(previousValue), parseFloat(currentValue));
+    return Number.isFinite(result) ? String(parseFloat(result.toFixed(10))) : 'Error';
+  };
+
+  const onNumber = (digit) => {
+    if (fresh || currentValue === '0' || currentValue === 'Error') {
+      setCurrentValue(digit === '.' ? '0.' : digit);
+      setFresh(false);
+    } else if (digit !== '.' || !currentValue.includes('.')) {
+      setCurrentValue(currentValue + digit);
+    }
+  };
+
+  const onOperator = (nextOperator) => {
+    if (operator && previousValue !== null && !fresh) {
+      const result = compute();
+      setCurrentValue(result);
+      setPreviousValue(result);
+    } else {
+      setPreviousValue(currentValue);
+    }
+    setOperator(nextOperator);
+    setFresh(true);
+  };
+
+  const onEquals = () => {
+    if (!operator || previousValue === null) return;
+    setCurrentValue(compute());
+    setPreviousValue(null);
+    setOperator(null);
+    setFresh(true);
+  };
+
+  const onClear = () => {
+    setCurrentValue('0');
+    setPreviousValue(null);
+    setOperator(null);
+    setFresh(false);
+  };
+
+  return (
+    <div className="min-h-screen bg-gray-900 flex items-center justify-center p-6">
+      <div className="w-full max-w-xs bg-gray-800 rounded-2xl shadow-xl p-4 flex flex-col gap-4">
+        <h1 className="text-center text-lg font-semibold text-@@accent@@-300">{site.title}</h1>
+        <Display value={currentValue} expression={operator && previousValue !== null ? previousValue + ' ' + operator : ''} />
+        <ButtonGrid onNumber={onNumber} onOperator={onOperator} onEquals={onEquals} onClear={onClear} />
+      </div>
+    </div>
+  );
+}
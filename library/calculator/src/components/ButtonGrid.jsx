@@ -0,0 +1,31 @@
+const KEYS = ['7', '8', '9', '÷', '4', '5', '6', '×', '1', '2', '3', '-', '0', '.', '=', '+'];
+const OPERATORS = ['÷', '×', '-', '+'];
+
+export default function ButtonGrid({ onNumber, onOperator, onEquals, onClear }) {
+  const press = (key) => {
+    if (key === '=') {
+      onEquals();
+    } else if (OPERATORS.includes(key)) {
+      onOperator(key);
+    } else {
+      onNumber(key);
+    }
+  };
+
+  return (
+    <div className="grid grid-cols-4 gap-2">
+      <button onClick={onClear} className="col-span-4 bg-red-500 hover:bg-red-600 text-white font-semibold rounded-lg py-3">
+        Clear
+      </button>
+      {KEYS.map((key) => (
+        <button
+          key={key}
+          onClick={() => press(key)}
+          className={OPERATORS.includes(key) || key === '=' ? 'bg-@@accent@@-500 hover:bg-@@accent@@-600 text-white text-xl rounded-lg py-3' : 'bg-gray-700 hover:bg-gray-600 text-white text-xl rounded-lg py-3'}
+        >
+          {key}
+        </button>
+      ))}
+    </div>
+  );
+}
@@ -0,0 +1,8 @@
+export default function Display({ value, expression }) {
+  return (
+    <div className="bg-gray-900 rounded-lg p-4 flex flex-col items-end gap-1">
+      <span className="text-sm text-gray-400 h-5">{expression}</span>
+      <span className="text-4xl font-mono text-white break-all">{value}</span>
+    </div>
+  );
+}
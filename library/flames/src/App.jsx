@@ -0,0 +1,63 @@
+import { useState } from 'react';
+import NameForm from './components/NameForm';
+import ResultCard from './components/ResultCard';
+import site from './siteConfig';
+
+const isLetter = (ch) => ch >= 'a' && ch <= 'z';
+
+function flamesResult(first, second) {
+  const a = first.toLowerCase().split('').filter(isLetter);
+  const b = second.toLowerCase().split('').filter(isLetter);
+  for (let i = a.length - 1; i >= 0; i -= 1) {
+    const match = b.indexOf(a[i]);
+    if (match !== -1) {
+      a.splice(i, 1);
+      b.splice(match, 1);
+    }
+  }
+
+  const count = a.length + b.length;
+  if (count === 0) return null;
+  const letters = [...site.data.flamesValues];
+  let index = 0;
+  while (letters.length > 1) {
+    index = (index + count - 1) % letters.length;
+    letters.splice(index, 1);
+  }
+  return letters[0];
+}
+
+export default function App() {
+  const [name1, setName1] = useState('');
+  const [name2, setName2] = useState('');
+  const [result, setResult] = useState(null);
+
+  const calculate = () => {
+    if (!name1.trim() || !name2.trim()) return;
+    setResult(flamesResult(name1, name2) || 'Same names');
+  };
+
+  const reset = () => {
+    setName1('');
+    setName2('');
+    setResult(null);
+  };
+
+  return (
+    <div className="min-h-screen bg-gradient-to-br from-@@accent@@-100 to-white flex items-center justify-center p-6">
+      <div className="w-full max-w-md flex flex-col gap-4">
+        <h1 className="text-3xl font-bold text-center text-@@accent@@-700">{site.title}</h1>
+        <p className="text-center text-gray-600">{site.tagline}</p>
+        <NameForm
+          name1={name1}
+          name2={name2}
+          onName1={setName1}
+          onName2={setName2}
+          onCalculate={calculate}
+          onReset={reset}
+        />
+        {result && <ResultCard result={result} name1={name1} name2={name2} />}
+      </div>
+    </div>
+  );
+}
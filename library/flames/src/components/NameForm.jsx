@@ -0,0 +1,26 @@
+export default function NameForm({ name1, name2, onName1, onName2, onCalculate, onReset }) {
+  return (
+    <div className="bg-white rounded-lg shadow p-4 flex flex-col gap-3">
+      <input
+        value={name1}
+        onChange={(event) => onName1(event.target.value)}
+        placeholder="Your name"
+        className="border border-gray-300 rounded px-3 py-2 focus:outline-none focus:ring-2 focus:ring-@@accent@@-400"
+      />
+      <input
+        value={name2}
+        onChange={(event) => onName2(event.target.value)}
+        placeholder="Their name"
+        className="border border-gray-300 rounded px-3 py-2 focus:outline-none focus:ring-2 focus:ring-@@accent@@-400"
+      />
+      <div className="flex gap-2">
+        <button onClick={onCalculate} className="flex-1 bg-@@accent@@-600 hover:bg-@@accent@@-700 text-white rounded px-4 py-2">
+          Calculate
+        </button>
+        <button onClick={onReset} className="bg-gray-100 hover:bg-gray-200 text-gray-700 rounded px-4 py-2">
+          Reset
+        </button>
+      </div>
+    </div>
+  );
+}
@@ -0,0 +1,10 @@
+export default function ResultCard({ result, name1, name2 }) {
+  return (
+    <div className="bg-white rounded-lg shadow p-6 flex flex-col items-center gap-2">
+      <p className="text-gray-500 text-sm">
+        {name1} & {name2}
+      </p>
+      <p className="text-4xl font-bold text-@@accent@@-600">{result}</p>
+    </div>
+  );
+}
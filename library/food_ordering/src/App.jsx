@@ -0,0 +1,54 @@
+import { useState } from 'react';
+import Navbar from './components/Navbar';
+import RestaurantList from './components/RestaurantList';
+import CartSidebar from './components/CartSidebar';
+import site from './siteConfig';
+
+export default function App() {
+  const [restaurants] = useState(site.data.restaurants);
+  const [cartItems, setCartItems] = useState([]);
+  const [searchQuery, setSearchQuery] = useState('');
+
+  const onSearch = (query) => {
+    setSearchQuery(query);
+  };
+
+  const addToCart = (restaurant, dish) => {
+    const id = restaurant.id + '-' + dish.id;
+    if (cartItems.some((item) => item.id === id)) {
+      setCartItems(cartItems.map((item) => (item.id === id ? { ...item, quantity: item.quantity + 1 } : item)));
+    } else {
+      setCartItems([...cartItems, { id, name: dish.name, restaurant: restaurant.name, price: dish.price, quantity: 1 }]);
+    }
+  };
+
+  const removeFromCart = (id) => {
+    setCartItems(
+      cartItems
+        .map((item) => (item.id === id ? { ...item, quantity: item.quantity - 1 } : item))
+        .filter((item) => item.quantity > 0)
+    );
+  };
+
+  const query = searchQuery.trim().toLowerCase();
+  const visible = restaurants.filter(
+    (restaurant) =>
+      !query ||
+      restaurant.name.toLowerCase().includes(query) ||
+      restaurant.cuisine.toLowerCase().includes(query) ||
+      restaurant.menu.some((dish) => dish.name.toLowerCase().includes(query))
+  );
+  const cartCount = cartItems.reduce((sum, item) => sum + item.quantity, 0);
+
+  return (
+    <div className="min-h-screen bg-gray-50 flex flex-col">
+      <Navbar title={site.title} searchQuery={searchQuery} onSearch={onSearch} cartCount={cartCount} />
+      <main className="flex-1 grid gap-6 p-6 lg:grid-cols-3">
+        <div className="lg:col-span-2">
+          <RestaurantList restaurants={visible} currency={site.data.currency} onAdd={addToCart} />
+        </div>
+        <CartSidebar items={cartItems} currency={site.data.currency} onRemove={removeFromCart} />
+      </main>
+    </div>
+  );
+}
@@ -0,0 +1,34 @@
+export default function CartSidebar({ items, currency, onRemove }) {
+  const total = items.reduce((sum, item) => sum + item.price * item.quantity, 0);
+
+  return (
+    <aside className="bg-white rounded-lg shadow p-4 flex flex-col gap-3 h-fit">
+      <h2 className="text-lg font-semibold text-gray-800">Your Cart</h2>
+      {items.length === 0 ? (
+        <p className="text-sm text-gray-500">Your cart is empty.</p>
+      ) : (
+        <ul className="flex flex-col gap-2">
+          {items.map((item) => (
+            <li key={item.id} className="flex items-center justify-between gap-2">
+              <div className="flex flex-col">
+                <span className="text-gray-800">
+                  {item.name} × {item.quantity}
+                </span>
+                <span className="text-xs text-gray-500">{item.restaurant}</span>
+              </div>
+              <button onClick={() => onRemove(item.id)} className="text-red-500 hover:text-red-700 text-sm">
+                Remove
+              </button>
+            </li>
+          ))}
+        </ul>
+      )}
+      <div className="border-t border-gray-200 pt-3 flex justify-between font-semibold">
+        <span className="text-gray-600">Total</span>
+        <span className="text-@@accent@@-700">
+          {currency}{total.toFixed(2)}
+        </span>
+      </div>
+    </aside>
+  );
+}
@@ -0,0 +1,16 @@
+export default function Navbar({ title, searchQuery, onSearch, cartCount }) {
+  return (
+    <nav className="bg-@@accent@@-600 text-white shadow flex flex-wrap items-center gap-4 px-6 py-4">
+      <h1 className="text-2xl font-bold flex-1">{title}</h1>
+      <input
+        value={searchQuery}
+        onChange={(event) => onSearch(event.target.value)}
+        placeholder="Search restaurants or dishes"
+        className="w-full sm:w-72 rounded px-3 py-2 text-gray-900 focus:outline-none"
+      />
+      <span className="bg-white text-@@accent@@-700 font-semibold rounded-full px-3 py-1 text-sm">
+        Cart: {cartCount}
+      </span>
+    </nav>
+  );
+}
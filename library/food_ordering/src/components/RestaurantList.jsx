@@ -0,0 +1,34 @@
+export default function RestaurantList({ restaurants, currency, onAdd }) {
+  if (restaurants.length === 0) {
+    return <p className="text-gray-500 p-6">No restaurants match your search.</p>;
+  }
+
+  return (
+    <section className="grid gap-4 sm:grid-cols-2">
+      {restaurants.map((restaurant) => (
+        <article key={restaurant.id} className="bg-white rounded-lg shadow p-4 flex flex-col gap-3">
+          <div className="flex items-center justify-between">
+            <h2 className="text-lg font-semibold text-gray-800">{restaurant.name}</h2>
+            <span className="text-sm text-amber-600">★ {restaurant.rating}</span>
+          </div>
+          <p className="text-sm text-gray-500">
+            {restaurant.cuisine} · {restaurant.eta}
+          </p>
+          <ul className="flex flex-col gap-2">
+            {restaurant.menu.map((dish) => (
+              <li key={dish.id} className="flex items-center justify-between gap-2">
+                <span className="text-gray-700">{dish.name}</span>
+                <button
+                  onClick={() => onAdd(restaurant, dish)}
+                  className="bg-@@accent@@-500 hover:bg-@@accent@@-600 text-white text-sm rounded px-3 py-1"
+                >
+                  Add {currency}{dish.price.toFixed(2)}
+                </button>
+              </li>
+            ))}
+          </ul>
+        </article>
+      ))}
+    </section>
+  );
+}
@@ -0,0 +1,26 @@
+import Navbar from './components/Navbar';
+import Hero from './components/Hero';
+import About from './components/About';
+import Skills from './components/Skills';
+import Projects from './components/Projects';
+import Contact from './components/Contact';
+import Footer from './components/Footer';
+import site from './siteConfig';
+
+const SECTIONS = ['about', 'skills', 'projects', 'contact'];
+
+export default function App() {
+  return (
+    <div className="min-h-screen bg-gray-50 text-gray-800 flex flex-col">
+      <Navbar title={site.title} sections={SECTIONS} />
+      <main className="flex-1 flex flex-col">
+        <Hero name={site.data.name} tagline={site.tagline} />
+        <About text={site.data.about} />
+        <Skills skills={site.data.skills} />
+        <Projects projects={site.data.projects} />
+        <Contact email={site.data.email} links={site.data.links} />
+      </main>
+      <Footer name={site.data.name} />
+    </div>
+  );
+}
@@ -0,0 +1,10 @@
+export default function About({ text }) {
+  return (
+    <section id="about" className="px-6 py-16 flex justify-center">
+      <div className="max-w-3xl bg-white rounded-lg shadow p-8 flex flex-col gap-4">
+        <h2 className="text-3xl font-bold text-gray-800">About Me</h2>
+        <p className="text-gray-600 leading-relaxed">{text}</p>
+      </div>
+    </section>
+  );
+}
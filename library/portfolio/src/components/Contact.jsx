@@ -0,0 +1,18 @@
+export default function Contact({ email, links }) {
+  return (
+    <section id="contact" className="bg-white px-6 py-16 flex flex-col items-center gap-4 text-center">
+      <h2 className="text-3xl font-bold text-gray-800">Contact</h2>
+      <p className="text-gray-600">I'm open to new projects and collaborations.</p>
+      <a href={'mailto:' + email} className="text-@@accent@@-600 font-semibold hover:underline">
+        {email}
+      </a>
+      <div className="flex gap-4">
+        {links.map((link) => (
+          <a key={link.label} href={link.url} className="text-gray-500 hover:text-@@accent@@-600">
+            {link.label}
+          </a>
+        ))}
+      </div>
+    </section>
+  );
+}
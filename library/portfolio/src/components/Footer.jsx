@@ -0,0 +1,7 @@
+export default function Footer({ name }) {
+  return (
+    <footer className="bg-gray-900 text-gray-400 text-sm text-center px-6 py-6">
+      © {new Date().getFullYear()} {name}. All rights reserved.
+    </footer>
+  );
+}
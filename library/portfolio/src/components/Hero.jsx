@@ -0,0 +1,11 @@
+export default function Hero({ name, tagline }) {
+  return (
+    <section className="bg-gradient-to-r from-@@accent@@-600 to-@@accent@@-400 text-white px-6 py-24 flex flex-col items-center text-center gap-4">
+      <h1 className="text-5xl font-bold">{name}</h1>
+      <p className="text-xl text-@@accent@@-50 max-w-2xl">{tagline}</p>
+      <a href="#contact" className="bg-white text-@@accent@@-700 font-semibold rounded-full px-6 py-3 shadow hover:bg-@@accent@@-50">
+        Get in touch
+      </a>
+    </section>
+  );
+}
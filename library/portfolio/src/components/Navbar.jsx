@@ -0,0 +1,14 @@
+export default function Navbar({ title, sections }) {
+  return (
+    <nav className="sticky top-0 bg-white shadow-sm flex items-center justify-between px-6 py-4">
+      <span className="text-xl font-bold text-@@accent@@-700">{title}</span>
+      <div className="flex gap-4">
+        {sections.map((section) => (
+          <a key={section} href={'#' + section} className="capitalize text-gray-600 hover:text-@@accent@@-600">
+            {section}
+          </a>
+        ))}
+      </div>
+    </nav>
+  );
+}
@@ -0,0 +1,22 @@
+export default function Projects({ projects }) {
+  return (
+    <section id="projects" className="px-6 py-16 flex flex-col items-center gap-8">
+      <h2 className="text-3xl font-bold text-gray-800">Projects</h2>
+      <div className="max-w-5xl grid gap-6 md:grid-cols-3 w-full">
+        {projects.map((project) => (
+          <article key={project.title} className="bg-white rounded-lg shadow p-6 flex flex-col gap-3">
+            <h3 className="text-xl font-semibold text-gray-800">{project.title}</h3>
+            <p className="text-gray-600 flex-1">{project.description}</p>
+            <div className="flex flex-wrap gap-2">
+              {project.tags.map((tag) => (
+                <span key={tag} className="bg-gray-100 text-gray-600 text-xs rounded-full px-3 py-1">
+                  {tag}
+                </span>
+              ))}
+            </div>
+          </article>
+        ))}
+      </div>
+    </section>
+  );
+}
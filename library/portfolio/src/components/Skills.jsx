@@ -0,0 +1,14 @@
+export default function Skills({ skills }) {
+  return (
+    <section id="skills" className="bg-white px-6 py-16 flex flex-col items-center gap-8">
+      <h2 className="text-3xl font-bold text-gray-800">Skills</h2>
+      <div className="max-w-4xl grid grid-cols-2 sm:grid-cols-3 gap-4 w-full">
+        {skills.map((skill) => (
+          <div key={skill} className="bg-@@accent@@-50 text-@@accent@@-700 font-medium rounded-lg p-4 text-center">
+            {skill}
+          </div>
+        ))}
+      </div>
+    </section>
+  );
+}
@@ -0,0 +1,44 @@
+import { useState } from 'react';
+import Header from './components/Header';
+import TodoInput from './components/TodoInput';
+import TodoList from './components/TodoList';
+import site from './siteConfig';
+
+export default function App() {
+  const [todos, setTodos] = useState(site.data.todos);
+  const [filter, setFilter] = useState('all');
+
+  const addTodo = (text) => {
+    setTodos([...todos, { id: Date.now(), text, done: false }]);
+  };
+
+  const toggleTodo = (id) => {
+    setTodos(todos.map((todo) => (todo.id === id ? { ...todo, done: !todo.done } : todo)));
+  };
+
+  const deleteTodo = (id) => {
+    setTodos(todos.filter((todo) => todo.id !== id));
+  };
+
+  const visible = todos.filter((todo) => {
+    if (filter === 'active') return !todo.done;
+    if (filter === 'done') return todo.done;
+    return true;
+  });
+
+  return (
+    <div className="min-h-screen bg-gray-100 flex justify-center p-6">
+      <div className="w-full max-w-xl flex flex-col gap-4">
+        <Header title={site.title} tagline={site.tagline} remaining={todos.filter((todo) => !todo.done).length} />
+        <TodoInput onAdd={addTodo} />
+        <TodoList
+          todos={visible}
+          filter={filter}
+          onFilter={setFilter}
+          onToggle={toggleTodo}
+          onDelete={deleteTodo}
+        />
+      </div>
+    </div>
+  );
+}
@@ -0,0 +1,9 @@
+export default function Header({ title, tagline, remaining }) {
+  return (
+    <header className="bg-@@accent@@-600 text-white rounded-lg shadow p-6 flex flex-col gap-1">
+      <h1 className="text-3xl font-bold">{title}</h1>
+      <p className="text-@@accent@@-100">{tagline}</p>
+      <span className="text-sm text-@@accent@@-100">{remaining} task(s) left</span>
+    </header>
+  );
+}
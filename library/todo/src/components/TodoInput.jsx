@@ -0,0 +1,26 @@
+import { useState } from 'react';
+
+export default function TodoInput({ onAdd }) {
+  const [text, setText] = useState('');
+
+  const handleAdd = () => {
+    if (!text.trim()) return;
+    onAdd(text.trim());
+    setText('');
+  };
+
+  return (
+    <div className="bg-white rounded-lg shadow p-4 flex gap-2">
+      <input
+        value={text}
+        onChange={(event) => setText(event.target.value)}
+        onKeyDown={(event) => event.key === 'Enter' && handleAdd()}
+        placeholder="What needs to be done?"
+        className="flex-1 border border-gray-300 rounded px-3 py-2 focus:outline-none focus:ring-2 focus:ring-@@accent@@-500"
+      />
+      <button onClick={handleAdd} className="bg-@@accent@@-600 hover:bg-@@accent@@-700 text-white rounded px-4 py-2">
+        Add
+      </button>
+    </div>
+  );
+}
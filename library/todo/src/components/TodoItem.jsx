@@ -0,0 +1,16 @@
+export default function TodoItem({ todo, onToggle, onDelete }) {
+  return (
+    <li className="flex items-center gap-3 p-3 rounded border border-gray-200">
+      <input
+        type="checkbox"
+        checked={todo.done}
+        onChange={() => onToggle(todo.id)}
+        className="h-4 w-4 accent-@@accent@@-600"
+      />
+      <span className={todo.done ? 'flex-1 line-through text-gray-400' : 'flex-1 text-gray-800'}>{todo.text}</span>
+      <button onClick={() => onDelete(todo.id)} className="text-red-500 hover:text-red-700 text-sm">
+        Delete
+      </button>
+    </li>
+  );
+}
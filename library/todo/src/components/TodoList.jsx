@@ -0,0 +1,30 @@
+import TodoItem from './TodoItem';
+
+const FILTERS = ['all', 'active', 'done'];
+
+export default function TodoList({ todos, filter, onFilter, onToggle, onDelete }) {
+  return (
+    <section className="bg-white rounded-lg shadow p-4 flex flex-col gap-3">
+      <div className="flex gap-2">
+        {FILTERS.map((name) => (
+          <button
+            key={name}
+            onClick={() => onFilter(name)}
+            className={filter === name ? 'px-3 py-1 rounded capitalize bg-@@accent@@-600 text-white' : 'px-3 py-1 rounded capitalize bg-gray-100 text-gray-700'}
+          >
+            {name}
+          </button>
+        ))}
+      </div>
+      {todos.length === 0 ? (
+        <p className="text-gray-500 text-center py-6">Nothing here yet.</p>
+      ) : (
+        <ul className="flex flex-col gap-2">
+          {todos.map((todo) => (
+            <TodoItem key={todo.id} todo={todo} onToggle={onToggle} onDelete={onDelete} />
+          ))}
+        </ul>
+      )}
+    </section>
+  );
+}
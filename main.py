@@ -1,61 +1,107 @@
 import os
-import sys
 import argparse
+import asyncio
 import json
 import re
-import shutil
-import subprocess
-from graph.flow import create_graph
-from utils.file_writer import write_files
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from utils.pipeline import SitePipeline
+from utils.site_writer import SiteWriter, compose_site, get_template_snapshot, save_site_state, load_site_state
+from utils.app_registry import get_app_registry, configure_layout
+from utils.checkpoints import get_checkpointer, configure_checkpoints, run_config, delete_checkpoints
+from utils.llm_cache import get_cache
+from utils.context_builder import token_summary
+from utils.rate_limiter import configure_limiter
+from utils.llm_client import BACKENDS, configure_backend
+from utils.telemetry import RunTrace, record_stages, get_metrics
+from utils.plan_index import get_plan_index
+from utils.component_library import configure_library, check_library
+from utils.node_store import install_dependencies, run_npm_install
+from utils.build_verifier import (configure_verification, verification_enabled, verify_site,
+                                  merge_build_report, verification_summary)
 
 BASE_DIR = "generated-sites"
 TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "templates", "react-vite-tailwind")
 
-def get_next_app_dir(app_name):
+# Set from CLI flags; see utils/node_store.py
+INSTALL_SETTINGS = {"enabled": True, "shared_store": True, "offline": False}
+
+# Heavy imports (langgraph/langchain) are deferred until a run starts,
+# so CLI startup and `--help` stay fast
+def create_graph(checkpoint=True):
     """
-    Creates a new unique directory for the app.
+    Compiles the generation graph; with checkpoint, state is saved after
+    each node so failed runs can be resumed (sync API only).
+    """
+    from graph.flow import create_graph as compile_graph
+    return compile_graph(get_checkpointer() if checkpoint else None)
+
+def create_update_graph():
+    from graph.flow import create_update_graph as compile_graph
+    return compile_graph()
+
+def validator_metrics_summary():
+    from agents.validator import validator_metrics_summary as summary
+    return summary()
+
+def speculation_summary():
+    from agents.speculator import speculation_summary as summary
+    return summary()
+
+def configure_speculation(mode):
+    from agents.speculator import configure_speculation as configure
+    configure(mode)
+
+def remember_run(user_prompt, result):
+    from agents.recall import remember_run as remember
+    remember(user_prompt, result)
+
+def get_next_app_dir(app_name, from_dir=None, **index_fields):
+    """
+    Creates a new unique directory for the app (see utils/app_registry.py).
+    If from_dir is given (a pipeline staging directory), it is moved into
+    place instead of creating an empty directory. index_fields (prompt,
+    intent, status) are recorded in the app index.
     """
-    os.makedirs(BASE_DIR, exist_ok=True)
-    existing = [d for d in os.listdir(BASE_DIR) if os.path.isdir(os.path.join(BASE_DIR, d))]
-    app_id = len(existing) + 1
-    
     # Clean app name
     safe_name = re.sub(r'[^a-zA-Z0-9]', '-', app_name.lower()).strip('-')
     if not safe_name:
         safe_name = "app"
-        
-    return os.path.join(BASE_DIR, f"app-{app_id:03d}-{safe_name}")
 
-def bootstrap_project(output_dir):
+    registry = get_app_registry(BASE_DIR)
+    app_id, app_dir = registry.allocate(safe_name, from_dir=from_dir)
+    if index_fields:
+        registry.record(app_id, app_dir, **index_fields)
+    return app_dir
+
+def new_staging_dir():
     """
-    Copies the fixed React+Vite+Tailwind template to the output directory.
+    Scratch directory for a site whose final name is not known yet.
     """
-    print(f"Bootstrapping project in {output_dir}...")
-    if os.path.exists(output_dir):
-        shutil.rmtree(output_dir)
-    
-    shutil.copytree(
-        TEMPLATE_DIR,
-        output_dir,
-        dirs_exist_ok=True
-    )
-    print("Template copied successfully.")
+    staging_dir = os.path.join(BASE_DIR, ".staging", uuid.uuid4().hex)
+    os.makedirs(staging_dir)
+    return staging_dir
 
 def npm_install(project_dir):
     """
-    Runs npm install in the project directory.
+    Provides node_modules for the project: links the shared store entry for
+    its dependency set, or runs a real npm install when it has none.
+    Returns the install report (method, time and bytes saved).
     """
-    print(f"Running npm install in {project_dir}...")
-    try:
-        subprocess.run(
-            ["npm", "install"],
-            cwd=project_dir,
-            check=True,
-            shell=True if sys.platform == "win32" else False
-        )
+    if not INSTALL_SETTINGS["enabled"]:
+        return {"method": "skipped", "seconds_saved": 0.0, "bytes_saved": 0}
+
+    print(f"Installing dependencies in {project_dir}...")
+    if not INSTALL_SETTINGS["shared_store"]:
+        ok = run_npm_install(project_dir, offline=INSTALL_SETTINGS["offline"])
+        return {"method": "npm-install" if ok else "failed", "seconds_saved": 0.0, "bytes_saved": 0}
+
+    report = install_dependencies(project_dir, TEMPLATE_DIR, offline=INSTALL_SETTINGS["offline"])
+    if report["method"] != "failed":
         print("Dependencies installed successfully.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error running npm install: {e}")
+    return report
 
 def apply_fixes(code, validation):
     """
@@ -117,60 +163,529 @@ def apply_fixes(code, validation):
                     pass
     return code
 
+def verify_build(site_dir, record, validation):
+    """
+    Builds the written site when verification is enabled (--verify) and
+    returns the validation report with any build errors merged in.
+    """
+    if not verification_enabled():
+        return validation
+    stage_start = time.perf_counter()
+    report = verify_site(site_dir)
+    record["timings"]["verify"] = round(time.perf_counter() - stage_start, 3)
+    record["verify"] = report
+    validation = merge_build_report(validation, report)
+    record["validation_status"] = validation.get("status")
+    return validation
+
+def _new_record(user_prompt, trace):
+    return {"prompt": user_prompt, "run_id": trace.run_id, "status": "error", "output_dir": None, "timings": {}}
+
+def _finish_trace(trace, record):
+    """
+    Feeds the stage timings into the metrics and exports the run record.
+    """
+    record_stages(trace, record["timings"], record["status"])
+    try:
+        record["trace"] = trace.export()
+    except OSError as e:
+        print(f"Could not write trace for run {trace.run_id}: {e}")
+
+def finalize_site(result, record, started, pipeline):
+    """
+    Applies fixes, flushes remaining files through the output pipeline and
+    moves the finished site into place. Fills in the result record.
+    """
+    code = result.get("code")
+    validation = result.get("validation")
+    record["validation_status"] = (validation or {}).get("status")
+    if result.get("repair_log"):
+        record["repairs"] = result["repair_log"]
+    if result.get("reused_from"):
+        record["reused_from"] = result["reused_from"]
+
+    if not code:
+        pipeline.discard()
+        record["error"] = "No code was generated."
+        return record
+
+    if validation and validation.get("status") == "fail":
+        print("\nValidation Failed. Attempting auto-fixes...")
+        code = apply_fixes(code, validation)
+
+    # Bootstrap and install ran in the background; write what is left
+    pipeline.finish(code)
+    record["install"] = pipeline.install_report
+    record["writes"] = pipeline.write_stats
+    result["validation"] = verify_build(pipeline.staging_dir, record, validation)
+    save_site_state(pipeline.staging_dir, {
+        "prompt": record["prompt"],
+        "run_id": record["run_id"],
+        "plan": result.get("plan") or {},
+        "architecture": result.get("architecture") or {},
+        "code": code,
+        "validated_files": result.get("validated_files") or {},
+        "changes": [],
+    })
+
+    # Determine app name for folder creation
+    app_name = "generated-app"
+    if result.get("plan") and "app_name" in result["plan"]:
+        app_name = result["plan"]["app_name"]
+
+    output_dir = get_next_app_dir(app_name, from_dir=pipeline.staging_dir, prompt=record["prompt"],
+                                  intent=(result.get("plan") or {}).get("app_intent"),
+                                  status="ok", validation_status=record["validation_status"],
+                                  run_id=record.get("run_id"))
+    record["output_dir"] = output_dir
+    print(f"Generated files written to: {output_dir}")
+
+    record["timings"].update(pipeline.timings)
+    record["status"] = "ok"
+    remember_run(record["prompt"], result)
+    record["timings"]["total"] = round(time.perf_counter() - started, 3)
+    return record
+
+def _start_pipeline():
+    template = get_template_snapshot(TEMPLATE_DIR)
+    return SitePipeline(new_staging_dir(), template, npm_install).start()
+
+def _run_graph(app, state, config, on_node=None):
+    """
+    Invokes the graph; with on_node, streams it instead and reports the name
+    of each node as it starts (used for job progress in server mode).
+    """
+    if on_node is None:
+        return app.invoke(state, config=config)
+
+    result = None
+    for mode, chunk in app.stream(state, config=config, stream_mode=["debug", "values"]):
+        if mode == "debug" and chunk.get("type") == "task":
+            on_node(chunk["payload"]["name"])
+        elif mode == "values":
+            result = chunk
+    return result
+
+def _generate(app, graph_input, trace, record, on_node=None):
+    """
+    Runs (or, with graph_input None, resumes) the graph for trace.run_id
+    and finalizes the site. Checkpoints are kept when the run fails.
+    """
+    started = time.perf_counter()
+    pipeline = _start_pipeline()
+
+    # Run the graph
+    try:
+        result = _run_graph(app, graph_input,
+                            run_config(trace.run_id, on_file=pipeline.on_file, trace=trace), on_node)
+    except Exception:
+        pipeline.discard()
+        _finish_trace(trace, record)
+        if getattr(app, "checkpointer", None) is not None:
+            print(f"Run {trace.run_id} failed; continue it with: python main.py --resume {trace.run_id}")
+        raise
+    record["timings"]["graph"] = round(time.perf_counter() - started, 3)
+
+    try:
+        record = finalize_site(result, record, started, pipeline)
+    except Exception:
+        # Promote, build verification or the registry write failed
+        pipeline.discard()
+        _finish_trace(trace, record)
+        raise
+    _finish_trace(trace, record)
+    if record["status"] == "ok":
+        delete_checkpoints(app, trace.run_id)
+    return record, result
+
+def generate_site(user_prompt, app=None, on_node=None, run_id=None):
+    """
+    Runs the full pipeline for one prompt and returns (record, graph result);
+    the record (status, output directory, timings) feeds the batch report.
+    Template bootstrap and npm install overlap with the LLM calls.
+    """
+    if app is None:
+        app = create_graph()
+
+    trace = RunTrace(user_prompt, run_id)
+    record = _new_record(user_prompt, trace)
+    return _generate(app, {"user_prompt": user_prompt}, trace, record, on_node)
+
+def resume_site(run_id, app=None, on_node=None):
+    """
+    Continues a failed run from its last checkpointed node; nodes that
+    completed (planner, architect, ...) are not run again.
+    """
+    if app is None:
+        app = create_graph()
+    if getattr(app, "checkpointer", None) is None:
+        raise ValueError("Checkpoints are disabled; cannot resume.")
+
+    snapshot = app.get_state(run_config(run_id))
+    if not snapshot.values:
+        raise ValueError(f"No checkpoints found for run {run_id}.")
+    user_prompt = snapshot.values.get("user_prompt")
+    print(f"Resuming run {run_id} at {', '.join(snapshot.next) or 'output'}: {user_prompt}")
+
+    trace = RunTrace(user_prompt, run_id)
+    record = _new_record(user_prompt, trace)
+    record["resumed_at"] = list(snapshot.next)
+    return _generate(app, None, trace, record, on_node)
+
+async def agenerate_site(user_prompt, app=None, run_id=None):
+    """
+    Async entry point: awaits the graph via app.ainvoke so many generations
+    can share one event loop. Output finalization runs in a worker thread
+    once the LLM work is done.
+    """
+    if app is None:
+        app = create_graph(checkpoint=False)
+
+    trace = RunTrace(user_prompt, run_id)
+    record = _new_record(user_prompt, trace)
+    started = time.perf_counter()
+    pipeline = _start_pipeline()
+
+    try:
+        result = await app.ainvoke({"user_prompt": user_prompt},
+                                   config=run_config(trace.run_id, on_file=pipeline.on_file, trace=trace))
+    except Exception:
+        await asyncio.to_thread(pipeline.discard)
+        _finish_trace(trace, record)
+        raise
+    record["timings"]["graph"] = round(time.perf_counter() - started, 3)
+
+    try:
+        record = await asyncio.to_thread(finalize_site, result, record, started, pipeline)
+    except Exception:
+        await asyncio.to_thread(pipeline.discard)
+        _finish_trace(trace, record)
+        raise
+    _finish_trace(trace, record)
+    return record, result
+
+def update_site(app_dir, change, app=None):
+    """
+    Applies a follow-up change to an existing site: only the affected files
+    go to the editor, only files whose content changed are rewritten, and
+    dependencies are reinstalled only when package.json changed.
+    Returns (record, graph result).
+    """
+    saved = load_site_state(app_dir)
+    if saved is None:
+        raise ValueError(f"{app_dir} has no saved generation state (.autosite/state.json); regenerate it first.")
+    if app is None:
+        app = create_update_graph()
+
+    trace = RunTrace(change)
+    record = _new_record(change, trace)
+    record["output_dir"] = app_dir
+    started = time.perf_counter()
+
+    state = {
+        "user_prompt": saved["prompt"],
+        "change_request": change,
+        "plan": saved["plan"],
+        "architecture": saved["architecture"],
+        "code": saved["code"],
+        "validated_files": saved.get("validated_files") or {},
+    }
+    try:
+        result = app.invoke(state, config={"configurable": {"trace": trace}})
+    except Exception:
+        _finish_trace(trace, record)
+        raise
+    record["timings"]["graph"] = round(time.perf_counter() - started, 3)
+
+    code = result["code"]
+    validation = result.get("validation")
+    record["validation_status"] = (validation or {}).get("status")
+    record["changed_files"] = sorted(p for p in code if saved["code"].get(p) != code[p])
+    if result.get("repair_log"):
+        record["repairs"] = result["repair_log"]
+    if validation and validation.get("status") == "fail":
+        print("\nValidation Failed. Attempting auto-fixes...")
+        code = apply_fixes(code, validation)
+
+    stage_start = time.perf_counter()
+    template = get_template_snapshot(TEMPLATE_DIR)
+    writer = SiteWriter(app_dir, template)
+    writer.materialize(compose_site(template, code))
+    writer.save_manifest()
+    record["writes"] = dict(writer.stats)
+    record["timings"]["write"] = round(time.perf_counter() - stage_start, 3)
+
+    if code.get("package.json") != saved["code"].get("package.json"):
+        stage_start = time.perf_counter()
+        record["install"] = npm_install(app_dir)
+        record["timings"]["npm_install"] = round(time.perf_counter() - stage_start, 3)
+    else:
+        print("package.json unchanged; skipping dependency install.")
+    result["validation"] = verify_build(app_dir, record, validation)
+
+    saved.update(code=code, validated_files=result.get("validated_files") or {},
+                 changes=saved.get("changes", []) + [{"change": change, "run_id": record["run_id"],
+                                                      "files": record["changed_files"]}])
+    save_site_state(app_dir, saved)
+
+    record["status"] = "ok"
+    record["timings"]["total"] = round(time.perf_counter() - started, 3)
+    _finish_trace(trace, record)
+    return record, result
+
+def load_batch(path):
+    """
+    Reads prompts from a JSONL file. Each line may carry a "prompt" field,
+    or use the requests.jsonl shape ("request_id", "title", "body").
+    """
+    jobs = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            prompt = entry.get("prompt") or entry.get("body") or entry.get("title")
+            if not prompt:
+                print(f"Skipping line {line_no}: no prompt field")
+                continue
+            job_id = entry.get("id") or entry.get("request_id") or f"line-{line_no}"
+            jobs.append({"id": job_id, "prompt": prompt})
+    return jobs
+
+def run_batch(batch_path, results_path, concurrency):
+    """
+    Generates every prompt in the batch file on a bounded thread pool,
+    streaming one JSONL result line per site as soon as it finishes.
+    LLM calls share the per-provider limiter in utils.rate_limiter.
+    """
+    jobs = load_batch(batch_path)
+    print(f"Running batch of {len(jobs)} prompts with concurrency {concurrency}")
+    _start_results(results_path)
+
+    app = create_graph()
+    results_lock = threading.Lock()
+    batch_start = time.perf_counter()
+
+    def run_job(job):
+        run_id = uuid.uuid4().hex[:12]
+        try:
+            record, _ = generate_site(job["prompt"], app, run_id=run_id)
+        except Exception as e:
+            record = {"prompt": job["prompt"], "run_id": run_id, "status": "error", "error": str(e), "output_dir": None}
+        return _report_job(job, record, results_path, results_lock)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        records = list(pool.map(run_job, jobs))
+
+    _print_batch_summary(records, time.perf_counter() - batch_start, results_path)
+
+async def arun_batch(batch_path, results_path, concurrency):
+    """
+    Async batch runner: one event loop multiplexes up to `concurrency`
+    graph executions instead of dedicating a thread to each.
+    """
+    jobs = load_batch(batch_path)
+    print(f"Running async batch of {len(jobs)} prompts with concurrency {concurrency}")
+    _start_results(results_path)
+
+    app = create_graph(checkpoint=False)
+    results_lock = threading.Lock()
+    slots = asyncio.Semaphore(concurrency)
+    batch_start = time.perf_counter()
+
+    async def run_job(job):
+        run_id = uuid.uuid4().hex[:12]
+        async with slots:
+            try:
+                record, _ = await agenerate_site(job["prompt"], app, run_id=run_id)
+            except Exception as e:
+                record = {"prompt": job["prompt"], "run_id": run_id, "status": "error", "error": str(e), "output_dir": None}
+        return _report_job(job, record, results_path, results_lock)
+
+    records = await asyncio.gather(*(run_job(job) for job in jobs))
+    _print_batch_summary(records, time.perf_counter() - batch_start, results_path)
+
+def _start_results(results_path):
+    """
+    Truncates the results file so it holds only this batch's lines (jobs
+    append to it as they finish).
+    """
+    open(results_path, "w", encoding="utf-8").close()
+
+def _report_job(job, record, results_path, results_lock):
+    record["id"] = job["id"]
+    with results_lock:
+        with open(results_path, "a", encoding="utf-8") as out:
+            out.write(json.dumps(record) + "\n")
+    print(f"[{job['id']}] {record['status']} -> {record.get('output_dir')}")
+    return record
+
+def _print_batch_summary(records, elapsed, results_path):
+    succeeded = sum(1 for r in records if r["status"] == "ok")
+    print(f"\nBatch complete: {succeeded}/{len(records)} succeeded in {elapsed:.1f}s")
+    seconds_saved = sum(r.get("install", {}).get("seconds_saved", 0.0) for r in records)
+    bytes_saved = sum(r.get("install", {}).get("bytes_saved", 0) for r in records)
+    print(f"Shared node_modules saved ~{seconds_saved:.1f}s of npm install and {bytes_saved / (1024 * 1024):.1f} MB of disk")
+    print(f"Results written to: {results_path}")
+    print(get_cache().summary())
+    print(validator_metrics_summary())
+    print(get_plan_index().summary())
+    print(speculation_summary())
+    if verification_enabled():
+        print(verification_summary())
+    print(f"Estimated input tokens per agent: {json.dumps(token_summary())}")
+
+def _write_metrics(path):
+    if not path:
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(get_metrics().render())
+    print(f"Metrics written to: {path}")
+
 def main():
     parser = argparse.ArgumentParser(description="Autosite: AI Website Generator")
     parser.add_argument("prompt", nargs="?", help="The prompt for the website you want to build")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the on-disk LLM response cache")
+    parser.add_argument("--batch", help="JSONL file of prompts to generate concurrently")
+    parser.add_argument("--results", default="batch-results.jsonl", help="JSONL file for batch results")
+    parser.add_argument("--concurrency", type=int, default=os.cpu_count() or 4, help="Sites generated at once in batch mode")
+    parser.add_argument("--llm-concurrency", type=int, help="Max in-flight Groq requests")
+    parser.add_argument("--rpm", type=int, help="Max Groq requests per minute")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Drive the graph with ainvoke on an event loop")
+    parser.add_argument("--offline", action="store_true", help="Never hit the npm registry; rely on the pre-warmed node_modules store")
+    parser.add_argument("--no-shared-modules", action="store_true", help="Run a full npm install in every site instead of linking the shared store")
+    parser.add_argument("--no-install", action="store_true", help="Skip providing node_modules for generated sites")
+    parser.add_argument("--backend", choices=BACKENDS, help="LLM backend (default: AUTOSITE_LLM_BACKEND or groq)")
+    parser.add_argument("--no-reuse", action="store_true", help="Always run the planner and architect, even for near-duplicate prompts")
+    parser.add_argument("--reuse-threshold", type=float, help="Similarity needed to reuse a stored plan (0-1)")
+    parser.add_argument("--metrics-out", help="Write Prometheus-format metrics to this file when the run ends")
+    parser.add_argument("--update", metavar="APP_DIR", help="Apply the prompt as a change to an existing generated site")
+    parser.add_argument("--resume", metavar="RUN_ID", help="Continue a failed run from its last completed node")
+    parser.add_argument("--no-checkpoints", action="store_true", help="Do not persist graph state after each node")
+    parser.add_argument("--speculate", choices=["off", "blueprint", "architect"],
+                        help="Prepare the architecture in parallel with the planner (default: AUTOSITE_SPECULATE or off)")
+    parser.add_argument("--no-library", action="store_true", help="Always generate with the LLM, even when a component library entry matches")
+    parser.add_argument("--check-library", action="store_true", help="Assemble and validate every component library entry, then exit")
+    parser.add_argument("--verify", choices=["off", "esbuild", "vite"],
+                        help="Build each finished site and add build errors to its validation report (default: AUTOSITE_VERIFY or off)")
+    parser.add_argument("--verify-workers", type=int, help="Warm Node build workers shared by all sites (default: AUTOSITE_VERIFY_WORKERS or 2)")
+    parser.add_argument("--sharded", action="store_true", help="Place sites in generated-sites/<shard>/app-... (also AUTOSITE_SHARDED_SITES=1)")
+    parser.add_argument("--list-apps", action="store_true", help="Print the generated app index and exit")
+    parser.add_argument("--serve", action="store_true", help="Run as a local HTTP generation service with a warm graph")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address for --serve")
+    parser.add_argument("--port", type=int, default=8000, help="Port for --serve")
+    parser.add_argument("--workers", type=int, default=2, help="Concurrent generations in --serve mode")
+    parser.add_argument("--queue-size", type=int, default=16, help="Queued jobs accepted before --serve answers 429")
     args = parser.parse_args()
 
+    INSTALL_SETTINGS["offline"] = args.offline
+    INSTALL_SETTINGS["shared_store"] = not args.no_shared_modules
+    INSTALL_SETTINGS["enabled"] = not args.no_install
+
+    if args.backend:
+        configure_backend(args.backend)
+
+    if args.no_cache:
+        get_cache().enabled = False
+
+    if args.no_reuse:
+        get_plan_index().enabled = False
+    if args.reuse_threshold is not None:
+        get_plan_index().threshold = args.reuse_threshold
+
+    if args.llm_concurrency is not None or args.rpm is not None:
+        configure_limiter("groq", args.llm_concurrency, args.rpm)
+
+    if args.sharded:
+        configure_layout(True)
+
+    if args.speculate:
+        configure_speculation(args.speculate)
+
+    if args.no_checkpoints:
+        configure_checkpoints(False)
+
+    if args.no_library:
+        configure_library(False)
+
+    if args.verify or args.verify_workers is not None:
+        configure_verification(args.verify, args.verify_workers)
+
+    if args.check_library:
+        problems = check_library()
+        for problem in problems:
+            print(f"Library problem: {problem}")
+        raise SystemExit(1 if problems else 0)
+
+    if args.list_apps:
+        for app_id, entry in sorted(get_app_registry(BASE_DIR).entries().items()):
+            print(f"{app_id:>5}  {entry.get('status', '?'):<6} {entry.get('intent') or '-':<13} {entry['dir']}  {entry.get('prompt', '')}")
+        return
+
+    if args.serve:
+        from server import serve
+        serve(args.host, args.port, max(1, args.workers), max(1, args.queue_size),
+              app=create_graph(), generate=generate_site)
+        return
+
+    if args.batch:
+        if args.use_async:
+            asyncio.run(arun_batch(args.batch, args.results, max(1, args.concurrency)))
+        else:
+            run_batch(args.batch, args.results, max(1, args.concurrency))
+        _write_metrics(args.metrics_out)
+        return
+
     user_prompt = args.prompt
-    if not user_prompt:
+    if not user_prompt and not args.resume:
         print("Please provide a prompt. Example: python main.py 'Create a portfolio website'")
         return
 
-    print(f"Starting Autosite with prompt: {user_prompt}")
-    
-    app = create_graph()
-    
-    initial_state = {"user_prompt": user_prompt}
-    
-    # Run the graph
-    result = app.invoke(initial_state)
-    
+    if args.update:
+        print(f"Updating {args.update}: {user_prompt}")
+        record, _ = update_site(args.update, user_prompt)
+        print(f"\nUpdated {len(record['changed_files'])} file(s) in {record['timings']['total']}s: "
+              f"{', '.join(record['changed_files']) or 'no changes'}")
+        print(f"Validation: {record['validation_status']}; writes: {json.dumps(record['writes'])}")
+        _write_metrics(args.metrics_out)
+        return
+
+    if args.resume:
+        record, result = resume_site(args.resume)
+    elif args.use_async:
+        print(f"Starting Autosite with prompt: {user_prompt}")
+        record, result = asyncio.run(agenerate_site(user_prompt))
+    else:
+        print(f"Starting Autosite with prompt: {user_prompt}")
+        record, result = generate_site(user_prompt)
+
     print("\n--- GENERATION COMPLETE ---")
-    
-    code = result.get("code")
-    validation = result.get("validation")
+    print(get_cache().summary())
+    print(validator_metrics_summary())
+    print(get_plan_index().summary())
+    print(speculation_summary())
+    if verification_enabled():
+        print(verification_summary())
+    print(f"Estimated input tokens per agent: {json.dumps(token_summary())}")
+    if record.get("trace"):
+        print(f"Run trace ({record['run_id']}): {record['trace']}")
+    _write_metrics(args.metrics_out)
 
-    if code:
-        if validation and validation.get("status") == "fail":
-            print("\nValidation Failed. Attempting auto-fixes...")
-            code = apply_fixes(code, validation)
-            
-        # Determine app name for folder creation
-        app_name = "generated-app"
-        if result.get("plan") and "app_name" in result["plan"]:
-            app_name = result["plan"]["app_name"]
-            
-        output_dir = get_next_app_dir(app_name)
-        
-        # 1. Bootstrap Project
-        bootstrap_project(output_dir)
-        
-        # 2. Write Generated Files (Overwriting template placeholders)
-        print(f"Writing generated files to: {output_dir}")
-        write_files(code, output_dir)
-        
-        # 3. Auto-run npm install
-        npm_install(output_dir)
-        
+    if record["status"] == "ok":
+        output_dir = record["output_dir"]
         print(f"\nDONE! Your app is ready in: {output_dir}")
         print(f"Run: cd {output_dir} && npm run dev")
-        
+
+        print("\nStage Timings (seconds):")
+        print(json.dumps(record["timings"], indent=2))
+
+        validation = result.get("validation")
         if validation:
             print("\nValidation Report:")
             print(json.dumps(validation, indent=2))
     else:
-        print("Error: No code was generated.")
+        print(f"Error: {record.get('error')}")
 
 if __name__ == "__main__":
     main()
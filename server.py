@@ -0,0 +1,216 @@
+import json
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from utils.telemetry import get_metrics
+
+# ============================================
+# LOCAL GENERATION SERVICE
+# One warm compiled graph, a bounded job queue and a fixed worker pool.
+#   POST /jobs {"prompt": "..."}  -> 202 {"id", "status"}  (429 when the queue is full)
+#   GET  /jobs/<id>               -> status, current node, output_dir, timings
+#   GET  /jobs                    -> recent jobs
+#   GET  /health                  -> queue depth and worker count
+#   GET  /metrics                 -> Prometheus text (utils/telemetry.py)
+# ============================================
+MAX_TRACKED_JOBS = 1000
+RETRY_AFTER_SECONDS = 5
+
+
+class QueueFull(Exception):
+    pass
+
+
+class GenerationService:
+    """
+    Runs generations on `workers` threads fed from a queue of `queue_size`.
+    `generate` has the signature of main.generate_site and `app` is the
+    compiled graph; both can be swapped for a fake LLM backend in tests.
+    When main.py is run as a script it passes its own functions: importing
+    `main` here would load a second copy of the module whose settings
+    (INSTALL_SETTINGS from the CLI flags) were never applied.
+    """
+
+    def __init__(self, workers: int = 2, queue_size: int = 16, app=None, generate=None):
+        if generate is None:
+            from main import generate_site as generate
+        if app is None:
+            from main import create_graph
+            app = create_graph()
+
+        self.app = app
+        self.generate = generate
+        self.workers = workers
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"autosite-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def submit(self, prompt: str) -> dict:
+        """
+        Queues a job and returns its snapshot; raises QueueFull when the
+        queue is at capacity so the caller can shed load.
+        """
+        job = {
+            "id": uuid.uuid4().hex[:12],
+            "prompt": prompt,
+            "status": "queued",
+            "node": None,
+            "nodes_run": [],
+            "output_dir": None,
+            "error": None,
+            "submitted": time.time(),
+            "started": None,
+            "finished": None,
+        }
+        with self._lock:
+            try:
+                self._queue.put_nowait(job["id"])
+            except queue.Full:
+                raise QueueFull(f"Queue is full ({self._queue.maxsize} jobs waiting)")
+            self._jobs[job["id"]] = job
+            while len(self._jobs) > MAX_TRACKED_JOBS:
+                self._jobs.popitem(last=False)
+            return dict(job)
+
+    def job(self, job_id: str):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._snapshot(job) if job else None
+
+    def jobs(self) -> list:
+        with self._lock:
+            return [self._snapshot(job) for job in self._jobs.values()]
+
+    def health(self) -> dict:
+        with self._lock:
+            running = sum(1 for job in self._jobs.values() if job["status"] == "running")
+        return {
+            "workers": self.workers,
+            "running": running,
+            "queued": self._queue.qsize(),
+            "queue_size": self._queue.maxsize,
+        }
+
+    def _snapshot(self, job: dict) -> dict:
+        snapshot = dict(job)
+        snapshot["nodes_run"] = list(job["nodes_run"])
+        return snapshot
+
+    def _update(self, job_id: str, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields)
+            return job
+
+    def _work(self):
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                return
+            job = self._update(job_id, status="running", started=time.time())
+            if job is None:
+                continue  # Evicted from the table before it ran
+
+            def on_node(name, job_id=job_id):
+                with self._lock:
+                    job = self._jobs.get(job_id)
+                    if job is not None:
+                        job["node"] = name
+                        job["nodes_run"].append(name)
+
+            try:
+                record, _ = self.generate(job["prompt"], self.app, on_node=on_node)
+                self._update(job_id, status="done" if record["status"] == "ok" else "failed",
+                             node=None, output_dir=record.get("output_dir"), error=record.get("error"),
+                             run_id=record.get("run_id"), trace=record.get("trace"),
+                             validation_status=record.get("validation_status"),
+                             timings=record.get("timings"), finished=time.time())
+            except Exception as e:
+                self._update(job_id, status="failed", error=str(e), finished=time.time())
+            print(f"[server] job {job_id} {self.job(job_id)['status']}")
+
+
+def make_handler(service: GenerationService):
+    class Handler(BaseHTTPRequestHandler):
+        def _send_text(self, status: int, text: str, content_type: str, headers=None):
+            payload = text.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _send(self, status: int, body, headers=None):
+            self._send_text(status, json.dumps(body), "application/json", headers)
+
+        def do_GET(self):
+            path = self.path.rstrip("/")
+            if path == "/metrics":
+                return self._send_text(200, get_metrics().render(), "text/plain; version=0.0.4")
+            if path == "/health":
+                return self._send(200, service.health())
+            if path == "/jobs":
+                return self._send(200, {"jobs": service.jobs()})
+            if path.startswith("/jobs/"):
+                job = service.job(path[len("/jobs/"):])
+                if job is None:
+                    return self._send(404, {"error": "Unknown job"})
+                return self._send(200, job)
+            self._send(404, {"error": "Not found"})
+
+        def do_POST(self):
+            if self.path.rstrip("/") != "/jobs":
+                return self._send(404, {"error": "Not found"})
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                return self._send(400, {"error": "Body must be JSON"})
+            prompt = body.get("prompt") if isinstance(body, dict) else None
+            if not isinstance(prompt, str) or not prompt.strip():
+                return self._send(400, {"error": "Missing 'prompt'"})
+            try:
+                job = service.submit(prompt.strip())
+            except QueueFull as e:
+                return self._send(429, {"error": str(e)}, {"Retry-After": str(RETRY_AFTER_SECONDS)})
+            self._send(202, {"id": job["id"], "status": job["status"]}, {"Location": f"/jobs/{job['id']}"})
+
+        def log_message(self, format, *args):
+            pass  # Job progress is logged by the workers
+
+    return Handler
+
+
+def serve(host: str = "127.0.0.1", port: int = 8000, workers: int = 2, queue_size: int = 16,
+          app=None, generate=None):
+    print("Compiling graph...")
+    service = GenerationService(workers, queue_size, app=app, generate=generate).start()
+    httpd = ThreadingHTTPServer((host, port), make_handler(service))
+    print(f"Autosite server listening on http://{host}:{port} ({workers} workers, queue of {queue_size})")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
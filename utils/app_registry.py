@@ -0,0 +1,155 @@
+import os
+import re
+import json
+import time
+import threading
+from contextlib import contextmanager
+from utils.dir_lock import dir_lock
+
+# ============================================
+# APP ID ALLOCATION AND INDEX
+# IDs come from a counter file guarded by a mkdir-based lock
+# (utils/dir_lock.py, shared with the node_modules store), so allocation
+# is O(1) and unique across concurrent runs and processes. Optionally
+# sites are sharded into generated-sites/<2 hex digits>/app-... so no
+# directory grows unbounded.
+# Finished sites are appended to an index (JSONL, last entry per ID wins)
+# mapping app ID to directory, prompt, intent and status.
+# ============================================
+REGISTRY_DIR = ".autosite"
+COUNTER_FILE = "next-id"
+INDEX_FILE = "index.jsonl"
+SHARDED = os.getenv("AUTOSITE_SHARDED_SITES", "0") == "1"
+
+_APP_DIR = re.compile(r"^app-(\d+)-")
+
+
+def configure_layout(sharded: bool):
+    """
+    Sets the layout for registries created from now on.
+    """
+    global SHARDED
+    SHARDED = sharded
+    with _registries_lock:
+        _registries.clear()
+
+
+class AppRegistry:
+    """
+    Allocates app directories under `base_dir` and records finished sites.
+    """
+
+    def __init__(self, base_dir: str, sharded: bool = False):
+        self.base_dir = base_dir
+        self.sharded = sharded
+        self.registry_dir = os.path.join(base_dir, REGISTRY_DIR)
+        self._thread_lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        """
+        Cross-process lock; the thread lock keeps workers of one process
+        from spinning on the lock directory.
+        """
+        with self._thread_lock, dir_lock(os.path.join(self.registry_dir, "lock")):
+            yield
+
+    def _scan_max_id(self) -> int:
+        """
+        Highest ID already on disk. Only used once, to seed the counter for
+        a directory created before the counter existed.
+        """
+        highest = 0
+        try:
+            top = os.listdir(self.base_dir)
+        except OSError:
+            return 0
+        for name in top:
+            match = _APP_DIR.match(name)
+            if match:
+                highest = max(highest, int(match.group(1)))
+            elif not name.startswith(".") and os.path.isdir(os.path.join(self.base_dir, name)):
+                for inner in os.listdir(os.path.join(self.base_dir, name)):
+                    match = _APP_DIR.match(inner)
+                    if match:
+                        highest = max(highest, int(match.group(1)))
+        return highest
+
+    def next_id(self) -> int:
+        counter_path = os.path.join(self.registry_dir, COUNTER_FILE)
+        with self._locked():
+            try:
+                with open(counter_path, "r", encoding="utf-8") as f:
+                    app_id = int(f.read().strip())
+            except (OSError, ValueError):
+                app_id = self._scan_max_id() + 1
+            tmp_path = f"{counter_path}.tmp-{os.getpid()}"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(str(app_id + 1))
+            os.replace(tmp_path, counter_path)
+        return app_id
+
+    def app_path(self, app_id: int, safe_name: str) -> str:
+        name = f"app-{app_id:03d}-{safe_name}"
+        if self.sharded:
+            return os.path.join(self.base_dir, f"{app_id % 256:02x}", name)
+        return os.path.join(self.base_dir, name)
+
+    def allocate(self, safe_name: str, from_dir: str = None):
+        """
+        Claims a new app directory; from_dir (a staging directory) is moved
+        into place instead of creating an empty one. Returns (app_id, app_dir).
+        """
+        while True:
+            app_id = self.next_id()
+            app_dir = self.app_path(app_id, safe_name)
+            if os.path.exists(app_dir):
+                continue  # Counter was reset or edited by hand
+            os.makedirs(os.path.dirname(app_dir), exist_ok=True)
+            if from_dir:
+                os.rename(from_dir, app_dir)
+            else:
+                os.makedirs(app_dir)
+            return app_id, app_dir
+
+    def record(self, app_id: int, app_dir: str, **fields):
+        """
+        Appends an index entry for an app (prompt, intent, status, ...).
+        """
+        entry = {"id": app_id, "dir": app_dir, "updated": time.time()}
+        entry.update(fields)
+        line = json.dumps(entry) + "\n"
+        with self._locked():
+            with open(os.path.join(self.registry_dir, INDEX_FILE), "a", encoding="utf-8") as f:
+                f.write(line)
+
+    def entries(self) -> dict:
+        """
+        Latest index entry per app ID.
+        """
+        latest = {}
+        try:
+            with open(os.path.join(self.registry_dir, INDEX_FILE), "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Partially written line
+                    latest[entry["id"]] = entry
+        except OSError:
+            pass
+        return latest
+
+    def lookup(self, app_id: int):
+        return self.entries().get(app_id)
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+def get_app_registry(base_dir: str) -> AppRegistry:
+    with _registries_lock:
+        key = os.path.abspath(base_dir)
+        if key not in _registries:
+            _registries[key] = AppRegistry(base_dir, SHARDED)
+        return _registries[key]
@@ -0,0 +1,252 @@
+import os
+import json
+import time
+import queue
+import atexit
+import threading
+import subprocess
+from utils.telemetry import get_metrics
+
+# ============================================
+# BUILD VERIFICATION
+# Optional post-write stage: every finished site is actually built, either
+# with esbuild (bundles src/main.jsx without writing output, so every
+# import is resolved and every file compiled) or with `vite build` (write
+# disabled). Builds run on a bounded pool of long-lived Node workers
+# (utils/build_worker.mjs) shared by all runs in the process, so a batch
+# pays Node and tool startup once per worker instead of once per site.
+# Build errors, mapped to site-relative file/line, are merged into the
+# validation report.
+# ============================================
+VERIFY_MODES = ("off", "esbuild", "vite")
+VERIFY_MODE = os.getenv("AUTOSITE_VERIFY", "off")
+VERIFY_WORKERS = int(os.getenv("AUTOSITE_VERIFY_WORKERS", "2"))
+VERIFY_TIMEOUT_SECONDS = float(os.getenv("AUTOSITE_VERIFY_TIMEOUT", "120"))
+NODE_BINARY = os.getenv("AUTOSITE_NODE", "node")
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "build_worker.mjs")
+
+_stats_lock = threading.Lock()
+_stats = {"pass": 0, "fail": 0, "error": 0, "skipped": 0, "seconds": 0.0}
+
+
+def configure_verification(mode: str = None, workers: int = None):
+    """
+    Sets the mode and/or pool size for sites finished from now on.
+    """
+    global VERIFY_MODE, VERIFY_WORKERS, _pool
+    if mode is not None:
+        if mode not in VERIFY_MODES:
+            raise ValueError(f"Unknown verification mode '{mode}' (expected one of {', '.join(VERIFY_MODES)})")
+        VERIFY_MODE = mode
+    if workers is not None and workers != VERIFY_WORKERS:
+        VERIFY_WORKERS = max(1, workers)
+        with _pool_lock:
+            if _pool is not None:
+                _pool.close()
+                _pool = None
+
+def verification_enabled() -> bool:
+    return VERIFY_MODE != "off"
+
+
+class NodeWorker:
+    """
+    One warm `node build_worker.mjs` process; handles one job at a time.
+    """
+
+    def __init__(self):
+        self.process = subprocess.Popen(
+            [NODE_BINARY, WORKER_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+        )
+        self._lines = queue.Queue()
+        self._next_id = 0
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self):
+        for line in self.process.stdout:
+            self._lines.put(line)
+        self._lines.put(None)  # Process exited
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def request(self, job: dict, timeout: float) -> dict:
+        self._next_id += 1
+        job = dict(job, id=self._next_id)
+        self.process.stdin.write(json.dumps(job) + "\n")
+        self.process.stdin.flush()
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                line = self._lines.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                raise TimeoutError(f"build did not finish within {timeout:.0f}s")
+            if line is None:
+                try:
+                    code = self.process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    code = None
+                raise RuntimeError(f"build worker exited with code {code}")
+            response = json.loads(line)
+            if response.get("id") == job["id"]:
+                return response  # Anything else is a late answer to a timed-out job
+
+    def kill(self):
+        if self.alive():
+            self.process.kill()
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            pass
+
+
+class BuildVerifierPool:
+    """
+    Bounded pool of NodeWorkers, started on first use and reused across
+    sites. At most `size` builds run at once; callers beyond that wait.
+    A worker that crashed or timed out is replaced by the next caller.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.started = 0
+        self._slots = queue.Queue()
+        for _ in range(size):
+            self._slots.put(None)  # Free slot, no worker yet
+        self._workers = set()
+        self._lock = threading.Lock()
+
+    def _spawn(self) -> NodeWorker:
+        worker = NodeWorker()
+        with self._lock:
+            self._workers.add(worker)
+            self.started += 1
+        return worker
+
+    def _discard(self, worker: NodeWorker):
+        worker.kill()
+        with self._lock:
+            self._workers.discard(worker)
+
+    def verify(self, site_dir: str, mode: str) -> dict:
+        worker = self._slots.get()
+        try:
+            if worker is None or not worker.alive():
+                if worker is not None:
+                    self._discard(worker)
+                worker = self._spawn()
+            return worker.request({"dir": os.path.abspath(site_dir), "mode": mode}, VERIFY_TIMEOUT_SECONDS)
+        except Exception:
+            if worker is not None:
+                self._discard(worker)
+            worker = None
+            raise
+        finally:
+            self._slots.put(worker)
+
+    def close(self):
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            worker.kill()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_verifier_pool() -> BuildVerifierPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BuildVerifierPool(VERIFY_WORKERS)
+        return _pool
+
+@atexit.register
+def _close_pool():
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+
+
+def _finish(report: dict, started: float) -> dict:
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    get_metrics().inc("autosite_build_verify_total", {"mode": report["mode"], "status": report["status"]})
+    with _stats_lock:
+        _stats[report["status"]] += 1
+        _stats["seconds"] += report["seconds"]
+    return report
+
+def verify_site(site_dir: str) -> dict:
+    """
+    Builds one written site. Returns {"status": "pass" | "fail" | "error" |
+    "skipped", "mode", "errors": [{"file", "line", "column", "message"}],
+    "seconds"}; "error" means the build tool could not run at all.
+    """
+    started = time.perf_counter()
+    report = {"status": "skipped", "mode": VERIFY_MODE, "errors": []}
+    if not verification_enabled():
+        return report
+    if not os.path.isdir(os.path.join(site_dir, "node_modules")):
+        report["message"] = "no node_modules (install skipped or failed)"
+        print(f"Build verification skipped: {report['message']}")
+        return _finish(report, started)
+
+    try:
+        response = get_verifier_pool().verify(site_dir, VERIFY_MODE)
+    except (OSError, RuntimeError, TimeoutError, ValueError) as e:
+        response = {"status": "error", "errors": [], "message": str(e)}
+
+    report["status"] = response.get("status", "error")
+    report["errors"] = response.get("errors") or []
+    if response.get("message"):
+        report["message"] = response["message"]
+    report = _finish(report, started)
+
+    if report["status"] == "fail":
+        print(f"Build verification ({VERIFY_MODE}) failed with {len(report['errors'])} error(s) in {report['seconds']:.2f}s")
+    elif report["status"] == "error":
+        print(f"Build verification ({VERIFY_MODE}) could not run: {report.get('message')}")
+    else:
+        print(f"Build verification ({VERIFY_MODE}) passed in {report['seconds']:.2f}s")
+    return report
+
+def merge_build_report(validation: dict, report: dict) -> dict:
+    """
+    Validation report with the build errors added as issues (and
+    file_issues) and the status set to fail. Other outcomes only attach
+    the build summary.
+    """
+    validation = dict(validation or {"status": "pass", "issues": [], "suggested_fixes": {}})
+    validation["build"] = {key: report.get(key) for key in ("status", "mode", "seconds")}
+    if report["status"] != "fail":
+        return validation
+
+    issues = list(validation.get("issues") or [])
+    file_issues = {path: list(found) for path, found in (validation.get("file_issues") or {}).items()}
+    for error in report["errors"]:
+        path = error.get("file")
+        where = f"{path}:{error['line']}" if path and error.get("line") else (path or "build")
+        issue = f"{where}: {error.get('message')} (build)"
+        issues.append(issue)
+        if path:
+            file_issues.setdefault(path, []).append(issue)
+    if not report["errors"]:
+        issues.append(f"{report['mode']} build failed")
+    validation.update(status="fail", issues=issues, file_issues=file_issues)
+    return validation
+
+def verification_summary() -> str:
+    with _stats_lock:
+        total = _stats["pass"] + _stats["fail"] + _stats["error"]
+        if not total:
+            return f"Build verification ({VERIFY_MODE}): no sites built"
+        workers = _pool.started if _pool is not None else 0
+        return (f"Build verification ({VERIFY_MODE}): {_stats['pass']}/{total} passed, {_stats['fail']} failed, "
+                f"{_stats['error']} could not build, {_stats['skipped']} skipped; "
+                f"{_stats['seconds'] / total:.2f}s avg on {workers} Node worker(s)")
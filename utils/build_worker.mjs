@@ -0,0 +1,90 @@
+// Build verification worker (see utils/build_verifier.py).
+// Reads one JSON job per line on stdin: {"id", "dir", "mode"} with mode
+// "esbuild" (bundle src/main.jsx without writing output) or "vite"
+// (`vite build` with write disabled). Answers each with one JSON line:
+// {"id", "status": "pass" | "fail" | "error", "errors": [{file, line, column, message}]}.
+// esbuild/vite are imported from the site's own node_modules; sites linked
+// to the shared node_modules store resolve to the same files, so after the
+// first job they come from Node's module cache.
+import { createRequire } from 'node:module';
+import { pathToFileURL } from 'node:url';
+import path from 'node:path';
+import readline from 'node:readline';
+
+const send = (message) => process.stdout.write(JSON.stringify(message) + '\n');
+// Tools may log; stdout is reserved for the protocol
+console.log = console.info = console.warn = console.error;
+// Vite's Node API is loaded through its CommonJS entry (resolved per site)
+process.env.VITE_CJS_IGNORE_WARNING ??= 'true';
+
+const ASSET_LOADERS = Object.fromEntries(
+  ['.svg', '.png', '.jpg', '.jpeg', '.gif', '.webp', '.ico', '.woff', '.woff2'].map((ext) => [ext, 'empty']),
+);
+
+async function load(dir, name) {
+  const require = createRequire(path.join(dir, 'package.json'));
+  const mod = await import(pathToFileURL(require.resolve(name)).href);
+  return mod.default && !mod.build ? mod.default : mod;
+}
+
+function relative(dir, file) {
+  if (!file) return null;
+  return (path.isAbsolute(file) ? path.relative(dir, file) : file).split(path.sep).join('/');
+}
+
+async function esbuildCheck(dir) {
+  const esbuild = await load(dir, 'esbuild');
+  try {
+    await esbuild.build({
+      absWorkingDir: dir,
+      entryPoints: ['src/main.jsx'],
+      outdir: 'dist',
+      bundle: true,
+      write: false,
+      logLevel: 'silent',
+      jsx: 'automatic',
+      loader: { '.js': 'jsx', ...ASSET_LOADERS },
+    });
+    return [];
+  } catch (e) {
+    if (!Array.isArray(e.errors)) throw e;
+    return e.errors.map((m) => ({
+      file: relative(dir, m.location && m.location.file),
+      line: m.location ? m.location.line : null,
+      column: m.location ? m.location.column : null,
+      message: m.text,
+    }));
+  }
+}
+
+async function viteCheck(dir) {
+  const vite = await load(dir, 'vite');
+  try {
+    await vite.build({ root: dir, logLevel: 'silent', build: { write: false, emptyOutDir: false } });
+    return [];
+  } catch (e) {
+    const loc = e.loc || {};
+    return [{
+      file: relative(dir, loc.file || e.id),
+      line: loc.line ?? null,
+      column: loc.column ?? null,
+      message: String(e.message || e).split('\n')[0],
+    }];
+  }
+}
+
+const CHECKS = { esbuild: esbuildCheck, vite: viteCheck };
+
+readline.createInterface({ input: process.stdin }).on('line', async (line) => {
+  let job = {};
+  try {
+    job = JSON.parse(line);
+    const check = CHECKS[job.mode];
+    if (!check) throw new Error(`unknown mode ${job.mode}`);
+    const errors = await check(job.dir);
+    send({ id: job.id, status: errors.length ? 'fail' : 'pass', errors });
+  } catch (e) {
+    // The tool itself could not run (not installed, broken config)
+    send({ id: job.id, status: 'error', errors: [], message: String((e && e.message) || e).split('\n')[0] });
+  }
+});
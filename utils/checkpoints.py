@@ -0,0 +1,63 @@
+import os
+import sqlite3
+import threading
+
+# ============================================
+# GRAPH CHECKPOINTS
+# The compiled graph persists AgentState after every node into a local
+# SQLite database (langgraph-checkpoint-sqlite), keyed by run ID as the
+# LangGraph thread_id. A run that fails mid-graph can then be resumed
+# from its last completed node with `main.py --resume <run-id>` instead
+# of repeating the planner/architect LLM calls. Checkpoints of runs that
+# finished are deleted.
+# ============================================
+CHECKPOINT_PATH = os.getenv("AUTOSITE_CHECKPOINT_DB", os.path.join(".autosite-cache", "checkpoints.sqlite"))
+ENABLED = os.getenv("AUTOSITE_CHECKPOINTS", "1") != "0"
+
+_savers = {}
+_savers_lock = threading.Lock()
+
+
+def configure_checkpoints(enabled: bool, path: str = None):
+    global ENABLED, CHECKPOINT_PATH
+    ENABLED = enabled
+    if path:
+        CHECKPOINT_PATH = path
+
+def get_checkpointer():
+    """
+    Shared SqliteSaver for CHECKPOINT_PATH, or None when checkpoints are
+    disabled or langgraph-checkpoint-sqlite is not installed. The saver
+    serializes access to its connection, so batch threads can share it.
+    Only the sync graph API is supported (invoke/stream).
+    """
+    if not ENABLED:
+        return None
+    try:
+        from langgraph.checkpoint.sqlite import SqliteSaver
+    except ImportError:
+        print("Checkpoints disabled: install langgraph-checkpoint-sqlite to enable --resume")
+        return None
+
+    with _savers_lock:
+        saver = _savers.get(CHECKPOINT_PATH)
+        if saver is None:
+            os.makedirs(os.path.dirname(CHECKPOINT_PATH) or ".", exist_ok=True)
+            conn = sqlite3.connect(CHECKPOINT_PATH, check_same_thread=False)
+            saver = _savers[CHECKPOINT_PATH] = SqliteSaver(conn)
+        return saver
+
+def run_config(run_id: str, **configurable) -> dict:
+    """
+    Graph config for one run; the run ID doubles as the checkpoint thread.
+    """
+    return {"configurable": {"thread_id": run_id, **configurable}}
+
+def delete_checkpoints(app, run_id: str):
+    saver = getattr(app, "checkpointer", None)
+    if saver is None or not hasattr(saver, "delete_thread"):
+        return
+    try:
+        saver.delete_thread(run_id)
+    except Exception as e:
+        print(f"Could not delete checkpoints of run {run_id}: {e}")
@@ -0,0 +1,219 @@
+import os
+import re
+import json
+from utils.resources import get_blueprint, get_library_entry, get_library_names
+from utils.plan_index import normalize_prompt
+from utils.telemetry import get_metrics
+
+# ============================================
+# COMPONENT LIBRARY
+# library/<blueprint>/ holds a versioned, pre-validated implementation of
+# a blueprint (manifest.json + src/). When the planner picks a blueprint
+# that has a library entry and the prompt asks for nothing the entry does
+# not cover, the architect and coder skip their LLM calls: the site is
+# assembled from the library by filling its slots (title, tagline, accent
+# color, mock data in src/siteConfig.js). Anything else falls back to
+# generation as before.
+# ============================================
+LIBRARY_ENABLED = os.getenv("AUTOSITE_LIBRARY", "1") != "0"
+# Share of the prompt's content words the entry must cover
+MATCH_THRESHOLD = float(os.getenv("AUTOSITE_LIBRARY_THRESHOLD", "0.8"))
+CONFIG_FILE = "src/siteConfig.js"
+ACCENT_TOKEN = "@@accent@@"
+
+# Tailwind palettes an accent slot may take
+ACCENT_COLORS = {
+    "slate", "gray", "zinc", "red", "orange", "amber", "yellow", "lime", "green", "emerald",
+    "teal", "cyan", "sky", "blue", "indigo", "violet", "purple", "fuchsia", "pink", "rose",
+}
+COLOR_ALIASES = {"grey": "gray", "navy": "blue", "gold": "amber", "magenta": "fuchsia", "lavender": "violet"}
+
+# Presentation words every library entry satisfies
+COMMON_WORDS = {
+    "modern", "clean", "responsive", "beautiful", "nice", "good", "cool", "minimal", "minimalist", "elegant",
+    "colorful", "colourful", "color", "colour", "theme", "themed", "style", "styled", "stylish", "look",
+    "ui", "ux", "interface", "layout", "card", "tailwind", "css", "react", "vite", "component", "mobile",
+    "friendly", "user", "use", "using", "allow", "let", "show", "display", "view", "item", "button", "input",
+    "form", "new", "one", "all", "each", "it", "is", "be", "has", "have", "their", "your", "them", "this",
+    "from", "by", "as", "at", "also", "just", "small", "quick", "easy", "fun", "single", "home", "where",
+    "should", "will", "so", "they", "who",
+}
+
+_WORD = re.compile(r"[a-z0-9]+")
+_CAMEL = re.compile(r"[A-Z]?[a-z0-9]+")
+
+
+def configure_library(enabled: bool):
+    global LIBRARY_ENABLED
+    LIBRARY_ENABLED = enabled
+
+def entry_id(entry: dict) -> str:
+    return f"{entry['name']}@{entry['manifest'].get('version', '0')}"
+
+def _stem(word: str) -> str:
+    for suffix in ("ing", "es", "ed", "s"):
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+def _vocabulary(entry: dict) -> set:
+    """
+    Words the entry covers: its keywords, its blueprint's name, layout,
+    state and events, and the presentation words every entry covers.
+    """
+    words = set(COMMON_WORDS) | ACCENT_COLORS | set(COLOR_ALIASES)
+    words.update(entry["manifest"].get("keywords", []))
+    words.update(entry["name"].split("_"))
+    blueprint = get_blueprint(entry["name"]) or {}
+    for name in (blueprint.get("layout") or []) + (blueprint.get("events") or []):
+        words.update(w.lower() for w in _CAMEL.findall(name))
+    for state in blueprint.get("state") or []:
+        words.update(_WORD.findall(str(state).lower()))
+    return {_stem(w) for w in words}
+
+def library_coverage(entry: dict, user_prompt: str) -> float:
+    words = [_stem(w) for w in normalize_prompt(user_prompt)]
+    if not words:
+        return 1.0
+    vocabulary = _vocabulary(entry)
+    return sum(1 for w in words if w in vocabulary) / len(words)
+
+def match_library(plan: dict, user_prompt: str):
+    """
+    Returns the library entry for the plan's blueprint when it covers the
+    prompt (>= MATCH_THRESHOLD of its content words), else None.
+    """
+    if not LIBRARY_ENABLED:
+        return None
+    name = plan.get("blueprint")
+    entry = get_library_entry(name) if name and name != "custom" else None
+    if entry is None:
+        return None
+
+    coverage = library_coverage(entry, user_prompt)
+    if coverage < MATCH_THRESHOLD:
+        get_metrics().inc("autosite_library_total", {"result": "unmatched"})
+        print(f"Library: {entry_id(entry)} covers {coverage:.0%} of the prompt (< {MATCH_THRESHOLD:.0%}); generating")
+        return None
+    get_metrics().inc("autosite_library_total", {"result": "matched"})
+    print(f"Library: assembling from {entry_id(entry)} (covers {coverage:.0%} of the prompt)")
+    return entry
+
+def library_covers(name: str, user_prompt: str) -> bool:
+    """
+    Whether a plan choosing blueprint `name` would be assembled from the
+    library for this prompt (match_library without counting or logging).
+    """
+    if not LIBRARY_ENABLED or not name or name == "custom":
+        return False
+    entry = get_library_entry(name)
+    return entry is not None and library_coverage(entry, user_prompt) >= MATCH_THRESHOLD
+
+def library_architecture(entry: dict) -> dict:
+    """
+    Architecture of a library entry; "library" tells the coder to assemble it.
+    """
+    blueprint = get_blueprint(entry["name"]) or {}
+    return {
+        "library": entry_id(entry),
+        "component_export_style": "default",
+        "entry": "src/main.jsx",
+        "router": "src/App.jsx",
+        "pages": [],
+        "components": [dict(component) for component in entry["manifest"].get("components", [])],
+        "state": blueprint.get("state", []),
+        "events": blueprint.get("events", []),
+        "styles": ["src/index.css"],
+    }
+
+def library_architecture_for(state: dict):
+    """
+    Library architecture for the state's plan, or None to generate one.
+    """
+    entry = match_library(state.get("plan") or {}, state.get("user_prompt", ""))
+    return library_architecture(entry) if entry else None
+
+def _accent(entry: dict, plan: dict, user_prompt: str) -> str:
+    texts = [user_prompt] + [str(r) for r in plan.get("ui_requirements", []) or []]
+    for text in texts:
+        for word in _WORD.findall(text.lower()):
+            word = COLOR_ALIASES.get(word, word)
+            if word in ACCENT_COLORS:
+                return word
+    accent = entry["manifest"].get("accent", "indigo")
+    return accent if accent in ACCENT_COLORS else "indigo"
+
+def _data(entry: dict, plan: dict) -> dict:
+    """
+    The entry's mock data, with same-typed values the plan supplied.
+    """
+    data = dict(entry["manifest"].get("data", {}))
+    for key in ("mock_data", "data"):
+        supplied = plan.get(key)
+        if not isinstance(supplied, dict):
+            continue
+        for name, value in supplied.items():
+            if name in data and type(value) is type(data[name]):
+                data[name] = value
+    return data
+
+def assemble(entry: dict, plan: dict, user_prompt: str = "") -> dict:
+    """
+    Fills the entry's slots for this plan. Returns {path: content}.
+    """
+    manifest = entry["manifest"]
+    accent = _accent(entry, plan, user_prompt)
+    site = {
+        "title": plan.get("app_name") or entry["name"].replace("_", " ").title(),
+        "tagline": plan.get("description") or manifest.get("tagline", ""),
+        "data": _data(entry, plan),
+    }
+    code = {path: content.replace(ACCENT_TOKEN, accent) for path, content in entry["files"].items()}
+    code[CONFIG_FILE] = (
+        f"// Generated from library/{entry_id(entry)}\n"
+        f"const site = {json.dumps(site, indent=2, ensure_ascii=False)};\n\n"
+        "export default site;\n"
+    )
+    return code
+
+def library_code(state: dict):
+    """
+    Assembled code when the architecture came from the library, else None.
+    A library entry changed since the architecture was made (resumed or
+    reused runs) falls back to generation.
+    """
+    wanted = (state.get("architecture") or {}).get("library")
+    if not wanted or not LIBRARY_ENABLED:
+        return None
+    entry = get_library_entry(wanted.split("@", 1)[0])
+    if entry is None or entry_id(entry) != wanted:
+        get_metrics().inc("autosite_library_total", {"result": "stale"})
+        print(f"Library: {wanted} is no longer available; generating")
+        return None
+    get_metrics().inc("autosite_library_total", {"result": "assembled"})
+    return assemble(entry, state.get("plan") or {}, state.get("user_prompt", ""))
+
+def check_library() -> list:
+    """
+    Assembles every entry with its defaults and runs the static validator
+    on it. Returns a list of problems (empty when all entries pass).
+    """
+    from agents.validator import static_validation
+
+    problems = []
+    for name in get_library_names():
+        entry = get_library_entry(name)
+        blueprint = get_blueprint(name)
+        if blueprint is None:
+            problems.append(f"{entry_id(entry)}: no blueprints/{name}.json")
+            continue
+        intent = entry["manifest"].get("intent", "static_ui")
+        plan = {"app_name": name.replace("_", " ").title(), "blueprint": name, "app_intent": intent}
+        state = {"plan": plan, "architecture": library_architecture(entry), "code": assemble(entry, plan)}
+        result = (static_validation(state, {}, record=False)[0] or {}).get("validation") or {}
+        if result.get("status") != "pass":
+            problems.append(f"{entry_id(entry)}: {'; '.join(result.get('issues', [])) or 'needs LLM validation'}")
+        for warning in result.get("warnings", []):
+            problems.append(f"{entry_id(entry)}: {warning}")
+        print(f"Library: {entry_id(entry)} -> {result.get('status', 'undecided')}")
+    return problems
@@ -0,0 +1,162 @@
+import os
+import re
+import json
+import threading
+from utils.resources import get_blueprints
+
+# ============================================
+# TOKEN-BUDGETED CONTEXT BUILDER
+# Keeps agent prompts small: only relevant blueprints, compact JSON,
+# and a per-agent record of estimated input tokens.
+# ============================================
+BLUEPRINT_TOKEN_BUDGET = int(os.getenv("AUTOSITE_BLUEPRINT_TOKEN_BUDGET", "400"))
+MAX_BLUEPRINT_CANDIDATES = 2
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Prompt words mapped onto blueprint vocabulary ("task list" -> todo)
+SYNONYMS = {
+    "task": "todo", "tasks": "todo", "checklist": "todo", "reminder": "todo", "reminders": "todo",
+    "expense": "budget", "expenses": "budget", "spending": "budget", "finance": "budget",
+    "zomato": "food", "swiggy": "food", "restaurant": "food", "restaurants": "food", "menu": "food",
+    "delivery": "ordering", "order": "ordering",
+    "calc": "calculator", "arithmetic": "calculator",
+    "resume": "portfolio", "cv": "portfolio", "personal": "portfolio",
+}
+
+_token_lock = threading.Lock()
+_token_stats = {}
+
+def compact_json(obj) -> str:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate (~4 characters per token for English/code).
+    """
+    return (len(text) + 3) // 4
+
+def record_prompt_tokens(agent: str, messages) -> int:
+    """
+    Logs and accumulates the estimated input tokens of one agent call.
+    """
+    tokens = sum(estimate_tokens(m.content) for m in messages)
+    with _token_lock:
+        stats = _token_stats.setdefault(agent, {"calls": 0, "input_tokens": 0})
+        stats["calls"] += 1
+        stats["input_tokens"] += tokens
+    print(f"[tokens] {agent}: ~{tokens} input tokens")
+    return tokens
+
+def token_summary() -> dict:
+    with _token_lock:
+        return {agent: dict(stats) for agent, stats in _token_stats.items()}
+
+def _words(text: str) -> set:
+    return set(_WORD.findall(text.lower()))
+
+def _prompt_words(prompt: str) -> set:
+    words = _words(prompt)
+    return words | {SYNONYMS[w] for w in words if w in SYNONYMS}
+
+def _camel_words(name: str) -> set:
+    return set(w.lower() for w in re.findall(r"[A-Z]?[a-z0-9]+|[A-Z]+(?![a-z])", name))
+
+def _index_terms(name: str, blueprint: dict) -> dict:
+    """
+    Lexical index entry: name words weigh most, then layout/events, then text.
+    """
+    terms = {}
+    for word in _words(name.replace("_", " ")):
+        terms[word] = terms.get(word, 0) + 3
+    for entry in blueprint.get("layout", []) + blueprint.get("events", []) + blueprint.get("state", []):
+        for word in _camel_words(entry.split(" ")[0]):
+            terms[word] = terms.get(word, 0) + 1
+    for entry in blueprint.get("features", []) + blueprint.get("ui", []):
+        for word in _words(entry):
+            terms[word] = terms.get(word, 0) + 1
+    return terms
+
+def select_blueprints(prompt: str, app_intent: str, blueprints: dict = None) -> dict:
+    """
+    Picks at most MAX_BLUEPRINT_CANDIDATES blueprints relevant to the prompt,
+    within BLUEPRINT_TOKEN_BUDGET. Scores by lexical overlap with the
+    blueprint's name/layout/events, plus a bonus when its app_type matches
+    the rule-based intent.
+    """
+    if blueprints is None:
+        blueprints = get_blueprints()
+
+    prompt_words = _prompt_words(prompt)
+    scored = []
+    for name, blueprint in blueprints.items():
+        terms = _index_terms(name, blueprint)
+        score = sum(weight for word, weight in terms.items() if word in prompt_words)
+        if blueprint.get("app_type") == app_intent:
+            score += 1
+        if score > 0:
+            scored.append((score, name))
+    scored.sort(key=lambda item: (-item[0], item[1]))
+
+    selected = {}
+    used = 0
+    for _, name in scored[:MAX_BLUEPRINT_CANDIDATES]:
+        cost = estimate_tokens(compact_json(blueprints[name]))
+        if selected and used + cost > BLUEPRINT_TOKEN_BUDGET:
+            break
+        selected[name] = blueprints[name]
+        used += cost
+    return selected
+
+# ============================================
+# INCREMENTAL EDITS
+# A follow-up change only ships the files it is likely to touch, plus a
+# compact architecture summary instead of the full architecture.
+# ============================================
+MAX_EDIT_FILES = int(os.getenv("AUTOSITE_EDIT_MAX_FILES", "4"))
+
+def architecture_summary(architecture: dict) -> dict:
+    """
+    Names, files and props only; drops descriptions and state details.
+    """
+    summary = {}
+    pages = [{"name": p.get("name"), "file": p.get("file")}
+             for p in architecture.get("pages", []) or [] if isinstance(p, dict)]
+    components = [{"name": c.get("name"), "file": c.get("file"), "props": c.get("props", [])}
+                  for c in architecture.get("components", []) or [] if isinstance(c, dict)]
+    if pages:
+        summary["pages"] = pages
+    if components:
+        summary["components"] = components
+    if architecture.get("router"):
+        summary["router"] = architecture["router"]
+    return summary
+
+def select_files(change: str, code: dict, limit: int = MAX_EDIT_FILES) -> list:
+    """
+    Ranks generated files by how likely a change request is to touch them:
+    an explicit path or component name weighs most, then words of the file
+    name, then longer words that appear in the file. Files scoring under
+    half the best match are dropped. Falls back to src/App.jsx when
+    nothing matches.
+    """
+    change_words = _prompt_words(change)
+    lowered = change.lower()
+    scored = []
+    for path, content in code.items():
+        if not isinstance(content, str):
+            continue
+        stem = os.path.splitext(os.path.basename(path))[0]
+        score = 0
+        if path.lower() in lowered or (len(stem) > 2 and stem.lower() in lowered):
+            score += 10
+        score += 3 * len(_camel_words(stem) & change_words)
+        score += len({w for w in change_words if len(w) > 3} & _words(content))
+        if score > 0:
+            scored.append((score, path))
+    scored.sort(key=lambda item: (-item[0], item[1]))
+
+    selected = [path for score, path in scored[:limit] if score * 2 >= scored[0][0]]
+    if not selected:
+        selected = [p for p in ("src/App.jsx", "src/App.tsx") if p in code][:1]
+    return selected
@@ -0,0 +1,40 @@
+import os
+import time
+import shutil
+from contextlib import contextmanager
+
+# ============================================
+# CROSS-PROCESS LOCK
+# mkdir is atomic, so whoever creates the lock directory holds the lock.
+# A lock older than `stale_seconds` was left by a crashed process and is
+# broken. Used by the app registry, the plan index, the validator metrics
+# and the node_modules store.
+# ============================================
+LOCK_STALE_SECONDS = 30
+POLL_SECONDS = 0.01
+
+
+@contextmanager
+def dir_lock(lock_dir: str, stale_seconds: float = LOCK_STALE_SECONDS, poll_seconds: float = POLL_SECONDS):
+    """
+    Holds the lock for the duration of the `with` block. Does not guard
+    against threads of the same process; callers pair it with a
+    threading.Lock so workers do not spin on the directory.
+    """
+    os.makedirs(os.path.dirname(lock_dir) or ".", exist_ok=True)
+    while True:
+        try:
+            os.mkdir(lock_dir)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_dir) > stale_seconds:
+                    shutil.rmtree(lock_dir, ignore_errors=True)
+                    continue
+            except OSError:
+                continue  # Released while we looked
+            time.sleep(poll_seconds)
+    try:
+        yield
+    finally:
+        shutil.rmtree(lock_dir, ignore_errors=True)
@@ -0,0 +1,327 @@
+import os
+import re
+import json
+import time
+import asyncio
+import threading
+from utils.llm_cache import get_cache
+from utils.context_builder import compact_json, estimate_tokens
+from utils.resources import get_blueprint
+
+# ============================================
+# OFFLINE LLM BACKENDS
+# "fake":   synthesizes a valid response for each agent from its prompt
+# "replay": serves responses recorded from a real run (AUTOSITE_LLM_RECORD)
+# Both simulate network latency, a token rate and an output limit
+# (responses are cut off after max_output_tokens) so the pipeline can be
+# measured without Groq.
+# ============================================
+FAKE_LATENCY_MS = float(os.getenv("AUTOSITE_FAKE_LATENCY_MS", "0"))
+FAKE_TOKENS_PER_SEC = float(os.getenv("AUTOSITE_FAKE_TOKENS_PER_SEC", "0"))
+FAKE_MAX_OUTPUT_TOKENS = int(os.getenv("AUTOSITE_FAKE_MAX_OUTPUT_TOKENS", "0"))
+REPLAY_PATH = os.getenv("AUTOSITE_LLM_REPLAY", os.path.join(".autosite-cache", "llm-recordings.jsonl"))
+RECORD_PATH = os.getenv("AUTOSITE_LLM_RECORD")
+CHUNK_TOKENS = 8
+
+FALLBACK_LAYOUT = ["Header", "MainPanel", "Footer"]
+CATEGORIES = {"logic_basic": "logic-heavy", "crud_basic": "data-driven",
+              "data_complex": "data-driven", "static_ui": "static-ui"}
+
+_ROLE = re.compile(r"You are the (\w+) agent")
+_record_lock = threading.Lock()
+_recorded_keys = set()
+
+
+class FakeMessage:
+    def __init__(self, content: str):
+        self.content = content
+
+
+def configure_pacing(latency_ms: float = None, tokens_per_sec: float = None, max_output_tokens: int = None):
+    """
+    Overrides the simulated latency/token rate/output limit (0 = none) for
+    models created afterwards.
+    """
+    global FAKE_LATENCY_MS, FAKE_TOKENS_PER_SEC, FAKE_MAX_OUTPUT_TOKENS
+    if latency_ms is not None:
+        FAKE_LATENCY_MS = latency_ms
+    if tokens_per_sec is not None:
+        FAKE_TOKENS_PER_SEC = tokens_per_sec
+    if max_output_tokens is not None:
+        FAKE_MAX_OUTPUT_TOKENS = max_output_tokens
+
+def record_response(key: str, agent: str, text: str):
+    """
+    Appends one real response to the AUTOSITE_LLM_RECORD file so it can be
+    replayed later with AUTOSITE_LLM_BACKEND=replay.
+    """
+    if not RECORD_PATH:
+        return
+    with _record_lock:
+        if key in _recorded_keys:
+            return  # Cache hits repeat responses already recorded
+        _recorded_keys.add(key)
+        os.makedirs(os.path.dirname(RECORD_PATH) or ".", exist_ok=True)
+        with open(RECORD_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"key": key, "agent": agent, "response": text}) + "\n")
+
+# ============================================
+# RESPONSE SYNTHESIS (fake backend)
+# ============================================
+def _section(text: str, label: str, end: str = "\n\n") -> str:
+    start = text.find(label)
+    if start == -1:
+        return ""
+    start += len(label)
+    stop = text.find(end, start)
+    return (text[start:] if stop == -1 else text[start:stop]).strip()
+
+def _json_section(text: str, label: str, end: str = "\n\n"):
+    raw = _section(text, label, end)
+    try:
+        return json.loads(raw) if raw else {}
+    except ValueError:
+        return {}
+
+def _state_names(blueprint: dict) -> list:
+    return [entry.split(" ")[0] for entry in blueprint.get("state", [])]
+
+def _handler(event: str) -> str:
+    return "handle" + event[0].upper() + event[1:]
+
+def _component_source(name: str) -> str:
+    return f"""export default function {name}({{ items, onAction }}) {{
+  return (
+    <div className="p-4 bg-white rounded-lg shadow flex flex-col gap-2">
+      <h2 className="text-lg font-semibold text-gray-800">{name}</h2>
+      {{items.map((item) => (
+        <button
+          key={{item.id}}
+          className="px-3 py-1 bg-blue-500 text-white rounded"
+          onClick={{() => onAction(item.id)}}
+        >
+          {{item.label}}
+        </button>
+      ))}}
+    </div>
+  );
+}}
+"""
+
+def _app_source(components: list, blueprint: dict) -> str:
+    """
+    App.jsx importing every component and declaring the blueprint's state
+    and a handler per blueprint event.
+    """
+    events = blueprint.get("events", []) or ["select"]
+    lines = ["import { useState } from 'react';"]
+    lines += [f"import {name} from './{path[len('src/'):-len('.jsx')]}';" for name, path in components]
+    lines += ["", "export default function App() {",
+              "  const [records, setRecords] = useState([",
+              "    { id: 1, label: 'First item' },",
+              "    { id: 2, label: 'Second item' },",
+              "  ]);",
+              "  const [lastEvent, setLastEvent] = useState(null);"]
+    for state_name in _state_names(blueprint):
+        if state_name in ("records", "lastEvent"):
+            continue
+        setter = "set" + state_name[0].upper() + state_name[1:]
+        lines.append(f"  const [{state_name}, {setter}] = useState(null);")
+    for event in events:
+        lines.append(f"  const {_handler(event)} = (id) => setLastEvent('{event}:' + id);")
+    lines += ["", "  return (",
+              '    <div className="min-h-screen bg-gray-100 p-6 grid gap-4">']
+    for i, (name, _) in enumerate(components):
+        lines.append(f"      <{name} items={{records}} onAction={{{_handler(events[i % len(events)])}}} />")
+    lines += ['      <p className="text-sm text-gray-500">{lastEvent}</p>',
+              "    </div>", "  );", "}", ""]
+    return "\n".join(lines)
+
+def _component_files(names) -> list:
+    return [(name, f"src/components/{name}.jsx") for name in names]
+
+def _plan_response(human: str) -> dict:
+    request = _section(human, "User Request:")
+    intent = _section(human, "APP INTENT LEVEL:", "\n") or "static_ui"
+    candidates = _json_section(human, "Available Blueprints (or 'custom'):", "\n\n\n")
+    blueprint = next(iter(candidates), "custom")
+    words = re.findall(r"[A-Za-z0-9]+", request)[:4] or ["Generated", "App"]
+    return {
+        "app_name": " ".join(w.capitalize() for w in words),
+        "framework": "react",
+        "category": CATEGORIES.get(intent, "static-ui"),
+        "blueprint": blueprint,
+        "functional_requirements": [request[:120]],
+        "ui_requirements": ["card layout"],
+        "pages": [{"name": "Home", "route": "/", "purpose": request[:80]}],
+        "features": [],
+        "styling": "css",
+    }
+
+def _architecture_response(human: str) -> dict:
+    plan = _json_section(human, "Project Plan:")
+    blueprint = get_blueprint(plan.get("blueprint", "")) if plan.get("blueprint") not in (None, "custom") else None
+    layout = (blueprint or {}).get("layout") or FALLBACK_LAYOUT
+    return {
+        "component_export_style": "default",
+        "entry": "src/main.jsx",
+        "router": "src/App.jsx",
+        "pages": [],
+        "components": [{"name": name, "file": path, "props": ["items", "onAction"]}
+                       for name, path in _component_files(layout)],
+        "styles": [],
+    }
+
+def _architecture_components(architecture: dict) -> list:
+    components = []
+    for component in architecture.get("components", []) or []:
+        if isinstance(component, dict) and isinstance(component.get("file"), str):
+            name = component.get("name") or os.path.splitext(os.path.basename(component["file"]))[0]
+            components.append((name, component["file"]))
+    return components
+
+def _code_response(human: str) -> dict:
+    architecture = _json_section(human, "Architecture:")
+    blueprint = _json_section(human, "Blueprint:")
+    components = _architecture_components(architecture)
+    code = {"src/App.jsx": _app_source(components, blueprint)}
+    for name, path in components:
+        code[path] = _component_source(name)
+
+    # Budgeted chunks and continuations ask for part of the project
+    only = _json_section(human, "Generate Only:")
+    done = set(_json_section(human, "Already Generated:") or [])
+    return {path: content for path, content in code.items()
+            if (not only or path in only) and path not in done}
+
+def _file_response(human: str) -> dict:
+    target = _section(human, "Target File:", "\n")
+    blueprint = _json_section(human, "Blueprint:")
+    if target == "src/App.jsx":
+        files = _json_section(human, "Project Files:")
+        components = [(os.path.splitext(os.path.basename(p))[0], p) for p in files
+                      if p.startswith("src/components/")]
+        return {target: _app_source(components, blueprint)}
+    name = _section(human, "Component Name:", "\n") or os.path.splitext(os.path.basename(target))[0]
+    return {target: _component_source(name)}
+
+def _repair_response(human: str) -> dict:
+    path = _section(human, "File:", "\n")
+    return {path: human.split("Current Contents:\n", 1)[-1]}
+
+def _edit_response(human: str) -> dict:
+    change = _section(human, "Change Request:", "\n")
+    files = _json_section(human, "Files To Edit:", "\n\n\n")
+    return {path: f"// Change: {change}\n{content}" for path, content in files.items()}
+
+def synthesize_response(messages) -> str:
+    """
+    Builds a deterministic, pipeline-valid response for the agent whose
+    system prompt opens the conversation.
+    """
+    role = _ROLE.search(messages[0].content)
+    role = role.group(1).lower() if role else ""
+    human = messages[-1].content
+
+    if role == "planner":
+        result = _plan_response(human)
+    elif role == "architect":
+        result = _architecture_response(human)
+    elif role == "coder":
+        result = _file_response(human) if "Target File:" in human else _code_response(human)
+    elif role == "validator":
+        result = {"status": "pass", "issues": [], "suggested_fixes": {}}
+    elif role == "repair":
+        result = _repair_response(human)
+    elif role == "editor":
+        result = _edit_response(human)
+    else:
+        result = {}
+    return compact_json(result)
+
+# ============================================
+# CHAT MODELS
+# ============================================
+class FakeChatModel:
+    """
+    Drop-in for the ChatGroq methods the agents use (invoke/ainvoke/
+    stream/astream). Waits latency_ms before the first token, then
+    releases tokens at tokens_per_sec (0 = instantly).
+    """
+
+    def __init__(self, latency_ms: float = None, tokens_per_sec: float = None, max_output_tokens: int = None):
+        self.latency_ms = FAKE_LATENCY_MS if latency_ms is None else latency_ms
+        self.tokens_per_sec = FAKE_TOKENS_PER_SEC if tokens_per_sec is None else tokens_per_sec
+        self.max_output_tokens = FAKE_MAX_OUTPUT_TOKENS if max_output_tokens is None else max_output_tokens
+
+    def _respond(self, messages) -> str:
+        return synthesize_response(messages)
+
+    def _limited(self, messages) -> str:
+        text = self._respond(messages)
+        if self.max_output_tokens > 0:
+            return text[:self.max_output_tokens * 4]
+        return text
+
+    def _chunks(self, text: str) -> list:
+        size = CHUNK_TOKENS * 4
+        return [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+    def _generation_seconds(self, text: str) -> float:
+        return estimate_tokens(text) / self.tokens_per_sec if self.tokens_per_sec > 0 else 0.0
+
+    def invoke(self, messages) -> FakeMessage:
+        text = self._limited(messages)
+        time.sleep(self.latency_ms / 1000.0 + self._generation_seconds(text))
+        return FakeMessage(text)
+
+    async def ainvoke(self, messages) -> FakeMessage:
+        text = self._limited(messages)
+        await asyncio.sleep(self.latency_ms / 1000.0 + self._generation_seconds(text))
+        return FakeMessage(text)
+
+    def stream(self, messages):
+        text = self._limited(messages)
+        time.sleep(self.latency_ms / 1000.0)
+        for chunk in self._chunks(text):
+            time.sleep(self._generation_seconds(chunk))
+            yield FakeMessage(chunk)
+
+    async def astream(self, messages):
+        text = self._limited(messages)
+        await asyncio.sleep(self.latency_ms / 1000.0)
+        for chunk in self._chunks(text):
+            await asyncio.sleep(self._generation_seconds(chunk))
+            yield FakeMessage(chunk)
+
+
+class ReplayChatModel(FakeChatModel):
+    """
+    Serves recorded responses keyed like the LLM cache (model + messages).
+    A prompt that was never recorded raises LookupError.
+    """
+
+    def __init__(self, model: str, path: str = REPLAY_PATH, **pacing):
+        super().__init__(**pacing)
+        self.model = model
+        self.path = path
+        self._responses = {}
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._responses[entry["key"]] = entry["response"]
+
+    def _respond(self, messages) -> str:
+        key = get_cache().make_key(self.model, messages)
+        if key not in self._responses:
+            raise LookupError(f"No recorded response for prompt {key[:12]} in {self.path}")
+        return self._responses[key]
+
+
+def create_fake_llm(backend: str, model: str):
+    if backend == "fake":
+        return FakeChatModel()
+    if backend == "replay":
+        return ReplayChatModel(model)
+    raise ValueError(f"Unknown offline LLM backend '{backend}'")
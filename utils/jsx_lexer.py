@@ -0,0 +1,446 @@
+import re
+
+# ============================================
+# SINGLE-PASS JSX LEXER
+# Walks a source file once and builds a fact table used by the validator:
+# exports, imports, hooks, event handlers, Tailwind classes, JSX components
+# and delimiter balance (with line numbers). Strings, template literals,
+# comments, regex literals and JSX text are skipped properly, so braces
+# inside them are never miscounted.
+# ============================================
+
+_IDENT_START = re.compile(r"[A-Za-z_$]")
+_IDENT = re.compile(r"[A-Za-z_$][\w$]*")
+_JSX_NAME = re.compile(r"[A-Za-z_$][\w$.:-]*")
+_JSX_ATTR = re.compile(r"[A-Za-z_$][\w$:-]*")
+_NUMBER = re.compile(r"\d[\w.]*|\.\d[\w]*")
+_IMPORT = re.compile(
+    r"import\s+(?:type\s+)?(?:([A-Za-z_$][\w$]*)\s*,?\s*)?"
+    r"(?:\{([^}]*)\}\s*|\*\s*as\s+([A-Za-z_$][\w$]*)\s*)?"
+    r"(?:from\s*)?(['\"])([^'\"\n]+)\4"
+)
+_HOOK = re.compile(r"use[A-Z]\w*$")
+_HANDLER = re.compile(r"on[A-Z]\w*$")
+
+# After these keywords an expression starts, so `/` is a regex and `<` is JSX
+_EXPR_KEYWORDS = {
+    "return", "typeof", "instanceof", "in", "of", "new", "delete", "void",
+    "throw", "case", "do", "else", "yield", "await", "export", "default",
+}
+# Keywords that look like calls (`if (`) but are not
+_NOT_CALLS = {"if", "for", "while", "switch", "catch", "return", "function", "typeof", "await", "new"}
+_OPENERS = {"(": ")", "[": "]", "{": "}"}
+_CLOSERS = {")": "(", "]": "[", "}": "{"}
+
+
+class _Lexer:
+    def __init__(self, source: str):
+        self.src = source
+        self.n = len(source)
+        self.i = 0
+        self.line = 1
+        # Context stack: js / template / jsx frames
+        self.stack = [{"kind": "js", "last": "op", "classes": False}]
+        # Open delimiters: (char, line, role) where role marks `{` that
+        # opened a template or JSX expression
+        self.delims = []
+        self.facts = {
+            "exports": {"default": False, "named": []},
+            "imports": [],
+            "hooks": set(),
+            "handlers": set(),
+            "class_names": set(),
+            "calls": set(),
+            "identifiers": set(),
+            "components_used": set(),
+            "has_jsx": False,
+            "errors": [],
+        }
+
+    # ---------- helpers ----------
+    def error(self, message, line=None):
+        self.facts["errors"].append({"line": line or self.line, "message": message})
+
+    def advance_to(self, j):
+        self.line += self.src.count("\n", self.i, j)
+        self.i = j
+
+    def skip_ws(self):
+        j = self.i
+        while j < self.n and self.src[j] in " \t\r\n":
+            j += 1
+        self.advance_to(j)
+
+    def add_classes(self, text):
+        for token in text.split():
+            self.facts["class_names"].add(token)
+
+    def collecting_classes(self):
+        return self.stack[-1].get("classes", False)
+
+    # ---------- driver ----------
+    def run(self):
+        while self.i < self.n:
+            kind = self.stack[-1]["kind"]
+            if kind == "js":
+                self.js_step()
+            elif kind == "template":
+                self.template_step()
+            else:
+                self.jsx_step()
+
+        for frame in self.stack[1:]:
+            if frame["kind"] == "template":
+                self.error("Unterminated template literal", frame["line"])
+            elif frame["kind"] == "jsx":
+                tag = frame["tags"][-1][0] if frame["tags"] else ""
+                self.error(f"Unclosed JSX element <{tag}>", frame["line"])
+        for char, line, _ in self.delims:
+            self.error(f"Unclosed '{char}'", line)
+
+        self.facts["errors"].sort(key=lambda e: e["line"])
+        self.facts["balanced"] = not self.facts["errors"]
+        return self.facts
+
+    # ---------- JavaScript ----------
+    def js_step(self):
+        src, i = self.src, self.i
+        frame = self.stack[-1]
+        ch = src[i]
+
+        if ch in " \t\r\n":
+            self.skip_ws()
+            return
+
+        nxt = src[i + 1] if i + 1 < self.n else ""
+
+        if ch == "/" and nxt == "/":
+            end = src.find("\n", i)
+            self.advance_to(self.n if end == -1 else end)
+            return
+        if ch == "/" and nxt == "*":
+            end = src.find("*/", i + 2)
+            if end == -1:
+                self.error("Unterminated block comment")
+                self.advance_to(self.n)
+            else:
+                self.advance_to(end + 2)
+            return
+
+        if ch in "'\"":
+            self.read_string(ch)
+            frame["last"] = "value"
+            return
+
+        if ch == "`":
+            self.i += 1
+            self.stack.append({"kind": "template", "line": self.line, "classes": self.collecting_classes()})
+            frame["last"] = "value"
+            return
+
+        expr_position = frame["last"] == "op"
+
+        if ch == "/" and expr_position:
+            self.read_regex()
+            frame["last"] = "value"
+            return
+
+        if ch == "<" and expr_position and (nxt == ">" or _IDENT_START.match(nxt or " ")):
+            self.facts["has_jsx"] = True
+            self.stack.append({"kind": "jsx", "phase": "open", "tags": [], "line": self.line})
+            frame["last"] = "value"
+            return
+
+        if _IDENT_START.match(ch):
+            self.read_identifier(frame)
+            return
+
+        if ch.isdigit() or (ch == "." and nxt.isdigit()):
+            m = _NUMBER.match(src, i)
+            self.advance_to(m.end())
+            frame["last"] = "value"
+            return
+
+        if ch in _OPENERS:
+            self.delims.append((ch, self.line, None))
+            self.i += 1
+            frame["last"] = "op"
+            return
+
+        if ch in _CLOSERS:
+            self.close_delimiter(ch)
+            return
+
+        # Operators and punctuation
+        self.i += 1
+        if ch == "." and src.startswith("..", i + 1):
+            self.i += 2
+        frame["last"] = "op"
+
+    def close_delimiter(self, ch):
+        frame = self.stack[-1]
+        self.i += 1
+        if not self.delims:
+            self.error(f"Unexpected '{ch}'")
+            return
+        opener, line, role = self.delims[-1]
+        if opener != _CLOSERS[ch]:
+            self.error(f"Mismatched '{ch}' (opened '{opener}' at line {line})")
+            # Recover: drop the opener if the closer matches the one below it
+            if len(self.delims) > 1 and self.delims[-2][0] == _CLOSERS[ch]:
+                self.delims.pop()
+                opener, line, role = self.delims[-1]
+            else:
+                return
+        self.delims.pop()
+        frame["last"] = "value"
+        if role is not None:
+            # End of a ${...} or JSX {...} expression: resume the outer frame
+            self.stack.pop()
+
+    def read_identifier(self, frame):
+        src = self.src
+        start = self.i
+        m = _IDENT.match(src, start)
+        word = m.group(0)
+        prev = src[start - 1] if start > 0 else ""
+
+        if word == "import" and prev != "." and frame is self.stack[0]:
+            im = _IMPORT.match(src, start)
+            if im:
+                default, names, namespace, _, source = im.groups()
+                self.facts["imports"].append({
+                    "source": source,
+                    "default": default or namespace,
+                    "names": [n.strip().split(" as ")[-1].strip() for n in (names or "").split(",") if n.strip()],
+                    "line": self.line,
+                })
+                self.advance_to(im.end())
+                frame["last"] = "op"
+                return
+
+        if word == "export" and prev != ".":
+            after = src[m.end():m.end() + 40].lstrip()
+            if after.startswith("default"):
+                self.facts["exports"]["default"] = True
+            else:
+                nm = re.match(r"(?:async\s+)?(?:const|let|var|function\*?|class)\s+([A-Za-z_$][\w$]*)|\{", after)
+                if nm:
+                    self.facts["exports"]["named"].append(nm.group(1) or "{...}")
+
+        self.i = m.end()
+        self.facts["identifiers"].add(word)
+
+        # Call detection: identifier followed by `(`
+        j = self.i
+        while j < self.n and src[j] in " \t":
+            j += 1
+        if j < self.n and src[j] == "(" and word not in _NOT_CALLS:
+            self.facts["calls"].add(word)
+            if _HOOK.match(word):
+                self.facts["hooks"].add(word)
+
+        frame["last"] = "op" if word in _EXPR_KEYWORDS and prev != "." else "value"
+
+    def read_string(self, quote):
+        src = self.src
+        start_line = self.line
+        j = self.i + 1
+        chunk_start = j
+        while j < self.n:
+            c = src[j]
+            if c == "\\":
+                j += 2
+                continue
+            if c == quote:
+                if self.collecting_classes():
+                    self.add_classes(src[chunk_start:j])
+                self.i = j + 1
+                return
+            if c == "\n":
+                self.error("Unterminated string literal", start_line)
+                self.advance_to(j)
+                return
+            j += 1
+        self.error("Unterminated string literal", start_line)
+        self.advance_to(self.n)
+
+    def read_regex(self):
+        src = self.src
+        j = self.i + 1
+        in_class = False
+        while j < self.n:
+            c = src[j]
+            if c == "\\":
+                j += 2
+                continue
+            if c == "\n":
+                break
+            if c == "[":
+                in_class = True
+            elif c == "]":
+                in_class = False
+            elif c == "/" and not in_class:
+                j += 1
+                while j < self.n and (src[j].isalnum() or src[j] == "_"):
+                    j += 1
+                self.i = j
+                return
+            j += 1
+        # Not a regex after all (e.g. division after a keyword-like token)
+        self.i += 1
+
+    # ---------- template literals ----------
+    def template_step(self):
+        src = self.src
+        frame = self.stack[-1]
+        j = self.i
+        start = j
+        while j < self.n:
+            c = src[j]
+            if c == "\\":
+                j += 2
+                continue
+            if c == "`":
+                if frame["classes"]:
+                    self.add_classes(src[start:j])
+                self.advance_to(j + 1)
+                self.stack.pop()
+                return
+            if c == "$" and j + 1 < self.n and src[j + 1] == "{":
+                if frame["classes"]:
+                    self.add_classes(src[start:j])
+                self.advance_to(j + 2)
+                self.delims.append(("{", self.line, "template"))
+                self.stack.append({"kind": "js", "last": "op", "classes": frame["classes"]})
+                return
+            j += 1
+        self.advance_to(self.n)
+
+    # ---------- JSX ----------
+    def jsx_step(self):
+        frame = self.stack[-1]
+        phase = frame["phase"]
+        if phase == "open":
+            self.jsx_open(frame)
+        elif phase == "attrs":
+            self.jsx_attrs(frame)
+        elif phase == "children":
+            self.jsx_children(frame)
+        else:
+            self.jsx_close(frame)
+
+    def jsx_finish_element(self, frame):
+        frame["tags"].pop()
+        if frame["tags"]:
+            frame["phase"] = "children"
+        else:
+            self.stack.pop()  # JSX tree complete, back to JavaScript
+
+    def jsx_open(self, frame):
+        line = self.line
+        self.i += 1  # '<'
+        self.skip_ws()
+        m = _JSX_NAME.match(self.src, self.i)
+        name = m.group(0) if m else ""
+        if m:
+            self.i = m.end()
+            if name[0].isupper():
+                self.facts["components_used"].add(name.split(".")[0])
+        frame["tags"].append((name, line))
+        frame["phase"] = "attrs"
+
+    def jsx_attrs(self, frame):
+        src = self.src
+        self.skip_ws()
+        if self.i >= self.n:
+            return
+        ch = src[self.i]
+
+        if ch == "/" and src.startswith("/>", self.i):
+            self.i += 2
+            self.jsx_finish_element(frame)
+            return
+        if ch == ">":
+            self.i += 1
+            frame["phase"] = "children"
+            return
+        if ch == "{":
+            # Spread attributes: {...props}
+            self.open_jsx_expression(classes=False)
+            return
+
+        m = _JSX_ATTR.match(src, self.i)
+        if not m:
+            self.error(f"Unexpected '{ch}' in JSX tag <{frame['tags'][-1][0]}>")
+            self.i += 1
+            return
+
+        attr = m.group(0)
+        self.i = m.end()
+        if _HANDLER.match(attr):
+            self.facts["handlers"].add(attr)
+        is_class = attr in ("className", "class")
+
+        self.skip_ws()
+        if self.i < self.n and src[self.i] == "=":
+            self.i += 1
+            self.skip_ws()
+            if self.i >= self.n:
+                return
+            quote = src[self.i]
+            if quote in "'\"":
+                end = src.find(quote, self.i + 1)
+                if end == -1:
+                    self.error(f"Unterminated attribute value for {attr}")
+                    self.advance_to(self.n)
+                    return
+                if is_class:
+                    self.add_classes(src[self.i + 1:end])
+                self.advance_to(end + 1)
+            elif quote == "{":
+                self.open_jsx_expression(classes=is_class)
+
+    def open_jsx_expression(self, classes):
+        self.delims.append(("{", self.line, "jsx"))
+        self.i += 1
+        self.stack.append({"kind": "js", "last": "op", "classes": classes})
+
+    def jsx_children(self, frame):
+        src = self.src
+        j = self.i
+        while j < self.n and src[j] not in "<{":
+            j += 1
+        self.advance_to(j)
+        if j >= self.n:
+            return
+        if src[j] == "{":
+            self.open_jsx_expression(classes=False)
+            return
+        k = j + 1
+        while k < self.n and src[k] in " \t\r\n":
+            k += 1
+        frame["phase"] = "close" if k < self.n and src[k] == "/" else "open"
+
+    def jsx_close(self, frame):
+        src = self.src
+        end = src.find(">", self.i)
+        if end == -1:
+            self.error("Unterminated JSX closing tag")
+            self.advance_to(self.n)
+            return
+        name = src[self.i:end].lstrip("<").strip().lstrip("/").strip()
+        expected, line = frame["tags"][-1]
+        if name != expected:
+            self.error(f"Mismatched closing tag </{name}> (expected </{expected}> opened at line {line})")
+        self.advance_to(end + 1)
+        self.jsx_finish_element(frame)
+
+
+def analyze_source(source: str) -> dict:
+    """
+    Lexes one JS/JSX file in a single pass and returns its fact table:
+    exports, imports, hooks, handlers, class_names, calls, identifiers,
+    components_used, has_jsx, balanced and errors (with line numbers).
+    """
+    return _Lexer(source).run()
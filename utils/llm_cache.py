@@ -0,0 +1,150 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+# ============================================
+# CACHE SETTINGS (overridable via environment)
+# ============================================
+CACHE_DIR = os.getenv("AUTOSITE_CACHE_DIR", os.path.join(".autosite-cache", "llm"))
+CACHE_TTL_SECONDS = int(os.getenv("AUTOSITE_CACHE_TTL", str(7 * 24 * 3600)))
+CACHE_MAX_ENTRIES = int(os.getenv("AUTOSITE_CACHE_MAX_ENTRIES", "500"))
+CACHE_MAX_BYTES = int(os.getenv("AUTOSITE_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+
+
+class LLMCache:
+    """
+    Persistent, content-addressed cache of LLM responses.
+    Entries are one JSON file per key; file mtime doubles as the LRU clock.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, ttl=CACHE_TTL_SECONDS,
+                 max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.enabled = True
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "writes": 0, "evictions": 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model: str, messages) -> str:
+        """
+        Hashes the model name and every message (system prompt + human message).
+        """
+        digest = hashlib.sha256()
+        digest.update(model.encode("utf-8"))
+        for message in messages:
+            digest.update(b"\x00")
+            digest.update(message.type.encode("utf-8"))
+            digest.update(b"\x00")
+            digest.update(message.content.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def get(self, key: str):
+        """
+        Returns the cached response text, or None on a miss or expired entry.
+        """
+        if not self.enabled:
+            return None
+
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self._count("misses")
+            return None
+
+        if self.ttl and time.time() - entry.get("created", 0) > self.ttl:
+            self._count("expired")
+            self._count("misses")
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+        # Touch the entry so eviction treats it as recently used
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        self._count("hits")
+        return entry.get("content")
+
+    def set(self, key: str, content: str, model: str = ""):
+        """
+        Stores a response atomically, then evicts least-recently-used entries.
+        """
+        if not self.enabled:
+            return
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"model": model, "created": time.time(), "content": content}, f)
+        os.replace(tmp_path, path)
+        self._count("writes")
+        self._evict()
+
+    def delete(self, key: str):
+        """
+        Drops one entry (a cached response that turned out to be unusable).
+        """
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        entries = []
+        total_bytes = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total_bytes += st.st_size
+
+        entries.sort()
+        while entries and (len(entries) > self.max_entries or total_bytes > self.max_bytes):
+            _, size, path = entries.pop(0)
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_bytes -= size
+            self._count("evictions")
+
+    def clear(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                os.remove(os.path.join(self.cache_dir, name))
+
+    def summary(self) -> str:
+        s = self.stats
+        return (f"LLM cache: {s['hits']} hits, {s['misses']} misses, "
+                f"{s['writes']} writes, {s['evictions']} evictions")
+
+
+_cache = LLMCache()
+
+def get_cache() -> LLMCache:
+    return _cache
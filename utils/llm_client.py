@@ -1,18 +1,270 @@
 import os
-from dotenv import load_dotenv
-from langchain_groq import ChatGroq
-
-load_dotenv()
-
-def get_llm():
-    api_key = os.getenv("GROQ_API_KEY")
-    if not api_key:
-        print("Warning: GROQ_API_KEY not found in environment variables.")
-    
-    # Added max_retries to handle rate limits automatically
-    return ChatGroq(
-        model="llama-3.3-70b-versatile", 
-        temperature=0,
-        max_retries=5,
-        request_timeout=60
-    )
+import time
+import random
+import asyncio
+import threading
+from utils.llm_cache import get_cache
+from utils.rate_limiter import get_limiter
+from utils.context_builder import record_prompt_tokens
+from utils.telemetry import LLMCall
+
+MODEL_NAME = "llama-3.3-70b-versatile"
+
+# Transient API errors are retried here rather than inside the client,
+# so every retry is counted (see utils/telemetry.py)
+MAX_RETRIES = int(os.getenv("AUTOSITE_LLM_MAX_RETRIES", "5"))
+RETRY_BASE_SECONDS = 1.0
+RETRY_MAX_SECONDS = 30.0
+
+# "groq" calls the API; "fake" and "replay" are offline backends for
+# benchmarks and tests (see utils/fake_llm.py)
+BACKENDS = ("groq", "fake", "replay")
+BACKEND = os.getenv("AUTOSITE_LLM_BACKEND", "groq")
+
+# One pooled, keep-alive client per model configuration, created on first use
+_clients = {}
+_clients_lock = threading.Lock()
+_env_loaded = False
+
+def configure_backend(name: str):
+    global BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM backend '{name}' (expected one of {', '.join(BACKENDS)})")
+    with _clients_lock:
+        BACKEND = name
+        _clients.clear()
+
+def _load_env():
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+def get_llm(model: str = MODEL_NAME):
+    with _clients_lock:
+        client = _clients.get(model)
+        if client is not None:
+            return client
+
+        if BACKEND != "groq":
+            from utils.fake_llm import create_fake_llm
+            client = create_fake_llm(BACKEND, model)
+            _clients[model] = client
+            return client
+
+        _load_env()
+        from langchain_groq import ChatGroq
+
+        api_key = os.getenv("GROQ_API_KEY")
+        if not api_key:
+            print("Warning: GROQ_API_KEY not found in environment variables.")
+
+        client = ChatGroq(
+            model=model,
+            temperature=0,
+            max_retries=0,
+            request_timeout=60
+        )
+        _clients[model] = client
+        return client
+
+def _cache_model(model: str) -> str:
+    # Offline backends must never serve (or poison) real cached responses
+    return model if BACKEND == "groq" else f"{BACKEND}:{model}"
+
+def _record(key: str, text: str, agent: str):
+    """
+    Records a real response for replay (AUTOSITE_LLM_RECORD), whether it
+    came from the network or the cache, so a recording covers the whole run.
+    """
+    if BACKEND == "groq":
+        from utils.fake_llm import record_response
+        record_response(key, agent, text)
+
+def _remember(cache, key: str, text: str, model: str, agent: str):
+    cache.set(key, text, model=_cache_model(model))
+    _record(key, text, agent)
+
+def _retryable_errors() -> tuple:
+    if BACKEND != "groq":
+        return ()
+    import groq
+    return (groq.RateLimitError, groq.APIConnectionError, groq.InternalServerError)
+
+def _retry_delay(exc: Exception, call: LLMCall):
+    """
+    Returns how long to back off before retrying, or None when the error is
+    not transient or the retry budget is spent. Honors Retry-After.
+    """
+    if call.retries >= MAX_RETRIES or not isinstance(exc, _retryable_errors()):
+        return None
+    call.retry()
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        delay = float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (call.retries - 1)) * random.uniform(0.5, 1.0)
+    print(f"[llm] {call.agent}: {type(exc).__name__}, retry {call.retries}/{MAX_RETRIES} in {delay:.1f}s")
+    return delay
+
+def _lookup(messages, agent: str, model: str):
+    """
+    Returns (cache, key, cached text or None, LLMCall).
+    """
+    prompt_tokens = record_prompt_tokens(agent, messages)
+    cache = get_cache()
+    key = cache.make_key(_cache_model(model), messages)
+    cached = cache.get(key)
+    return cache, key, cached, LLMCall(agent, BACKEND, prompt_tokens, cached=cached is not None, model=model)
+
+def _cached_result(cache, key: str, cached, call: LLMCall, parse):
+    """
+    Returns (True, parsed cached response) on a usable cache hit. A cached
+    response that parse rejects is evicted so it is fetched again.
+    """
+    if cached is None:
+        return False, None
+    call.finish(cached)
+    try:
+        result = parse(cached) if parse else cached
+    except ValueError as e:
+        print(f"[llm] {call.agent}: evicting unusable cached response ({e})")
+        cache.delete(key)
+        return False, None
+    _record(key, cached, call.agent)
+    return True, result
+
+def _fresh_call(call: LLMCall) -> LLMCall:
+    if not call.cached:
+        return call
+    return LLMCall(call.agent, call.backend, call.prompt_tokens, model=call.model)
+
+def invoke_llm(messages, agent: str = "llm", model: str = MODEL_NAME, parse=None):
+    """
+    Invokes the LLM and returns the response text, or parse(text) when a
+    parser is given. temperature=0 makes responses deterministic, so
+    repeated prompts are served from the on-disk cache without a network
+    round-trip. A response is cached only after parse accepted it (parse
+    raises ValueError on unusable text), so truncated or invalid replies
+    are never served again.
+    """
+    cache, key, cached, call = _lookup(messages, agent, model)
+    hit, result = _cached_result(cache, key, cached, call, parse)
+    if hit:
+        return result
+    call = _fresh_call(call)
+
+    while True:
+        try:
+            with get_limiter(BACKEND):
+                response = get_llm(model).invoke(messages)
+            break
+        except Exception as e:
+            delay = _retry_delay(e, call)
+            if delay is None:
+                raise
+            time.sleep(delay)
+    call.finish(response.content)
+    result = parse(response.content) if parse else response.content
+    _remember(cache, key, response.content, model, agent)
+    return result
+
+async def ainvoke_llm(messages, agent: str = "llm", model: str = MODEL_NAME, parse=None):
+    """
+    Async counterpart of invoke_llm; awaits the network call so one event
+    loop can multiplex many generations.
+    """
+    cache, key, cached, call = _lookup(messages, agent, model)
+    hit, result = _cached_result(cache, key, cached, call, parse)
+    if hit:
+        return result
+    call = _fresh_call(call)
+
+    while True:
+        try:
+            async with get_limiter(BACKEND):
+                response = await get_llm(model).ainvoke(messages)
+            break
+        except Exception as e:
+            delay = _retry_delay(e, call)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+    call.finish(response.content)
+    result = parse(response.content) if parse else response.content
+    _remember(cache, key, response.content, model, agent)
+    return result
+
+def stream_llm(messages, agent: str = "llm", model: str = MODEL_NAME, accept=None):
+    """
+    Yields response text chunks as the model produces them.
+    A cache hit yields the whole cached response as a single chunk.
+    A transient error is retried only if nothing was yielded yet.
+    accept(text) is asked once the consumer has read every chunk; the
+    response is cached only if it returns True, and a cached response it
+    rejects is evicted.
+    """
+    cache, key, cached, call = _lookup(messages, agent, model)
+    if cached is not None:
+        call.finish(cached)
+        yield cached
+        if accept is not None and not accept(cached):
+            print(f"[llm] {agent}: evicting unusable cached response")
+            cache.delete(key)
+        else:
+            _record(key, cached, agent)
+        return
+
+    parts = []
+    while True:
+        try:
+            with get_limiter(BACKEND):
+                for chunk in get_llm(model).stream(messages):
+                    call.first_token()
+                    parts.append(chunk.content)
+                    yield chunk.content
+            break
+        except Exception as e:
+            delay = None if parts else _retry_delay(e, call)
+            if delay is None:
+                raise
+            time.sleep(delay)
+    text = "".join(parts)
+    call.finish(text)
+    if accept is None or accept(text):
+        _remember(cache, key, text, model, agent)
+
+async def astream_llm(messages, agent: str = "llm", model: str = MODEL_NAME, accept=None):
+    """
+    Async counterpart of stream_llm.
+    """
+    cache, key, cached, call = _lookup(messages, agent, model)
+    if cached is not None:
+        call.finish(cached)
+        yield cached
+        if accept is not None and not accept(cached):
+            print(f"[llm] {agent}: evicting unusable cached response")
+            cache.delete(key)
+        else:
+            _record(key, cached, agent)
+        return
+
+    parts = []
+    while True:
+        try:
+            async with get_limiter(BACKEND):
+                async for chunk in get_llm(model).astream(messages):
+                    call.first_token()
+                    parts.append(chunk.content)
+                    yield chunk.content
+            break
+        except Exception as e:
+            delay = None if parts else _retry_delay(e, call)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+    text = "".join(parts)
+    call.finish(text)
+    if accept is None or accept(text):
+        _remember(cache, key, text, model, agent)
@@ -0,0 +1,103 @@
+import os
+import json
+from utils.llm_client import MODEL_NAME, invoke_llm, ainvoke_llm
+from utils.telemetry import get_metrics
+
+# ============================================
+# MODEL ROUTING BY AGENT AND INTENT
+# The simple intents (those VALIDATION_RULES already trusts without an LLM
+# review) run on the small model; data_complex and the validator/repair
+# agents keep the large one. A response that fails extract_json is retried
+# on the large model, and repairs after a failed validation always use it.
+# Override single routes with AUTOSITE_MODEL_ROUTES, e.g.
+#   {"coder": {"crud_basic": "large"}}
+# or set AUTOSITE_MODEL_ROUTING=0 to send everything to the large model.
+# ============================================
+MODELS = {
+    "large": os.getenv("AUTOSITE_LARGE_MODEL", MODEL_NAME),
+    "small": os.getenv("AUTOSITE_SMALL_MODEL", "llama-3.1-8b-instant"),
+}
+ROUTING_ENABLED = os.getenv("AUTOSITE_MODEL_ROUTING", "1") != "0"
+
+_SIMPLE = {"static_ui": "small", "logic_basic": "small", "crud_basic": "small", "data_complex": "large"}
+ROUTES = {
+    "planner": dict(_SIMPLE),
+    "architect": dict(_SIMPLE),
+    "coder": dict(_SIMPLE),
+    "editor": dict(_SIMPLE),
+    "validator": {},
+    "repair": {},
+}
+
+def _load_overrides():
+    raw = os.getenv("AUTOSITE_MODEL_ROUTES")
+    if not raw:
+        return
+    try:
+        overrides = json.loads(raw)
+    except ValueError:
+        print("Ignoring AUTOSITE_MODEL_ROUTES: not valid JSON")
+        return
+    for agent, intents in overrides.items():
+        ROUTES.setdefault(agent, {}).update(intents)
+
+_load_overrides()
+
+def route(agent: str, intent: str, escalate: str = None) -> str:
+    """
+    Picks the model for one agent call and logs the decision.
+    `escalate` names the reason to force the large model.
+    """
+    if escalate:
+        tier, reason = "large", escalate
+    elif not ROUTING_ENABLED:
+        tier, reason = "large", "routing disabled"
+    else:
+        tier = ROUTES.get(agent, {}).get(intent, "large")
+        reason = f"route {agent}/{intent}"
+    model = MODELS[tier]
+    print(f"[route] {agent} ({intent}) -> {model} [{reason}]")
+    get_metrics().inc("autosite_model_route_total", {"agent": agent, "tier": tier, "escalated": str(bool(escalate)).lower()})
+    return model
+
+def is_large(model: str) -> bool:
+    return model == MODELS["large"]
+
+def call_routed(agent: str, intent: str, call, escalate: str = None):
+    """
+    Runs call(model) on the routed model. call must raise ValueError when
+    the response is unusable (extract_json failure); a small-model failure
+    is then retried once on the large model.
+    """
+    model = route(agent, intent, escalate)
+    try:
+        return call(model)
+    except ValueError as e:
+        if is_large(model):
+            raise
+        print(f"[route] {agent}: small model response unusable ({e}); falling back")
+        return call(route(agent, intent, "extract_json failed"))
+
+async def acall_routed(agent: str, intent: str, call, escalate: str = None):
+    """
+    Async counterpart of call_routed; call(model) returns an awaitable.
+    """
+    model = route(agent, intent, escalate)
+    try:
+        return await call(model)
+    except ValueError as e:
+        if is_large(model):
+            raise
+        print(f"[route] {agent}: small model response unusable ({e}); falling back")
+        return await call(route(agent, intent, "extract_json failed"))
+
+def invoke_routed(messages, agent: str, intent: str, parse, escalate: str = None):
+    """
+    invoke_llm on the routed model, then parse(text).
+    """
+    return call_routed(agent, intent, lambda model: invoke_llm(messages, agent=agent, model=model, parse=parse), escalate)
+
+async def ainvoke_routed(messages, agent: str, intent: str, parse, escalate: str = None):
+    async def call(model):
+        return await ainvoke_llm(messages, agent=agent, model=model, parse=parse)
+    return await acall_routed(agent, intent, call, escalate)
@@ -0,0 +1,233 @@
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import subprocess
+from utils.dir_lock import dir_lock
+
+# ============================================
+# SHARED node_modules STORE
+# One install per unique dependency set, linked into every site.
+# ============================================
+STORE_DIR = os.getenv("AUTOSITE_NODE_STORE", os.path.join(os.path.expanduser("~"), ".autosite", "node-store"))
+# npm installs take minutes; only break locks much older than that
+LOCK_STALE_SECONDS = 15 * 60
+META_FILE = "store-meta.json"
+
+
+def dependency_fingerprint(project_dir: str) -> str:
+    """
+    Hashes the dependency set of a project: package.json dependency fields
+    plus the lockfile when one exists. Scripts, name and version are ignored.
+    """
+    with open(os.path.join(project_dir, "package.json"), "r", encoding="utf-8") as f:
+        pkg = json.load(f)
+
+    deps = {field: pkg.get(field, {}) for field in
+            ("dependencies", "devDependencies", "optionalDependencies", "overrides")}
+    digest = hashlib.sha256(json.dumps(deps, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+
+    lock_path = os.path.join(project_dir, "package-lock.json")
+    if os.path.exists(lock_path):
+        with open(lock_path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+def run_npm_install(project_dir: str, offline: bool = False) -> bool:
+    cmd = ["npm", "install", "--no-audit", "--no-fund"]
+    if offline:
+        cmd.append("--offline")
+    try:
+        subprocess.run(
+            cmd,
+            cwd=project_dir,
+            check=True,
+            shell=True if sys.platform == "win32" else False
+        )
+        return True
+    except (subprocess.CalledProcessError, OSError) as e:
+        print(f"Error running npm install: {e}")
+        return False
+
+
+class NodeModulesStore:
+    """
+    Content-addressed store of installed node_modules trees, keyed by
+    dependency_fingerprint. Entries are immutable once written.
+    """
+
+    def __init__(self, store_dir: str = STORE_DIR):
+        self.store_dir = store_dir
+
+    def entry_dir(self, fingerprint: str) -> str:
+        return os.path.join(self.store_dir, fingerprint)
+
+    def get(self, fingerprint: str):
+        """
+        Returns the entry metadata if the store holds this dependency set.
+        """
+        meta_path = os.path.join(self.entry_dir(fingerprint), META_FILE)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _locked(self, fingerprint: str):
+        """
+        Cross-process lock so concurrent batch jobs install a set only once.
+        """
+        return dir_lock(self.entry_dir(fingerprint) + ".lock", stale_seconds=LOCK_STALE_SECONDS, poll_seconds=0.5)
+
+    def populate(self, project_dir: str, fingerprint: str, offline: bool = False):
+        """
+        Installs the project's dependency set into the store (once).
+        Returns the entry metadata, or None if the install failed.
+        """
+        os.makedirs(self.store_dir, exist_ok=True)
+        with self._locked(fingerprint):
+            meta = self.get(fingerprint)
+            if meta is not None:
+                return meta  # Another job installed it while we waited
+
+            staging = self.entry_dir(fingerprint) + f".tmp-{os.getpid()}"
+            shutil.rmtree(staging, ignore_errors=True)
+            os.makedirs(staging)
+            for name in ("package.json", "package-lock.json"):
+                src = os.path.join(project_dir, name)
+                if os.path.exists(src):
+                    shutil.copy2(src, os.path.join(staging, name))
+
+            print(f"Installing dependency set {fingerprint} into shared store...")
+            started = time.perf_counter()
+            if not run_npm_install(staging, offline=offline):
+                shutil.rmtree(staging, ignore_errors=True)
+                return None
+
+            meta = {
+                "fingerprint": fingerprint,
+                "install_seconds": round(time.perf_counter() - started, 3),
+                "bytes": _dir_size(os.path.join(staging, "node_modules")),
+                "created": time.time(),
+            }
+            with open(os.path.join(staging, META_FILE), "w", encoding="utf-8") as f:
+                json.dump(meta, f, indent=2)
+            try:
+                os.replace(staging, self.entry_dir(fingerprint))
+            except OSError:
+                # Published by another process (e.g. after taking over a
+                # stale lock); entries are immutable, so theirs is as good
+                shutil.rmtree(staging, ignore_errors=True)
+                existing = self.get(fingerprint)
+                if existing is None:
+                    raise
+                return existing
+            return meta
+
+    def _link_packages(self, source: str, target: str):
+        """
+        Creates target as a real directory holding one symlink per package
+        of source (per package inside @scope directories). npm or a bundler
+        working in the site then adds, replaces or removes links in the
+        site's own directory instead of writing through into the store.
+        Dot entries (.bin, .package-lock.json) are copied; .bin's relative
+        links resolve through the package links.
+        """
+        os.makedirs(target)
+        for name in os.listdir(source):
+            src = os.path.join(source, name)
+            dst = os.path.join(target, name)
+            is_dir = os.path.isdir(src) and not os.path.islink(src)
+            if is_dir and name.startswith("@"):
+                self._link_packages(src, dst)
+            elif is_dir and name.startswith("."):
+                shutil.copytree(src, dst, symlinks=True)
+            elif is_dir:
+                os.symlink(os.path.abspath(src), dst, target_is_directory=True)
+            else:
+                shutil.copy2(src, dst, follow_symlinks=False)
+
+    def link_into(self, project_dir: str, fingerprint: str) -> str:
+        """
+        Links the stored node_modules into a project. Prefers per-package
+        symlinks; falls back to a hardlinked copy where symlinks are not
+        permitted (e.g. Windows without developer mode).
+        """
+        entry = self.entry_dir(fingerprint)
+        target = os.path.join(project_dir, "node_modules")
+        if os.path.islink(target):
+            os.unlink(target)
+        elif os.path.isdir(target):
+            shutil.rmtree(target)
+
+        # Keep the lockfile in sync so `npm install` in the site is a no-op
+        lock_src = os.path.join(entry, "package-lock.json")
+        if os.path.exists(lock_src) and not os.path.exists(os.path.join(project_dir, "package-lock.json")):
+            shutil.copy2(lock_src, os.path.join(project_dir, "package-lock.json"))
+
+        try:
+            self._link_packages(os.path.join(entry, "node_modules"), target)
+            return "symlink"
+        except OSError:
+            shutil.rmtree(target, ignore_errors=True)
+        try:
+            shutil.copytree(os.path.join(entry, "node_modules"), target, symlinks=True, copy_function=os.link)
+            return "hardlink"
+        except OSError:
+            # Store lives on another filesystem
+            shutil.rmtree(target, ignore_errors=True)
+            shutil.copytree(os.path.join(entry, "node_modules"), target, symlinks=True)
+            return "copy"
+
+
+_store = NodeModulesStore()
+
+def get_store() -> NodeModulesStore:
+    return _store
+
+def install_dependencies(project_dir: str, template_dir: str, offline: bool = False) -> dict:
+    """
+    Provides node_modules for a generated site:
+    1. Link from the store when this dependency set is already installed.
+    2. If the site still uses the template's dependency set, install it into
+       the store once and link it.
+    3. Otherwise (apply_fixes added dependencies) run a real npm install.
+    Returns a report with the method used and the time/bytes saved.
+    """
+    store = get_store()
+    fingerprint = dependency_fingerprint(project_dir)
+    report = {"fingerprint": fingerprint, "method": None, "seconds_saved": 0.0, "bytes_saved": 0}
+
+    meta = store.get(fingerprint)
+    if meta is None and fingerprint == dependency_fingerprint(template_dir):
+        if offline:
+            print(f"Shared store has no entry for {fingerprint}; offline install will use the npm cache only.")
+        meta = store.populate(project_dir, fingerprint, offline=offline)
+        if meta is not None:
+            # The first site pays for the install; nothing saved yet
+            report["method"] = store.link_into(project_dir, fingerprint)
+            return report
+
+    if meta is not None:
+        report["method"] = store.link_into(project_dir, fingerprint)
+        report["seconds_saved"] = meta.get("install_seconds", 0.0)
+        report["bytes_saved"] = meta.get("bytes", 0)
+        print(f"Linked shared node_modules ({report['method']}, set {fingerprint}): "
+              f"saved ~{report['seconds_saved']:.1f}s and {report['bytes_saved'] / (1024 * 1024):.1f} MB")
+        return report
+
+    print(f"Dependency set {fingerprint} differs from the template; running a real npm install...")
+    report["method"] = "npm-install" if run_npm_install(project_dir, offline=offline) else "failed"
+    return report
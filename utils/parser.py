@@ -1,34 +1,211 @@
 import json
-import re
+from utils.telemetry import record_extract_json
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+_WHITESPACE = " \t\r\n"
+
+
+class JsonObjectStream:
+    """
+    Single-pass, incremental scanner for the top-level JSON object in an LLM
+    response. Feed it chunks as they arrive; every completed top-level
+    "key": value pair is returned as soon as its value closes.
+
+    - Leading prose and ```json fences are skipped.
+    - Raw control characters inside strings (e.g. unescaped newlines in
+      generated code) are kept verbatim instead of failing the parse.
+    - Nested objects/arrays are captured raw and decoded once they close.
+    """
+
+    def __init__(self):
+        self.result = {}
+        self.done = False
+        self.consumed = 0           # characters fed so far
+        self.committed = 0          # characters up to the end of the last complete pair
+        self._state = "seek"        # seek | key_or_end | key | colon | value | string | raw | comma
+        self._buf = []
+        self._key = None
+        self._escape = None         # None, "" (after backslash) or collected \u hex digits
+        self._pending_surrogate = None
+        self._raw_depth = 0
+        self._raw_in_string = False
+        self._raw_escape = False
+
+    @property
+    def partial_key(self):
+        """
+        Key of the value currently being read (useful to detect truncation).
+        """
+        return self._key if self._state in ("string", "raw", "value") else None
+
+    def feed(self, chunk: str) -> list:
+        pairs = []
+        for i, ch in enumerate(chunk):
+            if self.done:
+                break
+            pair = self._step(ch)
+            if pair is not None:
+                pairs.append(pair)
+                self.committed = self.consumed + i + 1
+        self.consumed += len(chunk)
+        return pairs
+
+    def _emit(self, value):
+        key, self._key = self._key, None
+        self.result[key] = value
+        self._state = "comma"
+        return key, value
+
+    def _step(self, ch):
+        state = self._state
+
+        if state == "seek":
+            if ch == "{":
+                self._state = "key_or_end"
+            return None
+
+        if state == "string":
+            return self._string_char(ch, is_key=False)
+
+        if state == "key":
+            return self._string_char(ch, is_key=True)
+
+        if state == "raw":
+            return self._raw_char(ch)
+
+        if ch in _WHITESPACE:
+            return None
+
+        if state == "key_or_end":
+            if ch == '"':
+                self._state = "key"
+                self._buf = []
+                return None
+            if ch == "}":
+                self.done = True
+                return None
+            raise ValueError(f"Expected object key, got {ch!r}")
+
+        if state == "colon":
+            if ch != ":":
+                raise ValueError(f"Expected ':', got {ch!r}")
+            self._state = "value"
+            return None
+
+        if state == "value":
+            self._buf = []
+            if ch == '"':
+                self._state = "string"
+                return None
+            self._state = "raw"
+            self._raw_depth = 0
+            self._raw_in_string = False
+            self._raw_escape = False
+            return self._raw_char(ch)
+
+        if state == "comma":
+            if ch == ",":
+                self._state = "key_or_end"
+                return None
+            if ch == "}":
+                self.done = True
+                return None
+            raise ValueError(f"Expected ',' or '}}', got {ch!r}")
+
+        raise ValueError(f"Invalid scanner state {state}")
+
+    def _string_char(self, ch, is_key):
+        if self._escape is not None:
+            if self._escape == "":
+                if ch == "u":
+                    self._escape = "u"
+                    return None
+                self._buf.append(_ESCAPES.get(ch, ch))
+                self._escape = None
+                return None
+            # Collecting \uXXXX
+            self._escape += ch
+            if len(self._escape) == 5:
+                code = int(self._escape[1:], 16)
+                self._escape = None
+                if 0xD800 <= code < 0xDC00:
+                    self._pending_surrogate = code
+                elif 0xDC00 <= code < 0xE000 and self._pending_surrogate is not None:
+                    high, self._pending_surrogate = self._pending_surrogate, None
+                    self._buf.append(chr(0x10000 + ((high - 0xD800) << 10) + (code - 0xDC00)))
+                else:
+                    self._buf.append(chr(code))
+            return None
+
+        if ch == "\\":
+            self._escape = ""
+            return None
+
+        if ch == '"':
+            text = "".join(self._buf)
+            self._buf = []
+            if is_key:
+                self._key = text
+                self._state = "colon"
+                return None
+            return self._emit(text)
+
+        # Raw control characters (unescaped newlines) are kept as-is
+        self._buf.append(ch)
+        return None
+
+    def _raw_char(self, ch):
+        if self._raw_in_string:
+            self._buf.append(ch)
+            if self._raw_escape:
+                self._raw_escape = False
+            elif ch == "\\":
+                self._raw_escape = True
+            elif ch == '"':
+                self._raw_in_string = False
+            return None
+
+        if self._raw_depth == 0 and ch in ",}":
+            # End of a scalar value (number, true, false, null)
+            value = json.loads("".join(self._buf).strip())
+            pair = self._emit(value)
+            if ch == "}":
+                self.done = True
+            else:
+                self._state = "key_or_end"
+            return pair
+
+        self._buf.append(ch)
+        if ch == '"':
+            self._raw_in_string = True
+        elif ch in "{[":
+            self._raw_depth += 1
+        elif ch in "}]":
+            self._raw_depth -= 1
+            if self._raw_depth == 0:
+                return self._emit(json.loads("".join(self._buf), strict=False))
+        return None
+
 
 def extract_json(text: str) -> dict:
     """
     Extracts JSON from a string, handling markdown code blocks.
     """
-    text = text.strip()
-    
-    # Try to find JSON block
-    match = re.search(r"```json\s*(\{.*?\})\s*```", text, re.DOTALL)
-    if match:
-        text = match.group(1)
-    else:
-        # Look for just { ... }
-        match = re.search(r"(\{.*\})", text, re.DOTALL)
-        if match:
-            text = match.group(1)
+    # Start after a ```json fence if there is one, so prose braces are ignored
+    fence = text.find("```json")
+    start = fence + len("```json") if fence != -1 else 0
 
+    stream = JsonObjectStream()
     try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        # Attempt to fix common JSON issues
-        # 1. Fix unescaped newlines in strings
-        # This is a naive fix and might not work for all cases
-        try:
-            # Remove control characters
-            text = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', text)
-            return json.loads(text)
-        except:
-            pass
-            
-        print(f"FAILED TO PARSE JSON. Raw text:\n{text}\n")
+        stream.feed(text[start:])
+    except ValueError as e:
+        record_extract_json("error")
+        print(f"FAILED TO PARSE JSON ({e}). Raw text:\n{text}\n")
+        raise ValueError(f"Could not extract JSON from text.")
+
+    if not stream.done:
+        record_extract_json("truncated")
+        print(f"FAILED TO PARSE JSON (truncated). Raw text:\n{text}\n")
         raise ValueError(f"Could not extract JSON from text.")
+    record_extract_json("fenced" if fence != -1 else "bare")
+    return stream.result
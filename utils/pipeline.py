@@ -0,0 +1,96 @@
+import os
+import time
+import shutil
+import threading
+from utils.site_writer import SiteWriter, compose_site
+
+
+class SitePipeline:
+    """
+    Overlaps site output with generation. The template is copied into a
+    staging directory and its dependencies installed on a background
+    thread while the agents run; generated files are written as soon as the
+    coder emits them (pass `on_file` via config["configurable"]).
+    All writes go through one SiteWriter, so each file is written once.
+    """
+
+    def __init__(self, staging_dir: str, template, install):
+        self.staging_dir = staging_dir
+        self.timings = {}
+        self.install_report = None
+        self.write_stats = None
+        self._writer = SiteWriter(staging_dir, template)
+        self._install = install
+        self._timing_lock = threading.Lock()
+        self._installed_pkg = None
+        self._error = None
+        self._thread = threading.Thread(target=self._prepare, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _read_pkg(self):
+        try:
+            with open(os.path.join(self.staging_dir, "package.json"), "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _add_time(self, key, started):
+        with self._timing_lock:
+            self.timings[key] = round(self.timings.get(key, 0.0) + time.perf_counter() - started, 3)
+
+    def _prepare(self):
+        try:
+            print(f"Bootstrapping project in {self.staging_dir}...")
+            stage_start = time.perf_counter()
+            self._writer.bootstrap()
+            self._add_time("bootstrap", stage_start)
+            self._installed_pkg = self._read_pkg()
+
+            stage_start = time.perf_counter()
+            self.install_report = self._install(self.staging_dir)
+            self.timings["npm_install"] = round(time.perf_counter() - stage_start, 3)
+        except Exception as e:
+            self._error = e
+
+    def on_file(self, path, content):
+        """
+        Coder callback: writes a finished file now. Safe to call while the
+        template is still being copied.
+        """
+        if not isinstance(content, str):
+            return
+        stage_start = time.perf_counter()
+        self._writer.write_generated(path, content)
+        self._add_time("write", stage_start)
+
+    def finish(self, code: dict):
+        """
+        Waits for the background stage, brings the site to its final file
+        set (template + code) writing only what changed after streaming
+        (repairs, auto-fixes), and reinstalls only if package.json changed
+        after the install started.
+        """
+        stage_start = time.perf_counter()
+        self._thread.join()
+        self.timings["install_wait"] = round(time.perf_counter() - stage_start, 3)
+        if self._error is not None:
+            raise self._error
+
+        stage_start = time.perf_counter()
+        self._writer.materialize(compose_site(self._writer.template, code))
+        self._writer.save_manifest()
+        self._add_time("write", stage_start)
+        self.write_stats = dict(self._writer.stats)
+
+        if self._read_pkg() != self._installed_pkg:
+            print("package.json changed during generation; reinstalling dependencies...")
+            stage_start = time.perf_counter()
+            self.install_report = self._install(self.staging_dir)
+            self.timings["npm_reinstall"] = round(time.perf_counter() - stage_start, 3)
+
+    def discard(self):
+        self._thread.join()
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
@@ -0,0 +1,209 @@
+import os
+import re
+import json
+import math
+import time
+import threading
+from utils.context_builder import SYNONYMS
+from utils.dir_lock import dir_lock
+
+# ============================================
+# PLAN/ARCHITECTURE REUSE INDEX
+# Completed runs are indexed by their normalized prompt (TF-IDF over
+# content words, synonyms folded). A new prompt with the same intent and
+# a cosine similarity >= REUSE_THRESHOLD reuses the stored plan and
+# architecture instead of calling the planner and architect.
+# ============================================
+INDEX_PATH = os.getenv("AUTOSITE_REUSE_INDEX", os.path.join(".autosite-cache", "plan_index.json"))
+REUSE_THRESHOLD = float(os.getenv("AUTOSITE_REUSE_THRESHOLD", "0.75"))
+MAX_ENTRIES = int(os.getenv("AUTOSITE_REUSE_MAX_ENTRIES", "500"))
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Words that say nothing about what the app does
+GENERIC_WORDS = {
+    "a", "an", "the", "and", "or", "for", "with", "to", "of", "in", "on", "my", "me", "i", "we",
+    "want", "need", "please", "like", "that", "which", "can", "should", "some", "simple", "basic",
+    "build", "make", "create", "generate", "design", "develop", "write",
+    "app", "application", "website", "site", "web", "page", "webpage", "list",
+}
+
+
+def normalize_prompt(prompt: str) -> list:
+    """
+    Content words of a prompt with synonyms folded ("task list" -> ["todo"]).
+    """
+    words = []
+    for word in _WORD.findall(prompt.lower()):
+        word = SYNONYMS.get(word, word)
+        if word not in GENERIC_WORDS:
+            words.append(word)
+    return words
+
+def _same_run(a: dict, b: dict) -> bool:
+    return (a["intent"] == b["intent"] and a["terms"] == b["terms"]
+            and a.get("backend", "groq") == b.get("backend", "groq"))
+
+def _term_counts(words: list) -> dict:
+    counts = {}
+    for word in words:
+        counts[word] = counts.get(word, 0) + 1
+    return counts
+
+
+class PlanIndex:
+    """
+    JSON-file index of reusable runs. Entries: prompt, terms, intent,
+    backend, blueprint, plan, architecture, hits. Runs from the offline
+    backends never match real ones. The cumulative reuse count is kept in
+    the same file. Lookups only read; hits and additions are merged into
+    the on-disk index under a cross-process lock.
+    """
+
+    def __init__(self, path: str = INDEX_PATH, threshold: float = REUSE_THRESHOLD, max_entries: int = MAX_ENTRIES):
+        self.path = path
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.enabled = os.getenv("AUTOSITE_REUSE", "1") != "0"
+        self.stats = {"hits": 0, "misses": 0, "added": 0}
+        self._lock = threading.Lock()
+        self._data = None
+        self._mtime = None
+
+    def _load(self) -> dict:
+        """
+        Returns the index, re-reading it when another process changed it.
+        Call with the lock held.
+        """
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if self._data is None or mtime != self._mtime:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._data = json.load(f)
+            except (OSError, ValueError):
+                self._data = {"entries": [], "stats": {"hits": 0}}
+            self._mtime = mtime
+        return self._data
+
+    def _update(self, mutate):
+        """
+        Applies mutate(data) to the latest on-disk index and saves it, all
+        under the cross-process lock, so concurrent runs never drop each
+        other's changes. Call with the thread lock held.
+        """
+        with dir_lock(f"{self.path}.lock"):
+            self._data = None  # Re-read even if the mtime looks unchanged
+            mutate(self._load())
+            self._save()
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._data, f)
+        os.replace(tmp_path, self.path)
+        self._mtime = os.stat(self.path).st_mtime_ns
+
+    def _idf(self, entries: list):
+        df = {}
+        for entry in entries:
+            for term in entry["terms"]:
+                df[term] = df.get(term, 0) + 1
+        n = len(entries)
+        return {term: math.log((n + 1) / (count + 1)) + 1.0 for term, count in df.items()}, n
+
+    @staticmethod
+    def _cosine(a: dict, b: dict, idf: dict, default_idf: float) -> float:
+        def weight(term, count):
+            return count * idf.get(term, default_idf)
+        dot = sum(weight(t, c) * weight(t, b[t]) for t, c in a.items() if t in b)
+        norm_a = math.sqrt(sum(weight(t, c) ** 2 for t, c in a.items()))
+        norm_b = math.sqrt(sum(weight(t, c) ** 2 for t, c in b.items()))
+        return dot / (norm_a * norm_b) if norm_a and norm_b else 0.0
+
+    def lookup(self, prompt: str, intent: str, backend: str = "groq"):
+        """
+        Returns (entry, score) for the most similar stored run with the same
+        intent (and LLM backend) when it clears the threshold, else None.
+        Counts hit/miss; only a hit is written back.
+        """
+        if not self.enabled:
+            return None
+        terms = _term_counts(normalize_prompt(prompt))
+        with self._lock:
+            data = self._load()
+            entries = data["entries"]
+            idf, n = self._idf(entries)
+            default_idf = math.log(n + 1) + 1.0
+
+            best, best_score = None, 0.0
+            for entry in entries:
+                if entry["intent"] != intent or entry.get("backend", "groq") != backend:
+                    continue
+                score = self._cosine(terms, entry["terms"], idf, default_idf)
+                if score > best_score:
+                    best, best_score = entry, score
+
+            hit = best is not None and best_score >= self.threshold
+            self.stats["hits" if hit else "misses"] += 1
+            if not hit:
+                return None
+
+            def record_hit(data):
+                data["stats"]["hits"] = data["stats"].get("hits", 0) + 1
+                for entry in data["entries"]:
+                    if _same_run(entry, best):
+                        entry["hits"] = entry.get("hits", 0) + 1
+                        entry["last_hit"] = time.time()
+            try:
+                self._update(record_hit)
+            except OSError:
+                pass
+        return best, round(best_score, 3)
+
+    def add(self, prompt: str, intent: str, plan: dict, architecture: dict, backend: str = "groq"):
+        if not self.enabled:
+            return
+        terms = _term_counts(normalize_prompt(prompt))
+        if not terms:
+            return
+        added = {
+            "prompt": prompt,
+            "terms": terms,
+            "intent": intent,
+            "backend": backend,
+            "blueprint": plan.get("blueprint"),
+            "plan": plan,
+            "architecture": architecture,
+            "created": time.time(),
+            "hits": 0,
+        }
+
+        def add_entry(data):
+            entries = [e for e in data["entries"] if not _same_run(e, added)]
+            entries.append(added)
+            # Keep the most recently used entries
+            entries.sort(key=lambda e: e.get("last_hit") or e["created"])
+            data["entries"] = entries[-self.max_entries:]
+        with self._lock:
+            self.stats["added"] += 1
+            try:
+                self._update(add_entry)
+            except OSError as e:
+                print(f"Could not update the plan index: {e}")
+
+    def summary(self) -> str:
+        with self._lock:
+            reused = self._load()["stats"].get("hits", 0)
+            looked_up = self.stats["hits"] + self.stats["misses"]
+        return (f"Plan reuse: {self.stats['hits']}/{looked_up} hits this run, "
+                f"{reused} reuses overall (threshold {self.threshold})")
+
+
+_index = PlanIndex()
+
+def get_plan_index() -> PlanIndex:
+    return _index
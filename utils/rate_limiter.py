@@ -0,0 +1,114 @@
+import os
+import time
+import asyncio
+import threading
+
+# ============================================
+# PER-PROVIDER LIMITS (overridable via environment)
+# Groq's free tier allows ~30 requests/minute; stay under it
+# instead of leaning on the client's retry backoff.
+# ============================================
+DEFAULT_LIMITS = {
+    "groq": {
+        "max_concurrent": int(os.getenv("AUTOSITE_GROQ_MAX_CONCURRENT", "4")),
+        "requests_per_minute": int(os.getenv("AUTOSITE_GROQ_RPM", "30")),
+    },
+    # Offline backends (utils/fake_llm.py): concurrency only, no request budget
+    "fake": {
+        "max_concurrent": int(os.getenv("AUTOSITE_FAKE_MAX_CONCURRENT", "64")),
+        "requests_per_minute": 0,
+    },
+    "replay": {
+        "max_concurrent": int(os.getenv("AUTOSITE_FAKE_MAX_CONCURRENT", "64")),
+        "requests_per_minute": 0,
+    },
+}
+
+
+class ProviderLimiter:
+    """
+    Caps in-flight requests with a semaphore and spaces request starts
+    with a token bucket. Use as a (sync or async) context manager around one LLM call.
+    """
+
+    def __init__(self, max_concurrent: int, requests_per_minute: int):
+        self.max_concurrent = max(1, max_concurrent)
+        self.requests_per_minute = requests_per_minute
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrent)
+        self._lock = threading.Lock()
+        self._tokens = float(max(1, requests_per_minute))
+        self._last_refill = time.monotonic()
+        self.stats = {"requests": 0, "throttled_seconds": 0.0}
+
+    def _reserve(self) -> float:
+        """
+        Takes one token from the bucket and returns how long to wait for it.
+        """
+        if self.requests_per_minute <= 0:
+            return 0.0
+
+        rate = self.requests_per_minute / 60.0
+        capacity = float(self.requests_per_minute)
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(capacity, self._tokens + (now - self._last_refill) * rate)
+            self._last_refill = now
+            self._tokens -= 1
+            self.stats["requests"] += 1
+            if self._tokens >= 0:
+                return 0.0
+            wait = -self._tokens / rate
+            self.stats["throttled_seconds"] += wait
+            return wait
+
+    def __enter__(self):
+        self._semaphore.acquire()
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._semaphore.release()
+        return False
+
+    async def __aenter__(self):
+        # Poll rather than block so the event loop keeps serving other runs;
+        # the semaphore is shared with threaded callers.
+        while not self._semaphore.acquire(blocking=False):
+            await asyncio.sleep(0.05)
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._semaphore.release()
+        return False
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def _build_limiter(provider: str, max_concurrent: int = None, requests_per_minute: int = None) -> ProviderLimiter:
+    limits = dict(DEFAULT_LIMITS.get(provider, {"max_concurrent": 4, "requests_per_minute": 0}))
+    if max_concurrent is not None:
+        limits["max_concurrent"] = max_concurrent
+    if requests_per_minute is not None:
+        limits["requests_per_minute"] = requests_per_minute
+    return ProviderLimiter(**limits)
+
+def configure_limiter(provider: str, max_concurrent: int = None, requests_per_minute: int = None) -> ProviderLimiter:
+    """
+    Replaces the limiter for a provider (e.g. from CLI flags).
+    """
+    limiter = _build_limiter(provider, max_concurrent, requests_per_minute)
+    with _limiters_lock:
+        _limiters[provider] = limiter
+    return limiter
+
+def get_limiter(provider: str) -> ProviderLimiter:
+    with _limiters_lock:
+        if provider not in _limiters:
+            _limiters[provider] = _build_limiter(provider)
+        return _limiters[provider]
@@ -0,0 +1,146 @@
+import os
+import json
+import threading
+
+# ============================================
+# PROCESS-WIDE RESOURCE REGISTRY
+# Prompts, blueprints and component library entries are read once and
+# served from memory. Each lookup compares the file's mtime so edits are
+# picked up without a restart (set AUTOSITE_HOT_RELOAD=0 to skip even the
+# stat call). A library entry is re-read when its manifest.json changes,
+# which is where its version lives.
+# ============================================
+ROOT_DIR = os.path.join(os.path.dirname(__file__), "..")
+PROMPTS_DIR = os.path.join(ROOT_DIR, "prompts")
+BLUEPRINTS_DIR = os.path.join(ROOT_DIR, "blueprints")
+LIBRARY_DIR = os.path.join(ROOT_DIR, "library")
+HOT_RELOAD = os.getenv("AUTOSITE_HOT_RELOAD", "1") != "0"
+
+
+class ResourceRegistry:
+    def __init__(self, hot_reload: bool = HOT_RELOAD):
+        self.hot_reload = hot_reload
+        self._lock = threading.Lock()
+        self._files = {}       # path -> (mtime_ns, parsed value)
+        self._listings = {}    # dir -> (mtime_ns, sorted names)
+        self._entries = {}     # library name -> (manifest mtime_ns, entry)
+
+    def _load(self, path: str, parse):
+        with self._lock:
+            entry = self._files.get(path)
+        if entry is not None and not self.hot_reload:
+            return entry[1]
+
+        mtime = os.stat(path).st_mtime_ns
+        if entry is not None and entry[0] == mtime:
+            return entry[1]
+
+        with open(path, "r", encoding="utf-8") as f:
+            value = parse(f.read())
+        with self._lock:
+            self._files[path] = (mtime, value)
+        return value
+
+    def prompt(self, name: str) -> str:
+        """
+        Returns the text of prompts/<name>.
+        """
+        return self._load(os.path.join(PROMPTS_DIR, name), lambda text: text)
+
+    def blueprint(self, name: str):
+        """
+        Returns the parsed blueprints/<name>.json, or None if it does not exist.
+        Callers must treat the result as read-only; it is shared.
+        """
+        path = os.path.join(BLUEPRINTS_DIR, f"{name}.json")
+        try:
+            return self._load(path, json.loads)
+        except FileNotFoundError:
+            return None
+
+    def _list(self, directory: str, names):
+        """
+        Cached names(directory), re-listed when the directory changes.
+        """
+        if not os.path.isdir(directory):
+            return []
+        with self._lock:
+            listing = self._listings.get(directory)
+        if listing is not None and not self.hot_reload:
+            return listing[1]
+
+        mtime = os.stat(directory).st_mtime_ns
+        if listing is not None and listing[0] == mtime:
+            return listing[1]
+
+        result = sorted(names(directory))
+        with self._lock:
+            self._listings[directory] = (mtime, result)
+        return result
+
+    def blueprint_names(self) -> list:
+        return self._list(BLUEPRINTS_DIR, lambda d: (f[:-len(".json")] for f in os.listdir(d) if f.endswith(".json")))
+
+    def blueprints(self) -> dict:
+        """
+        Returns {name: parsed blueprint} for every file in blueprints/.
+        """
+        result = {}
+        for name in self.blueprint_names():
+            blueprint = self.blueprint(name)
+            if blueprint is not None:
+                result[name] = blueprint
+        return result
+
+    def library_entry(self, name: str):
+        """
+        Returns library/<name> as {"name", "manifest", "files"}, files being
+        {"src/...": text} for everything under its src/, or None if there is
+        no such entry. Read-only, like blueprints.
+        """
+        entry_dir = os.path.join(LIBRARY_DIR, name)
+        manifest_path = os.path.join(entry_dir, "manifest.json")
+        with self._lock:
+            cached = self._entries.get(name)
+        if cached is not None and not self.hot_reload:
+            return cached[1]
+        try:
+            mtime = os.stat(manifest_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        manifest = self._load(manifest_path, json.loads)
+        files = {}
+        for root, _, names in os.walk(os.path.join(entry_dir, "src")):
+            for filename in sorted(names):
+                path = os.path.join(root, filename)
+                rel = os.path.relpath(path, entry_dir).replace(os.sep, "/")
+                files[rel] = self._load(path, lambda text: text)
+        entry = {"name": name, "manifest": manifest, "files": files}
+        with self._lock:
+            self._entries[name] = (mtime, entry)
+        return entry
+
+    def library_names(self) -> list:
+        return self._list(LIBRARY_DIR, lambda d: (name for name in os.listdir(d)
+                                                  if os.path.isfile(os.path.join(d, name, "manifest.json"))))
+
+
+_registry = ResourceRegistry()
+
+def get_prompt(name: str) -> str:
+    return _registry.prompt(name)
+
+def get_blueprint(name: str):
+    return _registry.blueprint(name)
+
+def get_blueprints() -> dict:
+    return _registry.blueprints()
+
+def get_library_entry(name: str):
+    return _registry.library_entry(name)
+
+def get_library_names() -> list:
+    return _registry.library_names()
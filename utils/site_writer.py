@@ -0,0 +1,273 @@
+import os
+import json
+import shutil
+import hashlib
+import threading
+from utils.file_writer import prepare_content
+
+# ============================================
+# WRITE-ONCE SITE ENGINE
+# The final file set (template overlaid with generated code) is computed
+# in memory; each file is then written at most once. Unchanged template
+# assets are cloned from the template (copy-on-write where the filesystem
+# supports it, a plain copy otherwise), files whose hash matches what
+# is already on disk are skipped, and files this engine wrote earlier but
+# that are no longer part of the site are pruned. A manifest of written
+# hashes lives in <site>/.autosite/manifest.json.
+# ============================================
+MANIFEST_PATH = os.path.join(".autosite", "manifest.json")
+# Plan, architecture and code of the site, for `main.py --update`
+STATE_PATH = os.path.join(".autosite", "state.json")
+
+# Template files the coder always replaces; never linked early
+GENERATED_OVERLAYS = ("src/App.jsx",)
+# Files tools may rewrite in place (npm); never hardlinked
+COPY_ONLY = {"package.json"}
+# Hardlinked files share the template's inode, so an editor (or tool)
+# saving in place would change the template too; AUTOSITE_LINK_TEMPLATE=1
+# opts into hardlinks anyway for throwaway sites
+LINK_TEMPLATE = os.getenv("AUTOSITE_LINK_TEMPLATE", "0") == "1"
+# ioctl from linux/fs.h: share the source's extents (btrfs, xfs, ...)
+FICLONE = 0x40049409
+
+
+def _clone(source: str, target: str) -> bool:
+    """
+    Copy-on-write clone of source at target; False where unsupported
+    (the caller then copies). Edits to the clone never reach the source.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        return False  # Not POSIX
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return True
+        except OSError:
+            return False
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+def _file_digest(path: str):
+    try:
+        with open(path, "rb") as f:
+            return _digest(f.read())
+    except OSError:
+        return None
+
+
+def save_site_state(site_dir: str, state: dict):
+    path = os.path.join(site_dir, STATE_PATH)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+def load_site_state(site_dir: str):
+    """
+    Returns the saved generation state of a site, or None if it has none
+    (sites generated before state was saved).
+    """
+    try:
+        with open(os.path.join(site_dir, STATE_PATH), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class TemplateSnapshot:
+    """
+    In-memory listing of a template: relative path -> (absolute path, digest).
+    """
+
+    def __init__(self, template_dir: str):
+        self.template_dir = os.path.abspath(template_dir)
+        self.files = {}
+        for root, dirs, names in os.walk(self.template_dir):
+            dirs[:] = [d for d in dirs if d != "node_modules"]
+            for name in names:
+                path = os.path.join(root, name)
+                rel = os.path.relpath(path, self.template_dir).replace(os.sep, "/")
+                self.files[rel] = (path, _file_digest(path))
+
+
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+def get_template_snapshot(template_dir: str) -> TemplateSnapshot:
+    with _snapshots_lock:
+        key = os.path.abspath(template_dir)
+        if key not in _snapshots:
+            _snapshots[key] = TemplateSnapshot(template_dir)
+        return _snapshots[key]
+
+
+def compose_site(template: TemplateSnapshot, code: dict) -> dict:
+    """
+    Final file set: {path: {"digest", "source"}} for template links and
+    {path: {"digest", "data"}} for generated content. Generated files that
+    fail the JSX checks fall back to the template version, if any.
+    """
+    files = {rel: {"digest": digest, "source": path} for rel, (path, digest) in template.files.items()}
+    for filename, content in code.items():
+        if not isinstance(content, str):
+            continue
+        rel = filename.lstrip("/\\")
+        text = prepare_content(rel, content)
+        if text is None:
+            continue
+        data = text.encode("utf-8")
+        files[rel] = {"digest": _digest(data), "data": data}
+    return files
+
+
+class SiteWriter:
+    """
+    Writes files into one site directory, once each. Thread-safe.
+    """
+
+    def __init__(self, site_dir: str, template: TemplateSnapshot):
+        self.site_dir = site_dir
+        self.template = template
+        self.stats = {"written": 0, "cloned": 0, "linked": 0, "skipped": 0, "pruned": 0}
+        self._lock = threading.Lock()
+        self._manifest = self._load_manifest()
+
+    def _load_manifest(self) -> dict:
+        try:
+            with open(os.path.join(self.site_dir, MANIFEST_PATH), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_manifest(self):
+        path = os.path.join(self.site_dir, MANIFEST_PATH)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._lock:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self._manifest, f, indent=2, sort_keys=True)
+
+    def _target(self, rel: str) -> str:
+        return os.path.join(self.site_dir, *rel.split("/"))
+
+    def _unchanged(self, rel: str, digest: str) -> bool:
+        target = self._target(rel)
+        if not os.path.exists(target):
+            return False
+        if rel in self._manifest:
+            return self._manifest[rel] == digest
+        # Existing directory without a manifest entry: compare contents
+        return _file_digest(target) == digest
+
+    def _place(self, rel: str, entry: dict, target: str) -> str:
+        """
+        Creates target (a path that does not exist) for the site file rel
+        from a template source or generated data. Returns "cloned", "linked" or "written".
+        """
+        if "data" in entry:
+            with open(target, "wb") as f:
+                f.write(entry["data"])
+            return "written"
+        if LINK_TEMPLATE and rel not in COPY_ONLY:
+            try:
+                os.link(entry["source"], target)
+                return "linked"
+            except OSError:
+                pass  # Cross-device or unsupported; copy instead
+        if _clone(entry["source"], target):
+            return "cloned"
+        shutil.copyfile(entry["source"], target)
+        return "written"
+
+    def _put(self, rel: str, entry: dict) -> str:
+        """
+        Writes, clones or links one file unless it is unchanged. Call with
+        the lock held. Returns "skipped", "cloned", "linked" or "written".
+        """
+        if self._unchanged(rel, entry["digest"]):
+            self._manifest[rel] = entry["digest"]
+            self.stats["skipped"] += 1
+            return "skipped"
+
+        target = self._target(rel)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # Never write through an existing (possibly hardlinked) file
+        if os.path.lexists(target):
+            os.unlink(target)
+        action = self._place(rel, entry, target)
+        self._manifest[rel] = entry["digest"]
+        self.stats[action] += 1
+        return action
+
+    def _claimed(self, rel: str, digest: str) -> bool:
+        # Generated content other than the template's own owns this path
+        return rel in self._manifest and self._manifest[rel] != digest
+
+    def bootstrap(self, defer=GENERATED_OVERLAYS):
+        """
+        Copies the template into the site, except files the coder is
+        expected to replace and files generated content already claimed.
+        Each file is copied to a temporary path without the lock, so
+        write_generated is never blocked behind the template copy; the lock
+        is only taken to check the path is still the template's and to
+        move the copy into place.
+        """
+        for rel, (path, digest) in self.template.files.items():
+            if rel in defer:
+                continue
+            with self._lock:
+                if self._claimed(rel, digest):
+                    continue
+                if self._unchanged(rel, digest):
+                    self._manifest[rel] = digest
+                    self.stats["skipped"] += 1
+                    continue
+
+            target = self._target(rel)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            tmp_path = f"{target}.tmp-{os.getpid()}-{threading.get_ident()}"
+            if os.path.lexists(tmp_path):
+                os.unlink(tmp_path)
+            action = self._place(rel, {"source": path}, tmp_path)
+
+            with self._lock:
+                if self._claimed(rel, digest):
+                    os.unlink(tmp_path)  # A generated file landed meanwhile
+                    continue
+                os.replace(tmp_path, target)
+                self._manifest[rel] = digest
+                self.stats[action] += 1
+
+    def write_generated(self, filename: str, content: str) -> bool:
+        """
+        Writes one generated file now (streaming). Returns False when the
+        JSX checks rejected it.
+        """
+        rel = filename.lstrip("/\\")
+        text = prepare_content(rel, content)
+        if text is None:
+            return False
+        data = text.encode("utf-8")
+        with self._lock:
+            self._put(rel, {"digest": _digest(data), "data": data})
+        return True
+
+    def materialize(self, files: dict):
+        """
+        Brings the site to exactly `files` (see compose_site): writes what
+        differs and prunes files this engine wrote that are no longer part
+        of the site. Files it never wrote (node_modules, lockfiles) are kept.
+        """
+        with self._lock:
+            for rel, entry in files.items():
+                self._put(rel, entry)
+            for rel in sorted(set(self._manifest) - set(files)):
+                try:
+                    os.unlink(self._target(rel))
+                except FileNotFoundError:
+                    pass
+                del self._manifest[rel]
+                self.stats["pruned"] += 1
@@ -0,0 +1,345 @@
+import os
+import json
+import time
+import uuid
+import inspect
+import threading
+import contextvars
+from utils.context_builder import estimate_tokens
+
+# ============================================
+# RUN TRACING & METRICS
+# Every graph node runs inside a span (wall time, LLM calls, JSON parse
+# paths, validation outcome). A run's spans are exported as a JSON run
+# record; process-wide counters/histograms render as Prometheus text.
+# ============================================
+TRACE_DIR = os.getenv("AUTOSITE_TRACE_DIR", os.path.join(".autosite-cache", "traces"))
+DEFAULT_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_current_span = contextvars.ContextVar("autosite_span", default=None)
+
+
+class MetricsRegistry:
+    """
+    Minimal Prometheus-style registry: labelled counters and histograms.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help = {}
+        self._counters = {}     # name -> {labels: value}
+        self._histograms = {}   # name -> {labels: [bucket counts..., sum, count]}
+
+    def describe(self, name: str, kind: str, text: str):
+        self._help[name] = (kind, text)
+
+    def inc(self, name: str, labels: dict = None, value: float = 1):
+        key = tuple(sorted((labels or {}).items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, labels: dict = None):
+        key = tuple(sorted((labels or {}).items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            state = series.setdefault(key, [0] * len(DEFAULT_BUCKETS) + [0.0, 0])
+            for i, bound in enumerate(DEFAULT_BUCKETS):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "counters": {name: {_label_text(k): v for k, v in series.items()}
+                             for name, series in self._counters.items()},
+                "histograms": {name: {_label_text(k): {"sum": round(s[-2], 6), "count": s[-1]}
+                                      for k, s in series.items()}
+                               for name, series in self._histograms.items()},
+            }
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            for name in sorted(self._counters):
+                self._header(lines, name, "counter")
+                for key, value in sorted(self._counters[name].items()):
+                    lines.append(f"{name}{_label_text(key)} {value}")
+            for name in sorted(self._histograms):
+                self._header(lines, name, "histogram")
+                for key, state in sorted(self._histograms[name].items()):
+                    for i, bound in enumerate(DEFAULT_BUCKETS):
+                        lines.append(f"{name}_bucket{_label_text(key + (('le', str(bound)),))} {state[i]}")
+                    lines.append(f"{name}_bucket{_label_text(key + (('le', '+Inf'),))} {state[-1]}")
+                    lines.append(f"{name}_sum{_label_text(key)} {round(state[-2], 6)}")
+                    lines.append(f"{name}_count{_label_text(key)} {state[-1]}")
+        return "\n".join(lines) + "\n"
+
+    def _header(self, lines: list, name: str, kind: str):
+        kind, text = self._help.get(name, (kind, ""))
+        if text:
+            lines.append(f"# HELP {name} {text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _label_text(key) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in key) + "}"
+
+
+_metrics = MetricsRegistry()
+_metrics.describe("autosite_node_seconds", "histogram", "Wall time of each graph node")
+_metrics.describe("autosite_llm_latency_seconds", "histogram", "LLM call latency (network calls only)")
+_metrics.describe("autosite_llm_ttft_seconds", "histogram", "Time to first streamed token")
+_metrics.describe("autosite_llm_calls_total", "counter", "LLM calls by agent and source (network/cache)")
+_metrics.describe("autosite_llm_prompt_tokens_total", "counter", "Estimated prompt tokens sent")
+_metrics.describe("autosite_llm_completion_tokens_total", "counter", "Estimated completion tokens received")
+_metrics.describe("autosite_llm_retries_total", "counter", "LLM retries after transient errors")
+_metrics.describe("autosite_coder_output_tokens_total", "counter", "Estimated coder output tokens kept (generated) or lost to truncation (wasted)")
+_metrics.describe("autosite_extract_json_total", "counter", "JSON extraction path taken per response")
+_metrics.describe("autosite_validation_total", "counter", "Validation outcomes")
+_metrics.describe("autosite_validation_path_total", "counter", "How LLM-eligible validations were decided")
+_metrics.describe("autosite_plan_reuse_total", "counter", "Plan/architecture reuse index lookups")
+_metrics.describe("autosite_speculation_total", "counter", "Speculative architectures used (hit), discarded (miss) or not attempted (none)")
+_metrics.describe("autosite_library_total", "counter", "Component library matches and assembled sites")
+_metrics.describe("autosite_model_route_total", "counter", "Model routing decisions")
+_metrics.describe("autosite_stage_seconds", "histogram", "Output stages (bootstrap, write, npm install, build verification)")
+_metrics.describe("autosite_build_verify_total", "counter", "Build verification outcomes by mode")
+_metrics.describe("autosite_sites_total", "counter", "Finished generations by status")
+
+def get_metrics() -> MetricsRegistry:
+    return _metrics
+
+
+class RunTrace:
+    """
+    Trace of one generation: a span per executed node plus output stages.
+    Passed to the graph as config["configurable"]["trace"].
+    """
+
+    def __init__(self, prompt: str = None, run_id: str = None):
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.prompt = prompt
+        self.started = time.time()
+        self.spans = []
+        self.stages = {}
+        self.outcome = None
+        self._lock = threading.Lock()
+
+    def add_span(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            spans = [span.to_dict() for span in self.spans]
+        return {
+            "run_id": self.run_id,
+            "prompt": self.prompt,
+            "started": self.started,
+            "nodes": spans,
+            "stages": dict(self.stages),
+            "outcome": self.outcome,
+        }
+
+    def export(self, trace_dir: str = TRACE_DIR) -> str:
+        os.makedirs(trace_dir, exist_ok=True)
+        path = os.path.join(trace_dir, f"{self.run_id}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+
+class NodeSpan:
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+        self.wall_seconds = None
+        self.llm_calls = []
+        self.extract_json = {}
+        self.output_tokens = {}
+        self.validation = None
+        self.error = None
+        self._lock = threading.Lock()
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "node": self.name,
+                "wall_seconds": self.wall_seconds,
+                "llm_calls": list(self.llm_calls),
+                "extract_json": dict(self.extract_json),
+                "output_tokens": dict(self.output_tokens),
+                "validation": self.validation,
+                "error": self.error,
+            }
+
+
+class LLMCall:
+    """
+    Measures one LLM request: latency, time to first token, retries and
+    estimated token counts. finish() files it under the current node span.
+    """
+
+    def __init__(self, agent: str, backend: str, prompt_tokens: int, cached: bool = False, model: str = None):
+        self.agent = agent
+        self.backend = backend
+        self.model = model
+        self.prompt_tokens = prompt_tokens
+        self.cached = cached
+        self.retries = 0
+        self.ttft = None
+        self._started = time.perf_counter()
+
+    def first_token(self):
+        if self.ttft is None:
+            self.ttft = time.perf_counter() - self._started
+
+    def retry(self):
+        self.retries += 1
+        _metrics.inc("autosite_llm_retries_total", {"agent": self.agent})
+
+    def finish(self, text: str):
+        latency = time.perf_counter() - self._started
+        completion_tokens = estimate_tokens(text)
+        source = "cache" if self.cached else "network"
+        labels = {"agent": self.agent}
+
+        _metrics.inc("autosite_llm_calls_total", {"agent": self.agent, "source": source})
+        _metrics.inc("autosite_llm_prompt_tokens_total", labels, self.prompt_tokens)
+        _metrics.inc("autosite_llm_completion_tokens_total", labels, completion_tokens)
+        if not self.cached:
+            _metrics.observe("autosite_llm_latency_seconds", latency, labels)
+            if self.ttft is not None:
+                _metrics.observe("autosite_llm_ttft_seconds", self.ttft, labels)
+
+        span = _current_span.get()
+        if span is not None:
+            with span._lock:
+                span.llm_calls.append({
+                    "agent": self.agent,
+                    "backend": self.backend,
+                    "model": self.model,
+                    "source": source,
+                    "latency_seconds": round(latency, 4),
+                    "ttft_seconds": round(self.ttft, 4) if self.ttft is not None else None,
+                    "prompt_tokens": self.prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "retries": self.retries,
+                })
+
+
+def record_extract_json(path: str):
+    """
+    Counts which extraction path a response took: fenced, bare, stream,
+    truncated or error.
+    """
+    _metrics.inc("autosite_extract_json_total", {"path": path})
+    span = _current_span.get()
+    if span is not None:
+        with span._lock:
+            span.extract_json[path] = span.extract_json.get(path, 0) + 1
+
+def record_output_tokens(generated: int, wasted: int, continuations: int = 0):
+    """
+    Adds one coder response's estimated output tokens: all it generated,
+    and the part lost after its last complete file when it was truncated.
+    """
+    _metrics.inc("autosite_coder_output_tokens_total", {"kind": "generated"}, generated)
+    _metrics.inc("autosite_coder_output_tokens_total", {"kind": "wasted"}, wasted)
+    span = _current_span.get()
+    if span is not None:
+        with span._lock:
+            for name, value in (("generated", generated), ("wasted", wasted), ("continuations", continuations)):
+                span.output_tokens[name] = span.output_tokens.get(name, 0) + value
+
+def record_stages(trace: RunTrace, timings: dict, status: str):
+    """
+    Adds the output-stage timings of a finished site to its trace and to
+    the process-wide histograms.
+    """
+    for stage in ("bootstrap", "write", "npm_install", "install_wait", "npm_reinstall", "verify"):
+        if stage in timings:
+            _metrics.observe("autosite_stage_seconds", timings[stage], {"stage": stage})
+    _metrics.inc("autosite_sites_total", {"status": status})
+    if trace is not None:
+        trace.stages = dict(timings)
+        trace.outcome = status
+
+def map_in_context(pool, fn, items) -> list:
+    """
+    pool.map that carries the caller's context (and so the current node
+    span) into the worker threads.
+    """
+    futures = [pool.submit(contextvars.copy_context().run, fn, item) for item in items]
+    return [future.result() for future in futures]
+
+# ============================================
+# NODE INSTRUMENTATION
+# ============================================
+def _trace_from(config):
+    return ((config or {}).get("configurable") or {}).get("trace")
+
+def _open_span(name: str, config):
+    span = NodeSpan(name)
+    trace = _trace_from(config)
+    if trace is not None:
+        trace.add_span(span)
+    return span, _current_span.set(span)
+
+def _close_span(span: NodeSpan, token, update=None, error=None):
+    _current_span.reset(token)
+    span.wall_seconds = round(time.perf_counter() - span.started, 4)
+    _metrics.observe("autosite_node_seconds", span.wall_seconds, {"node": span.name})
+    if error is not None:
+        span.error = str(error)
+    if isinstance(update, dict) and isinstance(update.get("validation"), dict):
+        span.validation = update["validation"].get("status")
+        _metrics.inc("autosite_validation_total", {"status": span.validation})
+    calls = len(span.llm_calls)
+    tokens = ""
+    if span.output_tokens:
+        tokens = f", ~{span.output_tokens['generated']} output tokens (~{span.output_tokens['wasted']} wasted)"
+    print(f"[trace] {span.name}: {span.wall_seconds:.2f}s, {calls} LLM call(s){tokens}")
+
+def _accepts_config(func) -> bool:
+    return "config" in inspect.signature(func).parameters
+
+def instrument_node(name: str, func):
+    """
+    Wraps a sync node so it runs inside a NodeSpan.
+    """
+    takes_config = _accepts_config(func)
+
+    def run(state, config=None):
+        span, token = _open_span(name, config)
+        try:
+            update = func(state, config) if takes_config else func(state)
+        except Exception as e:
+            _close_span(span, token, error=e)
+            raise
+        _close_span(span, token, update)
+        return update
+
+    return run
+
+def instrument_node_async(name: str, afunc):
+    takes_config = _accepts_config(afunc)
+
+    async def run(state, config=None):
+        span, token = _open_span(name, config)
+        try:
+            update = await (afunc(state, config) if takes_config else afunc(state))
+        except Exception as e:
+            _close_span(span, token, error=e)
+            raise
+        _close_span(span, token, update)
+        return update
+
+    return run